@@ -0,0 +1,102 @@
+"""
+Benchmark: cost of a dispatch decision per policy and waiting room size.
+
+The waiting room is filled with `size` customers, then barbers take turns
+taking the next customer while a new one arrives, so the room stays full.
+Reports the time per dispatch (one take plus one arrival) of every policy
+in models.dispatch, at waiting room sizes from a real shop to a call centre.
+
+Usage:
+    python -m benchmarks.dispatch_cost [--dispatches 200000] [--sizes 5,1000,100000]
+"""
+
+import argparse
+import random
+import time
+from models.barber import Barber
+from models.customer import Customer
+from models.dispatch import POLICIES, make_policy
+from models.haircut import HAIRCUTS
+from models.order import Order
+from models.skill import parse_skills
+from models.waiting_room import WaitingRoom
+
+SKILLS = "senior,junior*3"
+POOL_SIZE = 1 << 16  # distinct orders cycled through the waiting room
+
+
+def make_orders(count, seed=0):
+    """
+    Build a pool of orders with random haircuts, durations, priorities and names.
+
+    Args:
+        count (int): Number of orders.
+        seed (int, optional): Seed of the pool. Defaults to 0.
+
+    Returns:
+        list of Order: The orders.
+    """
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        haircut = rng.choice(HAIRCUTS)
+        order = Order(Customer(f"Customer{i}", rng.randrange(1 << 20)), haircut,
+                      duration=Order.random_duration(haircut, rng))
+        order.priority = int(rng.random() < 0.2)
+        orders.append(order)
+    return orders
+
+
+def measure(policy, size, dispatches, orders):
+    """
+    Measure the cost of dispatching from a full waiting room.
+
+    Args:
+        policy (str): Name of the dispatch policy.
+        size (int): Number of waiting customers.
+        dispatches (int): Number of dispatches to time.
+        orders (list of Order): Pool of orders cycled through the room.
+
+    Returns:
+        float: Nanoseconds per dispatch (one take plus one arrival).
+    """
+    waiting_room = WaitingRoom(size, make_policy(policy))
+    barbers = Barber.generate_barbers(waiting_room, skills=parse_skills(SKILLS))
+    waiting_room.policy.bind(barbers)
+    for order in orders:
+        order.preferred_barber = None  # regulars are assigned again on arrival
+
+    pool = len(orders)
+    for i in range(size):
+        waiting_room.put(orders[i % pool])
+
+    arrival = size
+    start = time.perf_counter()
+    for i in range(dispatches):
+        barber = barbers[i % len(barbers)]
+        if waiting_room.get_nowait(barber) is None:
+            waiting_room.get_nowait()  # only customers waiting for other barbers: take the oldest
+        waiting_room.put(orders[arrival % pool])
+        arrival += 1
+    elapsed = time.perf_counter() - start
+    return elapsed / dispatches * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of a dispatch decision per policy")
+    parser.add_argument("--dispatches", type=int, default=200_000, help="dispatches per measurement")
+    parser.add_argument("--sizes", default="5,1000,100000", help="comma-separated waiting room sizes")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    orders = make_orders(max(POOL_SIZE, max(sizes) + 1))
+
+    print(f"=== Dispatch Cost ({args.dispatches} dispatches, ns per take + arrival) ===\n")
+    print(f"{'Policy':12}" + "".join(f"{size:>12}" for size in sizes))
+    for policy in POLICIES:
+        costs = [measure(policy, size, args.dispatches, orders) for size in sizes]
+        print(f"{policy:12}" + "".join(f"{cost:12.0f}" for cost in costs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Memory benchmark: bytes per customer for the different order representations.
+
+Compares the original dict-backed Order/Customer objects with the __slots__
+classes and with the columnar OrderLog.
+
+Usage:
+    python -m benchmarks.memory_per_customer [--customers 100000]
+"""
+
+import argparse
+import random
+import tracemalloc
+from models.customer import Customer
+from models.haircut import HAIRCUTS
+from models.order import Order
+from utils.order_log import OrderLog
+
+
+class DictCustomer:
+    """Customer as it was before __slots__: one __dict__ per instance."""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class DictOrder:
+    """Order as it was before __slots__: one __dict__ per instance."""
+
+    def __init__(self, customer, haircut, duration, arrival_time):
+        self.customer = customer
+        self.haircut = haircut
+        self.duration = duration
+        self.arrival_time = arrival_time
+
+
+def measure(build, draws):
+    """
+    Measure the memory retained by building one structure holding all customers.
+
+    Args:
+        build (callable): Function building and returning the structure from the draws.
+        draws (list of tuple): Pre-drawn (name, name index, haircut, duration, arrival) per customer.
+
+    Returns:
+        float: Retained bytes per customer.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(draws)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(draws)
+
+
+def _draws(count):
+    rng = random.Random(0)
+    names = [f"Name{i}" for i in range(100)]  # shared strings, like the name table
+    return [(names[rng.randrange(100)], rng.randrange(100), rng.choice(HAIRCUTS), rng.randint(8, 48),
+             float(minute)) for minute in range(count)]
+
+
+def build_dict_objects(draws):
+    orders = [DictOrder(DictCustomer(name), haircut, duration, arrival)
+              for name, _, haircut, duration, arrival in draws]
+    wait_times = [float(duration) for _, _, _, duration, _ in draws]
+    return orders, wait_times
+
+
+def build_slotted_objects(draws):
+    orders = [Order(Customer(name, index), haircut, arrival, duration)
+              for name, index, haircut, duration, arrival in draws]
+    wait_times = [float(duration) for _, _, _, duration, _ in draws]
+    return orders, wait_times
+
+
+def build_order_log(draws):
+    log = OrderLog()
+    for name, index, haircut, duration, arrival in draws:
+        log.record(Order(Customer(name, index), haircut, arrival, duration), arrival, arrival + duration, 0)
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bytes per customer per order representation")
+    parser.add_argument("--customers", type=int, default=100_000, help="number of customers to build")
+    args = parser.parse_args()
+
+    draws = _draws(args.customers)
+    results = {
+        "dict Order/Customer + wait list": measure(build_dict_objects, draws),
+        "__slots__ Order/Customer + wait list": measure(build_slotted_objects, draws),
+        "columnar OrderLog": measure(build_order_log, draws),
+    }
+
+    print(f"=== Bytes per Customer ({args.customers} customers) ===\n")
+    for label, per_customer in results.items():
+        print(f"{label:38} {per_customer:8.1f} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark suite for the simulation hot paths.
+
+Every benchmark is timed (best of several repeats) to report operations per
+second, then run once more under tracemalloc to report its peak memory.
+Results can be saved as JSON and compared against a stored baseline, flagging
+benchmarks that got slower or use more memory than the tolerance allows.
+
+Benchmarks:
+    generate_order          OrderGenerator.generate_order(), orders/s
+    generate_orders         OrderGenerator.generate_orders() lists built from batches, orders/s
+    customer_generator      CustomerGenerator construction over names.bin (cold store), generators/s
+    read_bin_to_list        read_bin_to_list() of a large name file, names/s
+    save_list_to_bin        save_list_to_bin() of a large name list, names/s
+    stats_shared_lock       StatsTracker records from 32 barber threads through the shared lock, records/s
+    stats_per_thread        The same with per-thread accumulators, records/s
+    main_loop               Threaded main() with TIME_DESCALE taken to its limit, simulated customers/s
+    event_engine            EventSimulation.run(), simulated customers/s
+    dispatch_<policy>       Dispatch from a waiting room of 1000 customers per policy in models.dispatch, dispatches/s
+
+Usage:
+    python -m benchmarks.run [--quick] [--only generate_order,event_engine]
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --baseline baseline.json [--tolerance 0.1]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import main as threaded_main
+from benchmarks import dispatch_cost, stats_contention
+from generator.customer_generator import CustomerGenerator
+from generator.order_generator import OrderGenerator
+from models.dispatch import POLICIES
+from simulation.engine import EventSimulation
+from utils.csv_to_bin import read_bin_to_list, save_list_to_bin
+from utils.name_store import NameStore
+from utils.stats_tracker import StatsTracker
+from utils.time_manager import TimeManager
+
+NAME_FILE_RECORDS = 200_000
+
+
+def bench_generate_order(scale):
+    order_gen = OrderGenerator()
+    count = 100_000 * scale
+    for _ in range(count):
+        order_gen.generate_order()
+    return count
+
+
+def bench_generate_orders(scale):
+    order_gen = OrderGenerator()
+    count = 100_000 * scale
+    order_gen.generate_orders(count)
+    return count
+
+
+def bench_customer_generator(scale):
+    count = 2_000 * scale
+    for _ in range(count):
+        NameStore._shared.clear()  # measure opening the file, not the process-wide cache
+        CustomerGenerator()
+    return count
+
+
+def bench_read_bin_to_list(scale, name_file):
+    for _ in range(scale):
+        read_bin_to_list(name_file)
+    return NAME_FILE_RECORDS * scale
+
+
+def bench_save_list_to_bin(scale, names, directory):
+    for _ in range(scale):
+        save_list_to_bin(names, os.path.join(directory, "names.bin"))
+    return len(names) * scale
+
+
+def bench_stats(scale, per_thread):
+    num_barbers = 32
+    records = 200_000 * scale
+    records_per_round = stats_contention.RECORDS_PER_HAIRCUT * num_barbers
+    stats_contention.measure(num_barbers, records, per_thread)
+    return records // records_per_round * records_per_round
+
+
+def bench_main_loop(scale):
+    random.seed(0)
+    time_manager = TimeManager(total_time=500 * scale, descaler=1e6)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        stats_tracker = threaded_main.main(display=False, time_manager=time_manager)
+    summary = stats_tracker.summary()
+    return summary["customers_served"] + summary["customers_lost"]
+
+
+def bench_event_engine(scale):
+    random.seed(0)
+    stats_tracker = StatsTracker(streaming=True)
+    EventSimulation(stats_tracker=stats_tracker, simulation_time=20_000 * scale).run()
+    summary = stats_tracker.summary()
+    return summary["customers_served"] + summary["customers_lost"]
+
+
+def bench_dispatch(scale, policy, orders):
+    dispatches = 50_000 * scale
+    dispatch_cost.measure(policy, 1000, dispatches, orders)
+    return dispatches
+
+
+def build_benchmarks(directory):
+    """
+    Build the benchmark table, with the data files some benchmarks need.
+
+    Args:
+        directory (str): Scratch directory for data files.
+
+    Returns:
+        dict: Benchmark name mapped to a callable taking the scale and returning the number of operations.
+    """
+    names = [f"Customer{i:06d}" for i in range(NAME_FILE_RECORDS)]
+    name_file = os.path.join(directory, "names_large.bin")
+    save_list_to_bin(names, name_file)
+
+    orders = dispatch_cost.make_orders(dispatch_cost.POOL_SIZE)
+
+    benchmarks = {
+        "generate_order": bench_generate_order,
+        "generate_orders": bench_generate_orders,
+        "customer_generator": bench_customer_generator,
+        "read_bin_to_list": lambda scale: bench_read_bin_to_list(scale, name_file),
+        "save_list_to_bin": lambda scale: bench_save_list_to_bin(scale, names, directory),
+        "stats_shared_lock": lambda scale: bench_stats(scale, per_thread=False),
+        "stats_per_thread": lambda scale: bench_stats(scale, per_thread=True),
+        "main_loop": bench_main_loop,
+        "event_engine": bench_event_engine,
+    }
+    for policy in POLICIES:
+        benchmarks[f"dispatch_{policy}"] = lambda scale, policy=policy: bench_dispatch(scale, policy, orders)
+    return benchmarks
+
+
+def measure(benchmark, scale, repeat):
+    """
+    Time a benchmark and measure its peak memory.
+
+    Args:
+        benchmark (callable): Benchmark taking the scale and returning the number of operations.
+        scale (int): Size multiplier of the benchmark.
+        repeat (int): Timed repetitions; the fastest counts.
+
+    Returns:
+        dict: ops, seconds, ops_per_sec and peak_kib of the benchmark.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = benchmark(scale)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[1]:
+            best = (ops, elapsed)
+
+    tracemalloc.start()
+    benchmark(scale)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    ops, elapsed = best
+    return {"ops": ops, "seconds": elapsed, "ops_per_sec": ops / elapsed, "peak_kib": peak / 1024}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict): Benchmark name mapped to its measurement.
+        baseline (dict): Baseline results, in the same format.
+        tolerance (float): Allowed relative slowdown or memory growth, e.g. 0.1 for 10%.
+
+    Returns:
+        dict: Benchmark name mapped to (speed ratio, memory ratio, regressed) for benchmarks in both.
+    """
+    comparison = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        speed = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+        memory = result["peak_kib"] / baseline[name]["peak_kib"] if baseline[name]["peak_kib"] else 1
+        comparison[name] = (speed, memory, speed < 1 - tolerance or memory > 1 + tolerance)
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths")
+    parser.add_argument("--only", default=None, help="comma-separated benchmarks to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and a single repetition")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions per benchmark")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown / memory growth")
+    args = parser.parse_args()
+
+    scale = 1 if args.quick else 5
+    repeat = 1 if args.quick else args.repeat
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["benchmarks"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = build_benchmarks(directory)
+        selected = args.only.split(",") if args.only else list(benchmarks)
+        unknown = [name for name in selected if name not in benchmarks]
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+        print(f"{'Benchmark':20} {'ops/sec':>14} {'peak KiB':>10}" + ("   vs baseline" if baseline else ""))
+        for name in selected:
+            results[name] = result = measure(benchmarks[name], scale, repeat)
+            line = f"{name:20} {result['ops_per_sec']:14.0f} {result['peak_kib']:10.1f}"
+            if baseline and name in baseline:
+                speed, memory, regressed = compare({name: result}, baseline, args.tolerance)[name]
+                line += f"   speed {speed:5.2f}x  memory {memory:5.2f}x" + ("  REGRESSION" if regressed else "")
+            print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scale": scale,
+                "benchmarks": results,
+            }, f, indent=2)
+        print(f"\nSaved results to '{args.output}'")
+
+    if baseline and any(regressed for _, _, regressed in compare(results, baseline, args.tolerance).values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: StatsTracker recording throughput under thread contention.
+
+Every thread plays a barber and repeats the records a barber makes per haircut
+(wait, sojourn, haircut, work time and idle time). Compares the shared-lock
+tracker with per-thread accumulators at several barber counts.
+
+Usage:
+    python -m benchmarks.stats_contention [--records 1000000] [--barbers 4,32,256]
+"""
+
+import argparse
+import time
+from threading import Thread, Barrier
+from utils.stats_tracker import StatsTracker
+
+RECORDS_PER_HAIRCUT = 5
+
+
+def record_haircuts(stats_tracker, barber, haircuts, barrier):
+    barrier.wait()
+    for _ in range(haircuts):
+        stats_tracker.record_wait_time(3.0)
+        stats_tracker.record_sojourn_time(18.0)
+        stats_tracker.record_haircut(barber, 15, 15, "NORMAL")
+        stats_tracker.record_work_time(barber, 15)
+        stats_tracker.record_idle_time(barber, 0.1)
+
+
+def measure(num_barbers, total_records, per_thread):
+    """
+    Measure recording throughput.
+
+    Args:
+        num_barbers (int): Number of recording threads.
+        total_records (int): Records made by all threads together.
+        per_thread (bool): Use per-thread accumulators instead of the shared lock.
+
+    Returns:
+        float: Records per second, including the final merge.
+    """
+    stats_tracker = StatsTracker(streaming=True, per_thread=per_thread)
+    haircuts = max(1, total_records // (RECORDS_PER_HAIRCUT * num_barbers))
+    barrier = Barrier(num_barbers + 1)
+    threads = [Thread(target=record_haircuts, args=(stats_tracker, f"Barber-{i + 1}", haircuts, barrier))
+               for i in range(num_barbers)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    stats_tracker.summary()  # includes merging the per-thread accumulators
+    elapsed = time.perf_counter() - start
+
+    return haircuts * RECORDS_PER_HAIRCUT * num_barbers / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure StatsTracker throughput under thread contention")
+    parser.add_argument("--records", type=int, default=1_000_000, help="records per measurement")
+    parser.add_argument("--barbers", default="4,32,256", help="comma-separated barber (thread) counts")
+    args = parser.parse_args()
+
+    print(f"=== StatsTracker Throughput ({args.records} records) ===\n")
+    print(f"{'Barbers':>8} {'Shared lock':>14} {'Per-thread':>14} {'Speedup':>8}")
+    for num_barbers in [int(n) for n in args.barbers.split(",")]:
+        shared = measure(num_barbers, args.records, per_thread=False)
+        local = measure(num_barbers, args.records, per_thread=True)
+        print(f"{num_barbers:8} {shared:12.0f}/s {local:12.0f}/s {local / shared:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,4 +20,5 @@ WAITING_ROOM_SIZE = 5               # Size of the waiting room / the queue
 NUM_BARBERS = 4                     # Number of barbers serving customers in parallel
 HOURLY_WAGES = 13                   # Hourly wage for each barber
 
-
+# Display settings
+MAX_FPS = 10                        # Maximum redraws per second of the live display
@@ -0,0 +1,408 @@
+"""
+Customer arrival processes for the event-calendar engine.
+
+An arrival process produces the arrival times of one shop over a simulated
+horizon. BernoulliArrivals is the classic per-minute arrival coin (at most one
+customer per minute, constant rate). PoissonArrivals draws a non-homogeneous
+Poisson process from a rate profile, so several customers may arrive in the
+same minute and the rate can follow a lunch peak or an after-work rush:
+
+    PiecewiseRate     constant rate per segment, e.g. one rate per opening hour
+    WeeklyRate        a weekday and a weekend daily profile, alternating over the week
+    ContinuousRate    any rate function of time, bounded by a maximum rate
+
+Rates are in customers per minute. With NumPy, arrivals are drawn in
+vectorized batches: piecewise profiles by drawing the count of every constant
+segment and placing the arrivals uniformly within it (exact inversion of the
+cumulative rate), continuous profiles by thinning a homogeneous process at the
+maximum rate. Without NumPy the same processes are drawn one arrival at a time.
+
+Processes and profiles are plain picklable objects, so they can be passed as
+simulation parameters to replication and sweep workers (ContinuousRate only
+if its rate function is a module-level function).
+"""
+
+import bisect
+import random
+from config import CUSTOMER_ARRIVAL_RATE
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batch generation
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class PiecewiseRate:
+    """
+    Arrival rate that is constant within consecutive segments and repeats with a period.
+
+    Attributes:
+        starts (list of float): Start minute of every segment within the period.
+        rates (list of float): Arrival rate of every segment, in customers per minute.
+        period (float): Length of the profile in minutes, after which it repeats.
+        max_rate (float): Highest rate of the profile.
+    """
+
+    def __init__(self, rates, segment_minutes=60, period=None):
+        """
+        Initialize the profile.
+
+        Args:
+            rates (list of float): Arrival rate of every segment, in customers per minute.
+            segment_minutes (float or list of float, optional): Length of every segment,
+                                                                or one length for all. Defaults to an hour.
+            period (float, optional): Length of the repeating profile. Defaults to the sum of the segments.
+        """
+        if isinstance(segment_minutes, (int, float)):
+            segment_minutes = [segment_minutes] * len(rates)
+        if len(segment_minutes) != len(rates):
+            raise ValueError("PiecewiseRate needs one segment length per rate")
+
+        self.rates = [float(rate) for rate in rates]
+        self.starts = []
+        start = 0
+        for length in segment_minutes:
+            self.starts.append(start)
+            start += length
+        self.period = period if period is not None else start
+        self.max_rate = max(self.rates)
+        self._ends = self.starts[1:] + [start]
+
+    @classmethod
+    def hourly(cls, hourly_rates):
+        """
+        Build a profile from customers per hour, one value per hour.
+
+        Args:
+            hourly_rates (list of float): Expected customers in each hour.
+
+        Returns:
+            PiecewiseRate: Profile with one-hour segments.
+        """
+        return cls([rate / 60 for rate in hourly_rates], segment_minutes=60)
+
+    def rate(self, time):
+        """Return the arrival rate at `time`, in customers per minute."""
+        offset = time % self.period
+        index = bisect.bisect_right(self.starts, offset) - 1
+        return self.rates[index] if offset < self._ends[index] else 0.0
+
+    def pieces(self, start, end):
+        """
+        Split [start, end) into intervals of constant rate.
+
+        Args:
+            start (float): Start of the horizon in minutes.
+            end (float): End of the horizon in minutes.
+
+        Yields:
+            tuple: (piece_start, piece_end, rate) for every interval.
+        """
+        cycle = start // self.period * self.period
+        while cycle < end:
+            for seg_start, seg_end, rate in zip(self.starts, self._ends, self.rates):
+                low = max(cycle + seg_start, start)
+                high = min(cycle + seg_end, end)
+                if low < high:
+                    yield low, high, rate
+            cycle += self.period
+
+
+class WeeklyRate:
+    """
+    Arrival rate following a weekday profile from Monday to Friday and a weekend profile on
+    Saturday and Sunday. Day 0 of the simulation is a Monday.
+
+    Attributes:
+        weekday (PiecewiseRate): Daily profile of weekdays.
+        weekend (PiecewiseRate): Daily profile of weekends.
+        day_minutes (float): Length of a simulated day in minutes.
+        max_rate (float): Highest rate of either profile.
+    """
+
+    def __init__(self, weekday, weekend, day_minutes=MINUTES_PER_DAY):
+        """
+        Initialize the profile.
+
+        Args:
+            weekday (PiecewiseRate): Daily profile of weekdays, starting at the beginning of the day.
+            weekend (PiecewiseRate): Daily profile of weekends, starting at the beginning of the day.
+            day_minutes (float, optional): Length of a simulated day. Defaults to 24 hours.
+        """
+        self.weekday = weekday
+        self.weekend = weekend
+        self.day_minutes = day_minutes
+        self.max_rate = max(weekday.max_rate, weekend.max_rate)
+
+    def _profile(self, day):
+        return self.weekend if day % 7 >= 5 else self.weekday
+
+    def rate(self, time):
+        """Return the arrival rate at `time`, in customers per minute."""
+        day, offset = divmod(time, self.day_minutes)
+        profile = self._profile(int(day))
+        return profile.rate(offset) if offset < profile.period else 0.0
+
+    def pieces(self, start, end):
+        """
+        Split [start, end) into intervals of constant rate.
+
+        Args:
+            start (float): Start of the horizon in minutes.
+            end (float): End of the horizon in minutes.
+
+        Yields:
+            tuple: (piece_start, piece_end, rate) for every interval.
+        """
+        day = int(start // self.day_minutes)
+        while day * self.day_minutes < end:
+            day_start = day * self.day_minutes
+            profile = self._profile(day)
+            day_end = day_start + min(profile.period, self.day_minutes)
+            for low, high, rate in profile.pieces(max(start, day_start) - day_start,
+                                                  min(end, day_end) - day_start):
+                yield day_start + low, day_start + high, rate
+            day += 1
+
+
+class ContinuousRate:
+    """
+    Arrival rate given by a function of time, drawn by thinning.
+
+    Attributes:
+        function (callable): Rate in customers per minute as a function of the minute. With NumPy
+                             it is called with arrays of times, so it should use NumPy operations.
+        max_rate (float): Upper bound of the rate, used as the rate of the thinned process.
+    """
+
+    def __init__(self, function, max_rate):
+        """
+        Initialize the profile.
+
+        Args:
+            function (callable): Rate function of time.
+            max_rate (float): Upper bound of the function over the simulated horizon.
+        """
+        self.function = function
+        self.max_rate = max_rate
+
+    def rate(self, time):
+        """Return the arrival rate at `time`, in customers per minute."""
+        return self.function(time)
+
+
+class BernoulliArrivals:
+    """
+    The per-minute arrival coin: a customer arrives at the start of a minute with probability `rate`.
+
+    Attributes:
+        rate (float): Probability of a customer arriving per minute.
+    """
+
+    def __init__(self, rate=CUSTOMER_ARRIVAL_RATE):
+        """
+        Initialize the process.
+
+        Args:
+            rate (float, optional): Probability of a customer arriving per minute. Defaults to CUSTOMER_ARRIVAL_RATE.
+        """
+        self.rate = rate
+
+    def times(self, horizon, rng=None):
+        """
+        Lazily draw the arrival times of one run.
+
+        The coin of each minute is flipped from the `random` module only when the
+        previous arrival has been consumed, as the simulation always did.
+
+        Args:
+            horizon (float): Minutes during which customers may arrive.
+            rng (random.Random or RandomStream, optional): Random generator flipping the
+                                                           coins instead of the `random` module.
+
+        Returns:
+            BernoulliTimes: Iterator over the arrival minutes, in increasing order.
+        """
+        return BernoulliTimes(self.rate, horizon, rng)
+
+
+class BernoulliTimes:
+    """
+    Picklable iterator over the arrival minutes of a BernoulliArrivals run.
+
+    Attributes:
+        rate (float): Probability of a customer arriving per minute.
+        horizon (float): Minutes during which customers may arrive.
+        minute (int): Next minute whose coin is flipped.
+        rng (random.Random or RandomStream): Random generator, None for the `random` module.
+    """
+
+    def __init__(self, rate, horizon, rng=None):
+        self.rate = rate
+        self.horizon = horizon
+        self.minute = 0
+        self.rng = rng
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        flip = (self.rng or random).random
+        while self.minute < self.horizon:
+            minute = self.minute
+            self.minute += 1
+            if flip() < self.rate:
+                return minute
+        raise StopIteration
+
+    def reseed(self):
+        """Nothing to do: the coins are flipped from the `random` module or a stream reseeded with it."""
+
+
+class PoissonArrivals:
+    """
+    Non-homogeneous Poisson arrivals following a rate profile.
+
+    Attributes:
+        profile (PiecewiseRate, WeeklyRate or ContinuousRate): Arrival rate over time.
+        block_minutes (float): Minutes of arrivals drawn per vectorized batch.
+    """
+
+    def __init__(self, profile=CUSTOMER_ARRIVAL_RATE, block_minutes=MINUTES_PER_DAY):
+        """
+        Initialize the process.
+
+        Args:
+            profile (float or rate profile, optional): Rate profile, or a constant rate in
+                                                       customers per minute. Defaults to CUSTOMER_ARRIVAL_RATE.
+            block_minutes (float, optional): Minutes of arrivals drawn per batch. Defaults to a day.
+        """
+        if isinstance(profile, (int, float)):
+            profile = PiecewiseRate([profile], segment_minutes=MINUTES_PER_DAY)
+        self.profile = profile
+        self.block_minutes = block_minutes
+
+    def times(self, horizon, rng=None):
+        """
+        Lazily draw the arrival times of one run, one block at a time.
+
+        The random generator is seeded from the `random` module when the first
+        arrival is requested, so seeding `random` makes runs reproducible.
+
+        Args:
+            horizon (float): Minutes during which customers may arrive.
+            rng (random.Random or RandomStream, optional): Random generator seeding the
+                                                           arrivals instead of the `random` module.
+
+        Returns:
+            PoissonTimes: Iterator over the arrival times in minutes, in increasing order.
+        """
+        return PoissonTimes(self, horizon, rng)
+
+    def draw_block(self, rng, start, end):
+        """
+        Draw the arrivals of [start, end) in one vectorized batch.
+
+        Args:
+            rng (numpy.random.Generator): Random generator.
+            start (float): Start of the block in minutes.
+            end (float): End of the block in minutes.
+
+        Returns:
+            numpy.ndarray: Sorted arrival times.
+        """
+        if hasattr(self.profile, "pieces"):
+            return self._draw_pieces(rng, start, end)
+        return self._draw_thinned(rng, start, end)
+
+    def _draw_pieces(self, rng, start, end):
+        """Draw every constant-rate piece of [start, end) at once: Poisson counts, uniform times."""
+        pieces = np.array(list(self.profile.pieces(start, end)), dtype=np.float64).reshape(-1, 3)
+        lows, lengths = pieces[:, 0], pieces[:, 1] - pieces[:, 0]
+        counts = rng.poisson(pieces[:, 2] * lengths)
+        times = np.repeat(lows, counts) + rng.random(counts.sum()) * np.repeat(lengths, counts)
+        times.sort()
+        return times
+
+    def _draw_thinned(self, rng, start, end):
+        """Draw a homogeneous process at the maximum rate over [start, end) and thin it to the profile."""
+        count = rng.poisson(self.profile.max_rate * (end - start))
+        times = start + rng.random(count) * (end - start)
+        times.sort()
+        keep = rng.random(count) * self.profile.max_rate < self.profile.rate(times)
+        return times[keep]
+
+
+class PoissonTimes:
+    """
+    Picklable iterator over the arrival times of a PoissonArrivals run.
+
+    With NumPy, arrivals are drawn a block at a time; without it, one at a time by
+    thinning with the `random` module.
+
+    Attributes:
+        process (PoissonArrivals): The arrival process.
+        horizon (float): Minutes during which customers may arrive.
+        last (float): Last arrival time returned (0 before the first).
+        rng (random.Random or RandomStream): Random generator, None for the `random` module.
+    """
+
+    def __init__(self, process, horizon, rng=None):
+        self.process = process
+        self.horizon = horizon
+        self.last = 0
+        self.rng = rng
+        self._rng = None
+        self._block = []
+        self._index = 0
+        self._block_end = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if np is None:
+            return self._next_stdlib()
+
+        if self._rng is None:
+            self._rng = np.random.default_rng((self.rng or random).getrandbits(64))
+        while self._index >= len(self._block):
+            if self._block_end >= self.horizon:
+                raise StopIteration
+            start = self._block_end
+            self._block_end = min(start + self.process.block_minutes, self.horizon)
+            self._block = self.process.draw_block(self._rng, start, self._block_end).tolist()
+            self._index = 0
+
+        self.last = self._block[self._index]
+        self._index += 1
+        return self.last
+
+    def _next_stdlib(self):
+        """Thinning one arrival at a time, for when NumPy is not installed."""
+        profile = self.process.profile
+        if profile.max_rate <= 0:
+            raise StopIteration
+        rng = self.rng or random
+        time = self.last
+        while True:
+            time += rng.expovariate(profile.max_rate)
+            if time >= self.horizon:
+                self.last = time
+                raise StopIteration
+            if rng.random() * profile.max_rate < profile.rate(time):
+                self.last = time
+                return time
+
+    def reseed(self):
+        """
+        Draw the arrivals after the last one returned from a new generator, seeded from
+        the `random` module or the stream given to times(). Used to branch simulations
+        forked from a snapshot.
+        """
+        self._rng = None
+        self._block = []
+        self._index = 0
+        self._block_end = self.last
@@ -1,6 +1,7 @@
 import random
 import os
-from utils.csv_to_bin import read_bin_to_list, FMT
+from utils.csv_to_bin import FMT
+from utils.name_store import NameStore
 from models.customer import Customer
 
 class CustomerGenerator:
@@ -8,7 +9,7 @@ class CustomerGenerator:
     Generates Customer Generator instances for the barbershop simulation.
 
     Attributes:
-        names (list of str): List of customer names loaded from a binary file.
+        names (NameStore): Memory-mapped customer names, shared by all generators using the same file.
     """
 
     def __init__(self, names_file=None):
@@ -21,26 +22,30 @@ class CustomerGenerator:
         """
         if names_file is None:
             names_file = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "customer_data", "names.bin"))
-        self.names = read_bin_to_list(names_file, FMT)
+        self.names = NameStore.shared(names_file, FMT)
 
-    def generate_customer(self):
+    def generate_customer(self, rng=random):
         """
         Generate a single random Customer.
 
+        Args:
+            rng (random.Random, optional): Random generator. Defaults to the `random` module.
+
         Returns:
             Customer: A new Customer instance with a randomly chosen name.
         """
-        name = random.choice(self.names)
-        return Customer(name)
+        name_index = rng.randrange(len(self.names))
+        return Customer(self.names[name_index], name_index)
 
-    def generate_customers(self, number_of_customers):
+    def generate_customers(self, number_of_customers, rng=random):
         """
         Generate multiple random Customers.
 
         Args:
             number_of_customers (int): Number of customers to generate.
+            rng (random.Random, optional): Random generator. Defaults to the `random` module.
 
         Returns:
             list of Customer: List containing the generated Customer instances.
         """
-        return [self.generate_customer() for _ in range(number_of_customers)]
+        return [self.generate_customer(rng) for _ in range(number_of_customers)]
@@ -1,8 +1,71 @@
 import random
+from config import CUSTOMER_ARRIVAL_RATE
+from models.customer import Customer
 from models.order import Order
-from models.haircut import Haircut
+from models.haircut import HAIRCUTS
 from generator.customer_generator import CustomerGenerator
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for batch generation
+    np = None
+
+if np is not None:
+    # Layout of a batch of orders: one record per customer
+    ORDER_DTYPE = np.dtype([
+        ("arrival_time", np.float64),   # simulation minute of arrival
+        ("haircut", np.uint8),          # index into HAIRCUTS
+        ("duration", np.int32),         # haircut duration in minutes
+        ("name_index", np.int32),       # index into the customer name table
+    ])
+    BASE_DURATIONS = np.array([haircut.base_duration for haircut in HAIRCUTS], dtype=np.float64)
+
+ITER_CHUNK = 65536  # records converted to Python values at a time while iterating an OrderBatch
+
+
+class OrderBatch:
+    """
+    Read-only sequence of orders backed by a batch of order records (see OrderGenerator.generate_order_batch()).
+
+    An Order is built from its record only when it is accessed, so creating the
+    sequence costs no more than drawing the batch, and orders a caller never
+    touches are never built. Every access builds a new Order: changes to an
+    order are not kept in the batch.
+
+    Attributes:
+        records (numpy.ndarray): Structured array of the orders (see ORDER_DTYPE).
+    """
+
+    def __init__(self, records, names):
+        """
+        Wrap a batch of order records.
+
+        Args:
+            records (numpy.ndarray): Structured array of the orders (see ORDER_DTYPE).
+            names (NameStore): Customer name table the name indices point into.
+        """
+        self.records = records
+        self._names = names
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return OrderBatch(self.records[index], self._names)
+        arrival_time, haircut, duration, name_index = self.records[index].item()
+        return Order(Customer(self._names[name_index], name_index), HAIRCUTS[haircut], arrival_time, duration)
+
+    def __iter__(self):
+        names = self._names
+        for start in range(0, len(self.records), ITER_CHUNK):
+            chunk = self.records[start:start + ITER_CHUNK]
+            for arrival_time, haircut, duration, name_index in zip(
+                chunk["arrival_time"].tolist(), chunk["haircut"].tolist(),
+                chunk["duration"].tolist(), chunk["name_index"].tolist()
+            ):
+                yield Order(Customer(names[name_index], name_index), HAIRCUTS[haircut], arrival_time, duration)
+
 
 class OrderGenerator:
     """
@@ -18,25 +81,95 @@ class OrderGenerator:
         """
         self.customer_gen = CustomerGenerator()
 
-    def generate_order(self):
+    def generate_order(self, streams=None):
         """
         Generate a single random order.
 
+        Args:
+            streams (RandomStreams, optional): Per-source random streams (see generator.random_streams).
+                                               The `random` module is used if omitted.
+
         Returns:
             Order: A new Order instance with a random customer and haircut type.
         """
-        customer = self.customer_gen.generate_customer()
-        haircut = random.choice(list(Haircut))
-        return Order(customer, haircut)
+        if streams is None:
+            customer = self.customer_gen.generate_customer()
+            haircut = random.choice(HAIRCUTS)
+            return Order(customer, haircut)
+
+        customer = self.customer_gen.generate_customer(streams.names)
+        haircut = streams.haircuts.choice(HAIRCUTS)
+        return Order(customer, haircut, duration=Order.random_duration(haircut, streams.durations))
+
+    def generate_batch(self, count, arrival_rate=CUSTOMER_ARRIVAL_RATE, start_time=0, rng=None):
+        """
+        Draw a batch of orders as a NumPy structured array (see ORDER_DTYPE).
+
+        Arrivals follow the same per-minute arrival coin as the simulation: the gaps
+        between arrivals are geometric with success probability `arrival_rate`.
+        Durations use the same ±Order.TIME_VARIANCE uniform spread as Order.random_duration().
+
+        Args:
+            count (int): Number of orders to draw.
+            arrival_rate (float): Probability of a customer arriving per minute.
+            start_time (int): First minute at which a customer may arrive.
+            rng (numpy.random.Generator, optional): Random generator. Seeded from the
+                                                    `random` module if omitted.
+
+        Returns:
+            numpy.ndarray: Structured array of `count` orders, sorted by arrival time.
+        """
+        if np is None:
+            raise ImportError("OrderGenerator.generate_batch() requires NumPy")
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+
+        batch = np.empty(count, dtype=ORDER_DTYPE)
+
+        # Geometric gaps by inversion of exponentials: much faster than rng.geometric()
+        gaps = rng.standard_exponential(count)
+        with np.errstate(divide="ignore"):  # arrival_rate == 1 gives gaps of exactly one minute
+            gaps /= -np.log1p(-arrival_rate)
+        np.floor(gaps, out=gaps)
+        gaps += 1
+        np.cumsum(gaps, out=gaps)
+        batch["arrival_time"] = gaps + (start_time - 1)
+
+        haircuts = rng.integers(0, len(HAIRCUTS), count, dtype=np.uint8)
+        batch["haircut"] = haircuts
+
+        base = BASE_DURATIONS[haircuts]
+        spread = 1 + Order.TIME_VARIANCE * (2 * rng.random(count) - 1)
+        batch["duration"] = base * spread  # truncates like int() in Order.random_duration()
+
+        batch["name_index"] = rng.integers(0, len(self.customer_gen.names), count)
+        return batch
 
     def generate_orders(self, count):
         """
         Generate multiple random orders.
 
+        With NumPy, the orders are drawn by generate_batch() and built from the batch
+        (with its arrival times); without it, they are drawn one at a time.
+
         Args:
             count (int): Number of orders to generate.
 
         Returns:
-            list of Order: List containing the generated orders.
+            list of Order: The generated orders.
+        """
+        if np is None:
+            return [self.generate_order() for _ in range(count)]
+        return list(self.generate_order_batch(count))
+
+    def generate_order_batch(self, count):
+        """
+        Draw orders with generate_batch() as a lazy OrderBatch, which builds each Order only when it is accessed.
+
+        Args:
+            count (int): Number of orders to draw.
+
+        Returns:
+            OrderBatch: Read-only sequence of the drawn orders.
         """
-        return [self.generate_order() for _ in range(count)]
+        return OrderBatch(self.generate_batch(count), self.customer_gen.names)
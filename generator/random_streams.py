@@ -0,0 +1,161 @@
+"""
+Independent, seedable random number streams per source of randomness.
+
+By default every draw of a run comes from the global `random` module, so the
+draws of different sources interleave: one extra arrival shifts the haircut,
+duration and name of every later customer, and anything else drawing from
+`random` changes the run. A RandomStreams object gives each source its own
+stream instead:
+
+    arrivals     arrival coins (or the seed of a Poisson arrival process)
+    haircuts     haircut mix
+    durations    haircut durations
+    names        customer names
+    service      seeds of the barbers' service-time samplers (see generator.service_time)
+
+The k-th customer then gets the k-th haircut, duration and name draw whatever
+happens elsewhere, so two configurations run with the same seed see identical
+customers (common random numbers) and their difference has far less variance
+than the difference of two independent runs.
+
+Each stream is a plain uniform source pre-generated in blocks (NumPy's
+Generator when available, else random.Random; the two give different, equally
+reproducible streams). Streams offer the subset of the random.Random API the
+generators use, so they can be passed wherever an `rng` is accepted.
+"""
+
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy only speeds up drawing the blocks
+    np = None
+
+SOURCES = ("arrivals", "haircuts", "durations", "names", "service")
+BLOCK_SIZE = 4096  # uniforms drawn per block
+
+
+class RandomStream:
+    """
+    One independent stream of uniform random numbers, drawn in blocks.
+
+    Attributes:
+        seed (int): Seed of the stream.
+        block_size (int): Uniforms drawn per block.
+    """
+
+    def __init__(self, seed, block_size=BLOCK_SIZE):
+        """
+        Initialize the stream.
+
+        Args:
+            seed (int): Seed of the stream.
+            block_size (int, optional): Uniforms drawn per block. Defaults to BLOCK_SIZE.
+        """
+        self.block_size = block_size
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        """
+        Restart the stream from a new seed.
+
+        Args:
+            seed (int): New seed of the stream.
+        """
+        self.seed = seed
+        self._generator = np.random.default_rng(seed) if np is not None else random.Random(seed)
+        self._block = []
+        self._index = 0
+
+    def random(self):
+        """Return the next uniform number in [0, 1)."""
+        if self._index >= len(self._block):
+            if np is not None:
+                self._block = self._generator.random(self.block_size).tolist()
+            else:
+                draw = self._generator.random
+                self._block = [draw() for _ in range(self.block_size)]
+            self._index = 0
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def uniform(self, a, b):
+        """Return a uniform number between a and b, like random.uniform()."""
+        return a + (b - a) * self.random()
+
+    def randrange(self, stop):
+        """Return a uniform integer in [0, stop)."""
+        return int(self.random() * stop)
+
+    def choice(self, sequence):
+        """Return a uniformly chosen element of a non-empty sequence."""
+        return sequence[self.randrange(len(sequence))]
+
+    def expovariate(self, rate):
+        """Return an exponentially distributed number with the given rate."""
+        return -math.log(1.0 - self.random()) / rate
+
+    def gauss(self, mu, sigma):
+        """Return a normally distributed number (Box-Muller, two uniforms per draw)."""
+        radius = math.sqrt(-2.0 * math.log(1.0 - self.random()))
+        return mu + sigma * radius * math.cos(2.0 * math.pi * self.random())
+
+    def getrandbits(self, bits):
+        """Return an integer with `bits` random bits, e.g. to seed another generator."""
+        value = 0
+        for _ in range(0, bits, 32):
+            value = (value << 32) | int(self.random() * (1 << 32))
+        return value >> (-bits % 32)
+
+
+class RandomStreams:
+    """
+    One RandomStream per source of randomness, all derived from a single seed.
+
+    Attributes:
+        seed (int): Seed the streams are derived from.
+        arrivals (RandomStream): Stream of the arrival process.
+        haircuts (RandomStream): Stream of the haircut mix.
+        durations (RandomStream): Stream of the haircut durations.
+        names (RandomStream): Stream of the customer names.
+        service (RandomStream): Stream seeding the barbers' service-time samplers.
+    """
+
+    def __init__(self, seed, block_size=BLOCK_SIZE):
+        """
+        Initialize the streams.
+
+        Args:
+            seed (int): Seed the streams are derived from.
+            block_size (int, optional): Uniforms drawn per block. Defaults to BLOCK_SIZE.
+        """
+        self.seed = seed
+        for source in SOURCES:
+            setattr(self, source, RandomStream(source_seed(seed, source), block_size))
+
+    def reseed(self, seed):
+        """
+        Restart every stream from seeds derived from a new seed.
+
+        Args:
+            seed (int): New seed the streams are derived from.
+        """
+        self.seed = seed
+        for source in SOURCES:
+            getattr(self, source).reseed(source_seed(seed, source))
+
+
+def source_seed(seed, source):
+    """
+    Derive the seed of one source's stream.
+
+    Args:
+        seed (int): Seed of the run.
+        source (str): Name of the source, e.g. "haircuts".
+
+    Returns:
+        int: 64-bit seed, the same on every platform and Python version.
+    """
+    return random.Random(f"{seed}/{source}").getrandbits(64)
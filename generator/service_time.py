@@ -0,0 +1,278 @@
+"""
+Service-time distributions for haircut durations.
+
+A distribution draws duration factors: a haircut takes its base duration (scaled
+by the barber's speed, see models.skill) times a factor. Factors of the
+parametric distributions have mean 1, so they only change the spread:
+
+    UniformTime      uniform over 1 ± variance, the spread of Order.random_duration()
+    LognormalTime    lognormal with a given coefficient of variation (long right tail)
+    GammaTime        gamma with a given coefficient of variation
+    EmpiricalTime    histogram of factors observed in real service logs
+
+Factors are drawn in vectorized blocks by a DurationSampler and handed out one
+at a time, so drawing a service time is O(1) on the assignment hot path.
+"""
+
+import bisect
+import math
+import random
+from threading import Lock
+from models.haircut import HAIRCUTS
+from models.order import Order
+
+try:
+    import numpy as np
+except ImportError:  # NumPy only speeds up drawing the blocks
+    np = None
+
+BLOCK_SIZE = 4096  # factors drawn per block
+
+
+class UniformTime:
+    """
+    Uniform factors over 1 ± variance, as drawn by Order.random_duration().
+
+    Attributes:
+        variance (float): Maximum relative deviation from the base duration.
+    """
+
+    def __init__(self, variance=Order.TIME_VARIANCE):
+        """
+        Initialize the distribution.
+
+        Args:
+            variance (float, optional): Maximum relative deviation. Defaults to Order.TIME_VARIANCE.
+        """
+        self.variance = variance
+
+    def draw(self, rng, count):
+        """Draw `count` factors with a numpy.random.Generator."""
+        return 1 + self.variance * (2 * rng.random(count) - 1)
+
+    def draw_one(self, rng):
+        """Draw a single factor with a random.Random."""
+        return 1 + self.variance * (2 * rng.random() - 1)
+
+
+class LognormalTime:
+    """
+    Lognormal factors with mean 1.
+
+    Attributes:
+        cv (float): Coefficient of variation (standard deviation over mean) of the durations.
+    """
+
+    def __init__(self, cv=0.3):
+        """
+        Initialize the distribution.
+
+        Args:
+            cv (float, optional): Coefficient of variation of the durations. Defaults to 0.3.
+        """
+        self.cv = cv
+        self._sigma = math.sqrt(math.log1p(cv * cv))
+        self._mu = -self._sigma ** 2 / 2
+
+    def draw(self, rng, count):
+        """Draw `count` factors with a numpy.random.Generator."""
+        return rng.lognormal(self._mu, self._sigma, count)
+
+    def draw_one(self, rng):
+        """Draw a single factor with a random.Random."""
+        return rng.lognormvariate(self._mu, self._sigma)
+
+
+class GammaTime:
+    """
+    Gamma factors with mean 1.
+
+    Attributes:
+        cv (float): Coefficient of variation (standard deviation over mean) of the durations.
+    """
+
+    def __init__(self, cv=0.3):
+        """
+        Initialize the distribution.
+
+        Args:
+            cv (float, optional): Coefficient of variation of the durations. Defaults to 0.3.
+        """
+        self.cv = cv
+        self._shape = 1 / (cv * cv)
+        self._scale = cv * cv
+
+    def draw(self, rng, count):
+        """Draw `count` factors with a numpy.random.Generator."""
+        return rng.gamma(self._shape, self._scale, count)
+
+    def draw_one(self, rng):
+        """Draw a single factor with a random.Random."""
+        return rng.gammavariate(self._shape, self._scale)
+
+
+class EmpiricalTime:
+    """
+    Factors following a histogram, e.g. fitted from logged service times.
+
+    A factor is drawn by picking a bin with probability proportional to its count,
+    then a uniform point within the bin.
+
+    Attributes:
+        edges (list of float): Bin edges, one more than there are bins.
+        counts (list of float): Count (or weight) of every bin.
+    """
+
+    def __init__(self, edges, counts):
+        """
+        Initialize the distribution.
+
+        Args:
+            edges (list of float): Increasing bin edges.
+            counts (list of float): Count of every bin.
+
+        Raises:
+            ValueError: If the edges and counts do not match or every count is zero.
+        """
+        if len(edges) != len(counts) + 1 or not sum(counts):
+            raise ValueError("an empirical distribution needs len(counts) + 1 edges and a non-zero count")
+        self.edges = [float(edge) for edge in edges]
+        self.counts = [float(count) for count in counts]
+        total = sum(self.counts)
+        self._cumulative = []
+        running = 0
+        for count in self.counts:
+            running += count
+            self._cumulative.append(running / total)
+        self._cumulative[-1] = 1.0
+
+    @classmethod
+    def fit(cls, haircut_codes, durations, bins=20):
+        """
+        Fit the histogram of observed durations relative to their haircut's base duration.
+
+        Args:
+            haircut_codes (iterable of int): Haircut code of every observation (see Haircut.code).
+            durations (iterable of float): Observed service time of every observation in minutes.
+            bins (int, optional): Number of equal-width bins. Defaults to 20.
+
+        Returns:
+            EmpiricalTime: The fitted distribution.
+
+        Raises:
+            ValueError: If there are no observations.
+        """
+        factors = [duration / HAIRCUTS[code].base_duration for code, duration in zip(haircut_codes, durations)]
+        if not factors:
+            raise ValueError("cannot fit an empirical distribution without observations")
+        low, high = min(factors), max(factors)
+        if high == low:
+            high = low + 1e-9
+        width = (high - low) / bins
+        counts = [0] * bins
+        for factor in factors:
+            counts[min(int((factor - low) / width), bins - 1)] += 1
+        return cls([low + i * width for i in range(bins)] + [high], counts)
+
+    @classmethod
+    def from_order_log(cls, order_log, bins=20):
+        """
+        Fit the distribution to the service times of an OrderLog.
+
+        Args:
+            order_log (OrderLog): Log of served orders.
+            bins (int, optional): Number of equal-width bins. Defaults to 20.
+
+        Returns:
+            EmpiricalTime: The fitted distribution.
+        """
+        durations = (end - start for start, end in zip(order_log.start_time, order_log.end_time))
+        return cls.fit(order_log.haircut, durations, bins)
+
+    @property
+    def mean(self):
+        """float: Mean factor of the histogram."""
+        total = sum(self.counts)
+        return sum(count * (low + high) / 2 for count, low, high
+                   in zip(self.counts, self.edges, self.edges[1:])) / total
+
+    def draw(self, rng, count):
+        """Draw `count` factors with a numpy.random.Generator."""
+        edges = np.asarray(self.edges)
+        bins = np.searchsorted(np.asarray(self._cumulative), rng.random(count), side="right")
+        np.minimum(bins, len(self.counts) - 1, out=bins)
+        return edges[bins] + rng.random(count) * (edges[bins + 1] - edges[bins])
+
+    def draw_one(self, rng):
+        """Draw a single factor with a random.Random."""
+        index = min(bisect.bisect_right(self._cumulative, rng.random()), len(self.counts) - 1)
+        low, high = self.edges[index], self.edges[index + 1]
+        return low + rng.random() * (high - low)
+
+
+class DurationSampler:
+    """
+    Hands out the factors of one distribution one at a time, drawn in vectorized blocks.
+
+    The generator is seeded from the `random` module (or the given rng) when the
+    first factor is drawn, so seeding `random` makes runs reproducible. Barbers
+    with the same profile share a sampler, so in threaded mode several barber
+    threads draw from it at once; next() takes a lock around the refill and the
+    index step.
+
+    Attributes:
+        distribution (object): Distribution the factors are drawn from.
+        block_size (int): Factors drawn per block.
+        rng (random.Random or RandomStream): Source of the seed, None for the `random` module.
+    """
+
+    def __init__(self, distribution, block_size=BLOCK_SIZE, rng=None):
+        """
+        Initialize the sampler.
+
+        Args:
+            distribution (object): Distribution with draw() and draw_one() methods.
+            block_size (int, optional): Factors drawn per block. Defaults to BLOCK_SIZE.
+            rng (random.Random or RandomStream, optional): Source of the seed. Defaults to the `random` module.
+        """
+        self.distribution = distribution
+        self.block_size = block_size
+        self.rng = rng
+        self._lock = Lock()
+        self._generator = None
+        self._block = []
+        self._index = 0
+
+    def next(self):
+        """Return the next factor."""
+        with self._lock:
+            if self._index >= len(self._block):
+                if self._generator is None:
+                    seed = (self.rng or random).getrandbits(64)
+                    self._generator = np.random.default_rng(seed) if np is not None else random.Random(seed)
+                if np is not None:
+                    self._block = self.distribution.draw(self._generator, self.block_size).tolist()
+                else:
+                    draw = self.distribution.draw_one
+                    self._block = [draw(self._generator) for _ in range(self.block_size)]
+                self._index = 0
+            factor = self._block[self._index]
+            self._index += 1
+            return factor
+
+    def reseed(self):
+        """Drop the drawn factors, so the next factor comes from a generator seeded anew from the rng."""
+        with self._lock:
+            self._generator = None
+            self._block = []
+            self._index = 0
+
+    def __getstate__(self):
+        # The lock cannot be pickled; it is recreated when unpickling
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
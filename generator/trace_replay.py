@@ -0,0 +1,378 @@
+"""
+Replay recorded customer arrivals instead of synthesizing them.
+
+A trace is a sequence of check-ins: arrival timestamp, service type and
+optionally the actual service duration. Traces are read either from a CSV
+file (timestamp, service[, duration]) or from a fixed-width binary file in the
+style of utils/csv_to_bin.py, where every record is TRACE_FMT:
+
+    arrival_time   float64   minutes since the start of the trace
+    haircut        uint8     Haircut.code of the service
+    (padding)      3 bytes
+    duration       int32     service minutes, or -1 to draw it like a generated order
+
+Both readers stream the file in chunks, so a trace of any size is replayed in
+constant memory. Service names are matched onto Haircut members by member name
+("NORMAL_WASH") or label ("Haircut + Wash"), case-insensitively, plus any
+extra aliases passed as a service map.
+
+Convert a CSV trace to the binary format once, then replay the binary file:
+
+    python -m generator.trace_replay convert checkins.csv checkins.trace
+    python -m generator.trace_replay replay checkins.trace --barbers 4 --waiting-room 5
+"""
+
+import argparse
+import csv
+import heapq
+import itertools
+import math
+import os
+import struct
+from datetime import datetime
+from models.customer import Customer
+from models.haircut import Haircut, HAIRCUTS
+from models.order import Order
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for read_batches()
+    np = None
+
+# Fixed-size format of one binary trace record (16 bytes)
+TRACE_FMT = "<dB3xi"
+TRACE_RECORD_SIZE = struct.calcsize(TRACE_FMT)
+
+if np is not None:
+    TRACE_DTYPE = np.dtype([
+        ("arrival_time", "<f8"),
+        ("haircut", "u1"),
+        ("padding", "V3"),
+        ("duration", "<i4"),
+    ])
+
+CHUNK_RECORDS = 65536  # records read per chunk
+
+# Replayed customers are anonymous: the trace only tells when and what
+TRACE_CUSTOMER = Customer("Trace customer")
+
+
+def service_lookup(service_map=None):
+    """
+    Build the table used to map service names of a trace onto Haircut members.
+
+    Args:
+        service_map (dict, optional): Extra service names mapped to Haircut members or member names.
+
+    Returns:
+        dict: Lower-cased service name mapped to Haircut member.
+    """
+    lookup = {}
+    for haircut in Haircut:
+        lookup[haircut.name.lower()] = haircut
+        lookup[haircut.label.lower()] = haircut
+    for name, haircut in (service_map or {}).items():
+        lookup[name.strip().lower()] = haircut if isinstance(haircut, Haircut) else Haircut[haircut]
+    return lookup
+
+
+def parse_timestamp(text):
+    """
+    Parse a trace timestamp.
+
+    Args:
+        text (str): Minutes as a number, or an ISO 8601 date and time.
+
+    Returns:
+        float or datetime: Minutes, or the parsed date and time.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.strip())
+
+
+def read_csv_trace(file, service_map=None):
+    """
+    Stream the records of a CSV trace.
+
+    Rows are `timestamp, service[, duration]`. Timestamps are minutes, or ISO dates,
+    which are converted to minutes since the first record. A header row is skipped.
+
+    Args:
+        file (str): Path to the CSV file.
+        service_map (dict, optional): Extra service names mapped to Haircut members.
+
+    Yields:
+        tuple: (arrival_time, haircut code, duration or -1) per record.
+    """
+    lookup = service_lookup(service_map)
+    origin = None
+    with open(file, "r", newline="") as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            if not row:
+                continue
+            try:
+                timestamp = parse_timestamp(row[0])
+            except ValueError:
+                if line_number == 1:
+                    continue  # header
+                raise ValueError(f"{file}:{line_number}: invalid timestamp {row[0]!r}")
+
+            if isinstance(timestamp, datetime):
+                if origin is None:
+                    origin = timestamp
+                timestamp = (timestamp - origin).total_seconds() / 60
+
+            haircut = lookup.get(row[1].strip().lower())
+            if haircut is None:
+                raise ValueError(f"{file}:{line_number}: unknown service {row[1]!r}")
+            duration = int(row[2]) if len(row) > 2 and row[2].strip() else -1
+            yield timestamp, haircut.code, duration
+
+
+def read_bin_trace(file, start=0):
+    """
+    Stream the records of a binary trace, one chunk of records at a time.
+
+    Args:
+        file (str): Path to the binary file.
+        start (int, optional): Number of records to skip, by seeking past them. Defaults to 0.
+
+    Yields:
+        tuple: (arrival_time, haircut code, duration or -1) per record.
+    """
+    chunk_size = CHUNK_RECORDS * TRACE_RECORD_SIZE
+    with open(file, "rb") as f:
+        f.seek(start * TRACE_RECORD_SIZE)
+        while True:
+            chunk = f.read(chunk_size)
+            usable = len(chunk) - len(chunk) % TRACE_RECORD_SIZE
+            if not usable:
+                break
+            yield from struct.iter_unpack(TRACE_FMT, chunk[:usable])
+
+
+def read_batches(file, chunk_records=CHUNK_RECORDS):
+    """
+    Stream a binary trace as NumPy structured arrays (see TRACE_DTYPE), for fast bulk analysis.
+
+    Args:
+        file (str): Path to the binary file.
+        chunk_records (int, optional): Records per batch.
+
+    Yields:
+        numpy.ndarray: Batches of up to `chunk_records` records.
+    """
+    if np is None:
+        raise ImportError("read_batches() requires NumPy")
+    with open(file, "rb") as f:
+        while True:
+            batch = np.fromfile(f, dtype=TRACE_DTYPE, count=chunk_records)
+            if not len(batch):
+                break
+            yield batch
+
+
+def save_trace_to_bin(records, file):
+    """
+    Write trace records into a fixed-width binary file.
+
+    Records are packed into a preallocated buffer and written in chunks of CHUNK_RECORDS.
+
+    Args:
+        records (iterable of tuple): (arrival_time, haircut code, duration or -1) per record.
+        file (str): Path to the binary file.
+
+    Returns:
+        int: Number of records written.
+    """
+    pack_into = struct.Struct(TRACE_FMT).pack_into
+    buffer = bytearray(CHUNK_RECORDS * TRACE_RECORD_SIZE)
+    offset = 0
+    count = 0
+    with open(file, "wb") as f:
+        for record in records:
+            pack_into(buffer, offset, *record)
+            offset += TRACE_RECORD_SIZE
+            count += 1
+            if offset == len(buffer):
+                f.write(buffer)
+                offset = 0
+        f.write(memoryview(buffer)[:offset])
+    return count
+
+
+class TraceReplay:
+    """
+    Order source replaying a recorded trace into the event engine.
+
+    Attributes:
+        file (str): Path to the trace (".csv" files are read as CSV, anything else as binary).
+        service_map (dict): Extra service names mapped to Haircut members (CSV traces only).
+        reorder_window (int): Number of records buffered to put slightly out-of-order traces
+                              back in timestamp order.
+    """
+
+    def __init__(self, file, service_map=None, reorder_window=0):
+        """
+        Initialize the replay.
+
+        Args:
+            file (str): Path to the trace.
+            service_map (dict, optional): Extra service names mapped to Haircut members.
+            reorder_window (int, optional): Records buffered for reordering. Defaults to 0 (trace must be sorted).
+        """
+        self.file = file
+        self.service_map = service_map
+        self.reorder_window = reorder_window
+
+    def records(self, start=0):
+        """
+        Stream the raw records of the trace in timestamp order.
+
+        Args:
+            start (int, optional): Number of records to skip. Binary traces replayed without
+                                   reordering seek straight past them; others are read and skipped.
+
+        Returns:
+            iterator of tuple: (arrival_time, haircut code, duration or -1) per record.
+
+        Raises:
+            ValueError: If a record is earlier than an already replayed one.
+        """
+        csv_trace = self.file.lower().endswith(".csv")
+        seek = not csv_trace and not self.reorder_window
+        if csv_trace:
+            records = read_csv_trace(self.file, self.service_map)
+        else:
+            records = read_bin_trace(self.file, start if seek else 0)
+        if self.reorder_window:
+            records = self._reorder(records)
+        records = self._check_order(records)
+        return records if seek or not start else itertools.islice(records, start, None)
+
+    def _check_order(self, records):
+        last = float("-inf")
+        for record in records:
+            if record[0] < last:
+                raise ValueError(f"{self.file}: trace is not in timestamp order at time {record[0]}")
+            last = record[0]
+            yield record
+
+    def _reorder(self, records):
+        window = []
+        for index, record in enumerate(records):
+            heapq.heappush(window, (record[0], index, record))
+            if len(window) > self.reorder_window:
+                yield heapq.heappop(window)[2]
+        while window:
+            yield heapq.heappop(window)[2]
+
+    def orders(self, horizon=float("inf")):
+        """
+        Stream the trace as orders.
+
+        Args:
+            horizon (float, optional): Replay only customers arriving before this minute.
+
+        Returns:
+            TraceOrders: Iterator yielding one order per record, with arrival time set.
+        """
+        return TraceOrders(self, horizon)
+
+    def duration(self):
+        """
+        Find the time of the last arrival in the trace.
+
+        Reads a single record for binary traces, and scans the file for CSV traces.
+
+        Returns:
+            float: Arrival time of the last record in minutes (0 for an empty trace).
+        """
+        if self.file.lower().endswith(".csv"):
+            last = 0
+            for record in self.records():
+                last = record[0]
+            return last
+
+        size = os.path.getsize(self.file)
+        if size < TRACE_RECORD_SIZE:
+            return 0
+        with open(self.file, "rb") as f:
+            f.seek((size // TRACE_RECORD_SIZE - 1) * TRACE_RECORD_SIZE)
+            return struct.unpack(TRACE_FMT, f.read(TRACE_RECORD_SIZE))[0]
+
+
+class TraceOrders:
+    """
+    Picklable iterator over the orders of a trace replay.
+
+    When pickled, only the number of records already replayed is kept; the
+    unpickled iterator reopens the trace and continues after them.
+
+    Attributes:
+        trace (TraceReplay): The replayed trace.
+        horizon (float): Replay only customers arriving before this minute.
+        consumed (int): Number of records replayed so far.
+    """
+
+    def __init__(self, trace, horizon, consumed=0):
+        self.trace = trace
+        self.horizon = horizon
+        self.consumed = consumed
+        self._records = trace.records(consumed)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        arrival_time, code, duration = next(self._records)
+        if arrival_time >= self.horizon:
+            raise StopIteration
+        self.consumed += 1
+        return Order(TRACE_CUSTOMER, HAIRCUTS[code], arrival_time, duration if duration >= 0 else None)
+
+    def reseed(self):
+        """Nothing to do: a trace replays the same customers on every branch."""
+
+    def __reduce__(self):
+        return TraceOrders, (self.trace, self.horizon, self.consumed)
+
+
+def main():
+    from simulation.engine import EventSimulation
+    from utils.stats_tracker import StatsTracker
+
+    parser = argparse.ArgumentParser(description="Convert and replay recorded customer traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="convert a CSV trace to the binary format")
+    convert.add_argument("csv_file")
+    convert.add_argument("bin_file")
+
+    replay = commands.add_parser("replay", help="replay a trace on the event engine")
+    replay.add_argument("trace_file")
+    replay.add_argument("--barbers", type=int, default=None, help="number of barbers")
+    replay.add_argument("--waiting-room", type=int, default=None, help="waiting room size")
+    replay.add_argument("--time", type=float, default=None, help="replay only the first minutes of the trace")
+    replay.add_argument("--reorder-window", type=int, default=0, help="records buffered to fix ordering")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        count = save_trace_to_bin(TraceReplay(args.csv_file).records(), args.bin_file)
+        print(f"Saved {count} records to '{args.bin_file}'")
+        return
+
+    trace = TraceReplay(args.trace_file, reorder_window=args.reorder_window)
+    # Customers arrive before closing time, so close just after the last one to replay the whole trace
+    params = {"simulation_time": args.time if args.time is not None else math.nextafter(trace.duration(), math.inf)}
+    if args.barbers is not None:
+        params["num_barbers"] = args.barbers
+    if args.waiting_room is not None:
+        params["waiting_room_size"] = args.waiting_room
+    EventSimulation(stats_tracker=StatsTracker(streaming=True), trace=trace, **params).run().print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,21 @@
+import argparse
+import logging
 import random
-from collections import deque
-from threading import Lock
+from time import perf_counter
 from generator.order_generator import OrderGenerator
+from generator.random_streams import RandomStreams
+from models.dispatch import POLICIES, make_policy
+from models.skill import parse_skills
 from models.barber import Barber
+from models.waiting_room import WaitingRoom
 from config import *
-from utils.stats_tracker import StatsTracker
+from utils.stats_tracker import StatsTracker, print_shops_summary
 from utils.time_manager import TimeManager
-
-
-def add_order(order, queue, lock):
-    with lock:
-        queue.appendleft(order)
+from utils.renderer import TerminalRenderer, RecentEventsHandler
+from utils.instrumentation import instrumentation
+from utils.profiler import PROFILERS, profile_run
+from simulation.engine import EventSimulation
+from simulation.async_runner import run_shops
 
 
 def show_order(order_deque):
@@ -24,33 +29,57 @@ def show_order(order_deque):
     print()
 
 
-def display_state(barbers, order_queue):
-    print("\n" * 5)
-    print("=== Barbershop Simulation ===")
-    print("\nBarbers:")
+def format_state(barbers, order_queue):
+    lines = ["=== Barbershop Simulation ===", "", "Barbers:"]
     for barber in barbers:
         if barber.current_order:
             order = barber.current_order
-            print(f"{barber.name:10} -> {order.customer.name} ({order.haircut.name}, {order.duration}m)")
+            lines.append(f"{barber.name:10} -> {order.customer.name} ({order.haircut.name}, {order.duration}m)")
         else:
-            print(f"{barber.name:10} -> Idle")
+            lines.append(f"{barber.name:10} -> Idle")
 
-    print("\nQueue:")
+    lines += ["", "Queue:"]
     if order_queue:
         for order in order_queue:
             bar = "#" * order.duration
-            print(f"{order.customer.name:10} | {order.haircut.name:12} | {bar} ({order.duration}m)")
+            lines.append(f"{order.customer.name:10} | {order.haircut.name:12} | {bar} ({order.duration}m)")
     else:
-        print("Empty")
+        lines.append("Empty")
+    return lines
+
+
+@instrumentation.timed("display_state")
+def display_state(renderer, barbers, order_queue, status, force=False):
+    """Redraw the live display with the shop's state and a status line."""
+    renderer.render(format_state(barbers, order_queue) + [status], force=force)
+
+
+def create_renderer(display=True, max_fps=MAX_FPS):
+    """Create the live display and route the barbers' log messages into it."""
+    renderer = TerminalRenderer(max_fps=max_fps, enabled=display)
+    if display:
+        barber_logger = logging.getLogger("models.barber")
+        barber_logger.setLevel(logging.INFO)
+        barber_logger.addHandler(RecentEventsHandler(renderer))
+    return renderer
 
 
-def handle_customer_arrival(order_gen, order_queue, queue_lock, stats_tracker, current_time):
-    if random.random() < CUSTOMER_ARRIVAL_RATE:
-        new_order = order_gen.generate_order()
+def close_renderer(renderer):
+    """Stop routing the barbers' log messages into a live display created by create_renderer()."""
+    barber_logger = logging.getLogger("models.barber")
+    for handler in list(barber_logger.handlers):
+        if isinstance(handler, RecentEventsHandler) and handler.renderer is renderer:
+            barber_logger.removeHandler(handler)
+
+
+@instrumentation.timed("handle_customer_arrival")
+def handle_customer_arrival(order_gen, order_queue, stats_tracker, current_time, streams=None):
+    coin = streams.arrivals if streams is not None else random
+    if coin.random() < CUSTOMER_ARRIVAL_RATE:
+        new_order = order_gen.generate_order(streams)
         new_order.arrival_time = current_time  # Track arrival
 
-        if len(order_queue) < WAITING_ROOM_SIZE:
-            add_order(new_order, order_queue, queue_lock)
+        if order_queue.put(new_order):  # False when the waiting room is full
             stats_tracker.record_new_customer(len(order_queue))
             return f"[+] New Customer: {new_order.customer.name}", new_order
         else:
@@ -64,7 +93,8 @@ def start_barbers(barbers):
         barber.start()
 
 
-def shutdown_barbers(barbers):
+def shutdown_barbers(barbers, order_queue):
+    order_queue.close()
     for barber in barbers:
         barber.stop_working()
     for barber in barbers:
@@ -75,47 +105,126 @@ def barbers_busy(barbers):
     return any(barber.current_order is not None for barber in barbers)
 
 
-def main():
-    order_queue = deque()
-    queue_lock = Lock()
+def main(display=True, max_fps=MAX_FPS, time_manager=None, seed=None, skills=None, dispatch=None):
+    order_queue = WaitingRoom(WAITING_ROOM_SIZE, make_policy(dispatch))
     order_gen = OrderGenerator()
-    time_manager = TimeManager()
-    stats_tracker = StatsTracker()
+    streams = RandomStreams(seed) if seed is not None else None
+    time_manager = time_manager or TimeManager()
+    stats_tracker = StatsTracker(per_thread=True)
 
     # Create barbers with access to stats and time manager
     barbers = Barber.generate_barbers(
         order_queue,
-        queue_lock,
         stats_tracker=stats_tracker,
-        time_manager=time_manager
+        time_manager=time_manager,
+        skills=skills,
+        service_rng=streams.service if streams is not None else None
     )
+    order_queue.policy.bind(barbers)
+
+    renderer = create_renderer(display, max_fps)
+    try:
+        start_barbers(barbers)
+
+        while time_manager.check_time() or order_queue or barbers_busy(barbers):
+            if time_manager.check_time():
+                new_customer_msg, _ = handle_customer_arrival(
+                    order_gen,
+                    order_queue,
+                    stats_tracker,
+                    time_manager.current,
+                    streams
+                )
+            else:
+                new_customer_msg = ""
+
+            display_state(renderer, barbers, order_queue,
+                          f"Current Time: {time_manager.formatted()} | {new_customer_msg}")
+
+            time_manager.tick()
+
+        shutdown_barbers(barbers, order_queue)
+        display_state(renderer, barbers, order_queue, f"Current Time: {time_manager.formatted()} | ", force=True)
+    finally:
+        close_renderer(renderer)
 
-    start_barbers(barbers)
-
-    while time_manager.check_time() or order_queue or barbers_busy(barbers):
-        if time_manager.check_time():
-            new_customer_msg, _ = handle_customer_arrival(
-                order_gen,
-                order_queue,
-                queue_lock,
-                stats_tracker,
-                time_manager.current
-            )
-        else:
-            new_customer_msg = ""
+    # Print final simulation stats
+    stats_tracker.print_summary()
+    return stats_tracker
 
-        display_state(barbers, order_queue)
-        print(f"Current Time: {time_manager.formatted()} | {new_customer_msg}")
 
-        time_manager.tick()
+def main_headless(seed=None, skills=None, dispatch=None):
+    """Run the simulation on the event-calendar engine without sleeping or live output."""
+    streams = RandomStreams(seed) if seed is not None else None
+    stats_tracker = EventSimulation(streams=streams, skills=skills, dispatch=dispatch).run()
+    stats_tracker.print_summary()
 
-    shutdown_barbers(barbers)
-    display_state(barbers, order_queue)
-    print(f"Current Time: {time_manager.formatted()} | ")
 
-    # Print final simulation stats
-    stats_tracker.print_summary()
+def main_async(num_shops=1, display=True, max_fps=MAX_FPS):
+    """Run the real-time simulation with coroutine barbers on a single asyncio event loop."""
+    time_manager = TimeManager()
+    renderer = create_renderer(display, max_fps)
+
+    def show(shop, new_customer_msg):
+        display_state(renderer, shop.barbers, shop.order_queue,
+                      f"Current Time: {time_manager.formatted()} | {new_customer_msg}")
+
+    try:
+        shop_trackers = run_shops(num_shops, display=show if display else None, time_manager=time_manager)
+        renderer.flush()
+    finally:
+        close_renderer(renderer)
+
+    if num_shops == 1:
+        next(iter(shop_trackers.values())).print_summary()
+    else:
+        print_shops_summary(shop_trackers)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Barbershop simulation")
+    parser.add_argument("--headless", action="store_true",
+                        help="run on the discrete-event engine instead of in real time")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="run in real time with coroutine barbers instead of threads")
+    parser.add_argument("--shops", type=int, default=1, help="number of shops to simulate with --asyncio")
+    parser.add_argument("--no-display", action="store_true", help="turn off the live display")
+    parser.add_argument("--fps", type=float, default=MAX_FPS, help="maximum redraws per second of the live display")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="draw the customers from random streams with this seed (threaded and --headless runs)")
+    parser.add_argument("--skills", default=None,
+                        help="skill profile of every barber, e.g. senior,junior*3 (threaded and --headless runs)")
+    parser.add_argument("--dispatch", choices=POLICIES, default=None,
+                        help="which waiting customer a free barber takes (threaded and --headless runs)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time the hot paths and lock waits, and print a per-component breakdown")
+    parser.add_argument("--chrome-trace", default=None, metavar="FILE",
+                        help="save a Chrome trace of the instrumented run to this file (implies --instrument)")
+    parser.add_argument("--profile", choices=PROFILERS, default=None, help="profile the whole run")
+    parser.add_argument("--profile-output", default=None, metavar="FILE",
+                        help="save the profile (pstats, or collapsed stacks when sampling)")
+    args = parser.parse_args()
+
+    if args.instrument or args.chrome_trace:
+        instrumentation.enable(timeline=bool(args.chrome_trace))
+
+    skills = parse_skills(args.skills) if args.skills else None
+    if args.headless:
+        run = lambda: main_headless(args.seed, skills, args.dispatch)
+    elif args.asyncio:
+        run = lambda: main_async(args.shops, display=not args.no_display, max_fps=args.fps)
+    else:
+        run = lambda: main(display=not args.no_display, max_fps=args.fps, seed=args.seed, skills=skills,
+                           dispatch=args.dispatch)
+
+    start = perf_counter()
+    if args.profile:
+        profile_run(run, args.profile, args.profile_output)
+    else:
+        run()
+
+    if instrumentation.enabled:
+        instrumentation.print_breakdown(perf_counter() - start)
+        if args.chrome_trace:
+            instrumentation.save_chrome_trace(args.chrome_trace)
+            print(f"\nSaved the Chrome trace to '{args.chrome_trace}'")
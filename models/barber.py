@@ -1,6 +1,11 @@
+import logging
 from threading import Thread
-from time import sleep
+from time import sleep, monotonic
 from config import TIME_DESCALE, NUM_BARBERS, HOURLY_WAGES
+from models.skill import ServiceTimeTable
+from utils.instrumentation import instrumentation
+
+logger = logging.getLogger(__name__)
 
 
 class Barber(Thread):
@@ -9,51 +14,57 @@ class Barber(Thread):
 
     Attributes:
         name (str): Barber's name.
-        order_queue (list): Shared queue of customer orders.
-        lock (threading.Lock): Lock to synchronize access to the queue.
+        order_queue (WaitingRoom): Shared waiting room of customer orders.
         working (bool): Whether the barber is currently working.
         wage (float): Hourly wage of the barber.
         stats_tracker (object): Optional tracker for recording simulation statistics.
         time_manager (object): Optional manager for tracking current simulation time.
         current_order (object): The order currently being served.
+        barber_id (int): Compact integer id of the barber, used in columnar logs.
+        skill (SkillProfile): Skill profile of the barber, or None for an average barber.
+        service_times (ServiceTimeTable): Service-time table of the shop's barbers, used with a skill profile.
     """
 
-    def __init__(self, name, order_queue, lock, working=False, wage=HOURLY_WAGES, stats_tracker=None,
-                 time_manager=None):
+    def __init__(self, name, order_queue, working=False, wage=HOURLY_WAGES, stats_tracker=None,
+                 time_manager=None, barber_id=None, skill=None, service_times=None):
         super().__init__()
         self.name = name
+        self.barber_id = barber_id
         self.order_queue = order_queue
-        self.lock = lock
         self.working = working
         self.wage = wage
         self.stats_tracker = stats_tracker
         self.time_manager = time_manager
         self.current_order = None
+        self.skill = skill
+        self.service_times = service_times
 
-    def serve_order(self, current_time=None):
+    def begin_service(self, order, current_time=None):
         """
-        Serve the next customer order if available.
+        Take an order into the chair and record how long the customer waited.
+
+        A barber with a skill profile replaces the order's duration with their own service time.
 
         Args:
+            order (Order): Order taken from the queue.
             current_time (float, optional): Current simulation time in minutes.
-
-        Returns:
-            bool: True if an order was served, False if no orders were available.
         """
-        with self.lock:
-            if not self.order_queue:
-                self.current_order = None
-                return False
-            order = self.order_queue.pop()
-            self.current_order = order
-
+        self.current_order = order
+        if self.service_times is not None:
+            order.duration = self.service_times.duration(self.barber_id, order)
         wait_time = current_time - order.arrival_time if current_time is not None else 0
 
         if self.stats_tracker:
             self.stats_tracker.record_wait_time(wait_time)
+            self.stats_tracker.record_sojourn_time(wait_time + order.duration)
 
-        self.process_order(order)
+    def finish_service(self, order):
+        """
+        Record a completed order and free the chair.
 
+        Args:
+            order (Order): Order that has just been served.
+        """
         if self.stats_tracker:
             self.stats_tracker.record_haircut(
                 barber=self.name,
@@ -64,8 +75,9 @@ class Barber(Thread):
             self.stats_tracker.record_work_time(self.name, order.duration)
 
         self.current_order = None
-        return True
 
+    @instrumentation.timed("process_order", lambda self, order: {
+        "customer": order.customer.name, "haircut": order.haircut.name, "minutes": order.duration})
     def process_order(self, order):
         """
         Simulate serving a customer order.
@@ -73,55 +85,102 @@ class Barber(Thread):
         Args:
             order (Order): Customer order containing haircut details and duration.
         """
-        print(f"{self.name} serving {order.customer.name} ({order.haircut.name}, {order.duration} min)")
-        sleep(order.duration / TIME_DESCALE)
-        print(f"{self.name} finished {order.customer.name}")
+        logger.info("%s serving %s (%s, %s min)", self.name, order.customer.name, order.haircut.name, order.duration)
+        sleep(order.duration / self.descale)
+        logger.info("%s finished %s", self.name, order.customer.name)
 
     def start_working(self):
         """Set the barber as working."""
         self.working = True
 
     def stop_working(self):
-        """Set the barber as not working."""
+        """Set the barber as not working. The thread exits once the waiting room is closed and empty."""
         self.working = False
 
+    def record_idle_since(self, idle_start):
+        """
+        Record the idle time elapsed since a wall-clock timestamp, in simulated minutes.
+
+        Args:
+            idle_start (float): time.monotonic() timestamp at which the barber became idle.
+        """
+        if self.stats_tracker:
+            self.stats_tracker.record_idle_time(self.name, (monotonic() - idle_start) * self.descale)
+
+    @property
+    def descale(self):
+        """float: Time descale factor of the run, taken from the time manager if there is one."""
+        return self.time_manager.descale if self.time_manager else TIME_DESCALE
+
+    def __reduce__(self):
+        # Threads cannot be pickled, so an unstarted barber is rebuilt from its settings,
+        # e.g. when an event-engine simulation is snapshotted
+        args = (self.name, self.order_queue, self.working, self.wage, self.stats_tracker,
+                self.time_manager, self.barber_id, self.skill, self.service_times)
+        return Barber, args, {"current_order": self.current_order}
+
     @staticmethod
-    def generate_barbers(order_queue, queue_lock, stats_tracker=None, time_manager=None, num_of_barbers=NUM_BARBERS):
+    def generate_barbers(order_queue, stats_tracker=None, time_manager=None, num_of_barbers=NUM_BARBERS,
+                         wage=HOURLY_WAGES, skills=None, name_prefix="", service_rng=None):
         """
         Generate a list of Barber instances.
 
         Args:
-            order_queue (deque): Shared queue of customer orders.
-            queue_lock (threading.Lock): Lock for synchronizing queue access.
+            order_queue (WaitingRoom): Shared waiting room of customer orders.
             stats_tracker (object, optional): Tracker for recording statistics.
             time_manager (object, optional): Manager for simulation time.
             num_of_barbers (int): Number of barbers to generate.
+            wage (float): Hourly wage of each barber.
+            skills (list of SkillProfile, optional): Skill profile of every barber, replacing
+                                                     `num_of_barbers` and `wage`.
+            name_prefix (str, optional): Prefix for barber names, to keep them unique across shops.
+            service_rng (random.Random or RandomStream, optional): Source of the seeds of the barbers'
+                                                                 service-time samplers. Defaults to
+                                                                 the `random` module.
 
         Returns:
             list: List of Barber instances.
         """
-        return [
-            Barber(
-                f"Barber-{i + 1}",
-                order_queue,
-                queue_lock,
-                stats_tracker=stats_tracker,
-                time_manager=time_manager
-            )
-            for i in range(num_of_barbers)
-        ]
+        if skills is None:
+            return [
+                Barber(
+                    f"{name_prefix}Barber-{i + 1}",
+                    order_queue,
+                    wage=wage,
+                    stats_tracker=stats_tracker,
+                    time_manager=time_manager,
+                    barber_id=i
+                )
+                for i in range(num_of_barbers)
+            ]
+
+        service_times = ServiceTimeTable(skills, service_rng)
+        barbers = []
+        for i, skill in enumerate(skills):
+            barber = Barber(f"{name_prefix}Barber-{i + 1}", order_queue, wage=skill.wage, stats_tracker=stats_tracker,
+                            time_manager=time_manager, barber_id=i, skill=skill, service_times=service_times)
+            if stats_tracker:
+                stats_tracker.set_wage(barber.name, skill.wage)
+            barbers.append(barber)
+        return barbers
 
     def run(self):
         """
-        Main thread loop for the barber. Continuously serves orders while working
-        or while there are orders in the queue. Records idle time when no orders are available.
+        Main thread loop for the barber. Blocks on the waiting room until a customer
+        arrives and serves them, until the waiting room is closed and empty. Idle time
+        is measured from the timestamps between customers.
         """
         self.start_working()
 
-        while self.working or self.order_queue:
-            served = self.serve_order(current_time=self.time_manager.current if self.time_manager else None)
-            if not served:
-                idle_duration = 0.1
-                sleep(0.1 / TIME_DESCALE)
-                if self.stats_tracker:
-                    self.stats_tracker.record_idle_time(self.name, idle_duration)
+        while True:
+            idle_start = monotonic()
+            with instrumentation.timer("wait_for_customer"):
+                order = self.order_queue.get(barber=self)
+            self.record_idle_since(idle_start)
+            if order is None:
+                break
+
+            with instrumentation.timer("serve_order"):
+                self.begin_service(order, current_time=self.time_manager.current if self.time_manager else None)
+                self.process_order(order)
+                self.finish_service(order)
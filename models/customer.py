@@ -4,16 +4,21 @@ class Customer:
 
     Attributes:
         name (str): The name of the customer.
+        name_index (int, optional): Index of the name in the customer name table.
     """
 
-    def __init__(self, name):
+    __slots__ = ("name", "name_index")
+
+    def __init__(self, name, name_index=None):
         """
         Initialize a Customer instance.
 
         Args:
             name (str): The name of the customer.
+            name_index (int, optional): Index of the name in the customer name table.
         """
         self.name = name
+        self.name_index = name_index
 
     def __str__(self):
         return self.name
@@ -0,0 +1,346 @@
+"""
+Dispatch policies: which waiting customer a free barber takes next.
+
+A policy holds the orders of a WaitingRoom in an index suited to its rule, so a
+barber's pick costs O(1) or O(log n) however large the waiting room gets:
+
+    fifo         longest-waiting customer first (a deque, O(1))
+    sjf          shortest expected haircut first (a heap on duration, O(log n))
+    priority     highest Order.priority first, e.g. loyalty members before other walk-ins (a heap, O(log n))
+    preference   customers asking for a barber wait for that barber; otherwise barbers take
+                 the longest-waiting customer among their specialties first (per-barber and
+                 per-haircut deques, O(number of haircuts))
+
+Ties are broken by arrival order, so every policy is deterministic.
+"""
+
+import heapq
+from collections import deque
+from models.haircut import HAIRCUTS
+
+REGULARS_SHARE = 0.3  # share of customers with a favourite barber under the preference policy
+MEMBERS_SHARE = 0.2   # share of customers who are loyalty members under the priority policy
+
+
+class DispatchPolicy:
+    """
+    Base class of dispatch policies: an index over the waiting orders.
+
+    Attributes:
+        selective (bool): True if some barbers may not take some customers, so that
+                          every free barber has to be offered a new customer.
+    """
+
+    selective = False
+
+    def bind(self, barbers):
+        """
+        Tell the policy which barbers serve the waiting room.
+
+        Args:
+            barbers (list of Barber): Barbers of the shop.
+        """
+
+    def push(self, order):
+        """Add an arriving order."""
+        raise NotImplementedError
+
+    def pop(self, barber=None):
+        """
+        Remove and return the order a barber takes next.
+
+        Args:
+            barber (Barber, optional): The free barber. Any barber if omitted.
+
+        Returns:
+            Order: The order, or None if none of the waiting orders is for this barber.
+        """
+        raise NotImplementedError
+
+    def can_serve(self, barber=None):
+        """Return True if pop() would return an order for this barber."""
+        return len(self) > 0
+
+    def release_requests(self):
+        """Let any barber take the customers waiting for a particular one, e.g. whose barber has gone home."""
+
+    def eligible(self, order, barber):
+        """Return True if a barber may take an order."""
+        return True
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __iter__(self):
+        raise NotImplementedError
+
+
+class FifoPolicy(DispatchPolicy):
+    """First come, first served: the longest-waiting customer is taken first."""
+
+    def __init__(self):
+        self._orders = deque()
+
+    def push(self, order):
+        self._orders.appendleft(order)
+
+    def pop(self, barber=None):
+        return self._orders.pop() if self._orders else None
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(self._orders)
+
+
+class HeapPolicy(DispatchPolicy):
+    """Takes the order with the smallest key() first, ties broken by arrival order."""
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = 0
+
+    def key(self, order):
+        """Return the sort key of an order."""
+        raise NotImplementedError
+
+    def push(self, order):
+        heapq.heappush(self._heap, (self.key(order), self._sequence, order))
+        self._sequence += 1
+
+    def pop(self, barber=None):
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __iter__(self):
+        return (entry[2] for entry in sorted(self._heap))
+
+
+class ShortestJobFirstPolicy(HeapPolicy):
+    """Shortest expected haircut first (the duration drawn for the order)."""
+
+    def key(self, order):
+        return order.duration
+
+
+class PriorityPolicy(HeapPolicy):
+    """
+    Highest Order.priority first.
+
+    Customers without a priority of their own are loyalty members, with priority 1,
+    at a rate of `members`; who is a member follows from the customer's name, so it
+    is the same in every run.
+
+    Attributes:
+        members (float): Share of customers who are loyalty members.
+    """
+
+    def __init__(self, members=MEMBERS_SHARE):
+        """
+        Initialize the policy.
+
+        Args:
+            members (float, optional): Share of customers who are loyalty members. Defaults to MEMBERS_SHARE.
+        """
+        super().__init__()
+        self.members = members
+
+    def push(self, order):
+        if not order.priority and self.members and _in_share(order, self.members, salt=1):
+            order.priority = 1
+        super().push(order)
+
+    def key(self, order):
+        return -order.priority
+
+
+class PreferencePolicy(DispatchPolicy):
+    """
+    Barber-preference dispatch.
+
+    A customer asking for a barber (Order.preferred_barber) waits for that barber,
+    who takes them before anyone else. Other customers are indexed by haircut: a
+    free barber takes the longest-waiting customer whose haircut is one of their
+    specialties (see SkillProfile.specialties), otherwise the longest-waiting one.
+
+    Customers with no request of their own are regulars with a favourite barber at
+    a rate of `regulars`; who is a regular, and whose, follows from the customer's
+    name, so it is the same in every run. A customer whose barber is off duty
+    waits until the barber is back; customers whose barber is off until closing
+    are released to every barber once the shop has nothing else to do (see
+    release_requests()).
+
+    Attributes:
+        regulars (float): Share of customers asking for their favourite barber.
+    """
+
+    selective = True
+
+    def __init__(self, regulars=REGULARS_SHARE):
+        """
+        Initialize the policy.
+
+        Args:
+            regulars (float, optional): Share of customers asking for their favourite barber.
+                                        Defaults to REGULARS_SHARE.
+        """
+        self.regulars = regulars
+        self._num_barbers = 0
+        self._specialties = {}                              # barber id -> haircut codes
+        self._requested = {}                                # barber id -> deque of (sequence, order)
+        self._by_haircut = [deque() for _ in HAIRCUTS]      # (sequence, order) without a request
+        self._unrequested = 0
+        self._count = 0
+        self._sequence = 0
+
+    def bind(self, barbers):
+        self._num_barbers = len(barbers)
+        self._specialties = {
+            barber.barber_id: tuple(haircut.code for haircut in barber.skill.specialties)
+            for barber in barbers if barber.skill is not None and barber.skill.specialties
+        }
+
+    def push(self, order):
+        if order.preferred_barber is None and self.regulars and self._num_barbers:
+            order.preferred_barber = self.favourite_barber(order)
+
+        entry = (self._sequence, order)
+        self._sequence += 1
+        self._count += 1
+        if order.preferred_barber is not None:
+            self._requested.setdefault(order.preferred_barber, deque()).append(entry)
+        else:
+            self._by_haircut[order.haircut.code].append(entry)
+            self._unrequested += 1
+
+    def favourite_barber(self, order):
+        """
+        Return the favourite barber of a regular customer.
+
+        Args:
+            order (Order): The customer's order.
+
+        Returns:
+            int: Id of the favourite barber, or None if the customer is not a regular.
+        """
+        if not _in_share(order, self.regulars):
+            return None
+        return order.customer.name_index % self._num_barbers
+
+    def pop(self, barber=None):
+        if barber is None:
+            return self._pop_oldest()
+
+        requested = self._requested.get(barber.barber_id)
+        if requested:
+            self._count -= 1
+            return requested.popleft()[1]
+        if not self._unrequested:
+            return None
+        queue = self._oldest(self._specialties.get(barber.barber_id, ()))
+        if queue is None:
+            queue = self._oldest(range(len(HAIRCUTS)))
+        self._count -= 1
+        self._unrequested -= 1
+        return queue.popleft()[1]
+
+    def _oldest(self, codes):
+        """Return the per-haircut queue with the longest-waiting customer among some haircuts."""
+        oldest = None
+        for code in codes:
+            queue = self._by_haircut[code]
+            if queue and (oldest is None or queue[0][0] < oldest[0][0]):
+                oldest = queue
+        return oldest
+
+    def _pop_oldest(self):
+        """Take the longest-waiting customer regardless of requests, for an unspecified barber."""
+        oldest = self._oldest(range(len(HAIRCUTS)))
+        requested = False
+        for queue in self._requested.values():
+            if queue and (oldest is None or queue[0][0] < oldest[0][0]):
+                oldest, requested = queue, True
+        if oldest is None:
+            return None
+        if not requested:
+            self._unrequested -= 1
+        self._count -= 1
+        return oldest.popleft()[1]
+
+    def release_requests(self):
+        for queue in self._requested.values():
+            for entry in queue:
+                entry[1].preferred_barber = None
+                self._by_haircut[entry[1].haircut.code].append(entry)
+                self._unrequested += 1
+        self._requested.clear()
+        for code, queue in enumerate(self._by_haircut):
+            self._by_haircut[code] = deque(sorted(queue, key=lambda entry: entry[0]))
+
+    def can_serve(self, barber=None):
+        if barber is None:
+            return self._count > 0
+        return self._unrequested > 0 or bool(self._requested.get(barber.barber_id))
+
+    def eligible(self, order, barber):
+        return order.preferred_barber is None or order.preferred_barber == barber.barber_id
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        entries = [entry for queue in self._by_haircut for entry in queue]
+        entries += [entry for queue in self._requested.values() for entry in queue]
+        return (order for _, order in sorted(entries, key=lambda entry: entry[0]))
+
+
+def _in_share(order, share, salt=0):
+    """
+    Decide from the customer's name whether they belong to a share of all customers.
+
+    Args:
+        order (Order): The customer's order.
+        share (float): Share of customers to select.
+        salt (int, optional): Picks an independent selection for every use. Defaults to 0.
+
+    Returns:
+        bool: True if the customer is selected, False if not or if they have no name index.
+    """
+    name_index = order.customer.name_index
+    if name_index is None:
+        return False
+    return ((name_index ^ (salt * 0x9E3779B9)) * 2654435761) % 4294967296 < share * 4294967296
+
+
+POLICIES = {
+    "fifo": FifoPolicy,
+    "sjf": ShortestJobFirstPolicy,
+    "priority": PriorityPolicy,
+    "preference": PreferencePolicy,
+}
+
+
+def make_policy(policy=None):
+    """
+    Build a fresh dispatch policy for a waiting room.
+
+    Args:
+        policy (str or callable, optional): Name of one of POLICIES, or a callable returning a
+                                            policy (e.g. a policy class). Defaults to "fifo".
+
+    Returns:
+        DispatchPolicy: The new policy.
+
+    Raises:
+        ValueError: If the name is not one of POLICIES.
+    """
+    if policy is None:
+        return FifoPolicy()
+    if isinstance(policy, str):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown dispatch policy {policy!r}, expected one of {tuple(POLICIES)}")
+        return POLICIES[policy]()
+    return policy()
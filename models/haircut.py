@@ -8,6 +8,7 @@ class Haircut(Enum):
         label (str): Human-readable name of the haircut.
         price (float): Price of the haircut in currency units.
         base_duration (int): Estimated duration of the haircut in minutes.
+        code (int): Compact integer code of the haircut (its position in HAIRCUTS).
     """
 
     NORMAL = ("Normal Haircut", 15, 20)
@@ -30,3 +31,11 @@ class Haircut(Enum):
         self.label = label
         self.price = price
         self.base_duration = base_duration
+
+
+# Haircut members in definition order. A haircut's position in this tuple is its
+# compact integer code, used wherever orders are stored as arrays.
+HAIRCUTS = tuple(Haircut)
+for _code, _haircut in enumerate(HAIRCUTS):
+    _haircut.code = _code
+del _code, _haircut
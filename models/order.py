@@ -9,11 +9,16 @@ class Order:
         haircut (Haircut): The type of haircut requested.
         duration (int): Actual duration of the haircut in minutes (with some variance).
         arrival_time (float, optional): The simulated time when the customer arrives.
+        order_id (int, optional): Number of the customer within a run, in order of arrival.
+        priority (int): Dispatch priority, higher first under the priority policy (see models.dispatch).
+        preferred_barber (int, optional): Id of the barber the customer waits for, if any.
     """
 
+    __slots__ = ("customer", "haircut", "duration", "arrival_time", "order_id", "priority", "preferred_barber")
+
     TIME_VARIANCE = 0.2  # Max ±20% variation on the haircut duration
 
-    def __init__(self, customer, haircut, arrival_time=None):
+    def __init__(self, customer, haircut, arrival_time=None, duration=None):
         """
         Initialize an Order instance.
 
@@ -21,26 +26,31 @@ class Order:
             customer (Customer): The customer placing the order.
             haircut (Haircut): The type of haircut requested.
             arrival_time (float, optional): The time the customer arrives in simulation minutes.
+            duration (int, optional): Pre-drawn haircut duration. Drawn with random_duration() if omitted.
         """
         self.customer = customer
         self.haircut = haircut
-        self.duration = Order.random_duration(haircut)
+        self.duration = duration if duration is not None else Order.random_duration(haircut)
         self.arrival_time = arrival_time
+        self.order_id = None
+        self.priority = 0
+        self.preferred_barber = None
 
     @staticmethod
-    def random_duration(haircut):
+    def random_duration(haircut, rng=random):
         """
         Generate a randomized haircut duration based on the base duration and TIME_VARIANCE.
 
         Args:
             haircut (Haircut): Haircut type to calculate duration for.
+            rng (random.Random, optional): Random generator. Defaults to the `random` module.
 
         Returns:
             int: Randomized haircut duration in minutes.
         """
         variation = haircut.base_duration * Order.TIME_VARIANCE
-        return int(random.uniform(haircut.base_duration - variation,
-                                  haircut.base_duration + variation))
+        return int(rng.uniform(haircut.base_duration - variation,
+                               haircut.base_duration + variation))
 
     def __repr__(self):
         return f"Order({self.customer}, {self.haircut.name}, {self.duration}m)"
@@ -0,0 +1,160 @@
+"""
+Barber skill profiles and per-run service-time lookup tables.
+
+A SkillProfile describes a kind of barber: hourly wage, overall speed,
+per-haircut speed multipliers (specializations) and service-time distribution.
+Profiles are plain settings shared between shops and runs; the random state
+lives in a ServiceTimeTable built for the barbers of one shop, which
+precomputes every (barber, haircut) scale so drawing a service time is a table
+lookup and one pre-drawn factor.
+"""
+
+from config import HOURLY_WAGES
+from generator.service_time import DurationSampler, GammaTime, LognormalTime
+from models.haircut import Haircut, HAIRCUTS
+
+
+class SkillProfile:
+    """
+    Speed, specializations, wage and service-time distribution of a kind of barber.
+
+    Attributes:
+        label (str): Name of the profile, e.g. "senior".
+        wage (float): Hourly wage.
+        speed (float): Multiplier on every haircut's duration (below 1 is faster).
+        multipliers (dict): Haircut mapped to an extra duration multiplier for that haircut.
+        distribution (object): Service-time distribution (see generator.service_time), or None
+                               to scale the duration drawn for the order by Order.random_duration().
+    """
+
+    def __init__(self, label, wage=HOURLY_WAGES, speed=1.0, multipliers=None, distribution=None):
+        """
+        Initialize the profile.
+
+        Args:
+            label (str): Name of the profile.
+            wage (float, optional): Hourly wage. Defaults to HOURLY_WAGES.
+            speed (float, optional): Multiplier on every haircut's duration. Defaults to 1.
+            multipliers (dict, optional): Haircut mapped to an extra duration multiplier.
+            distribution (object, optional): Service-time distribution. Defaults to the order's own duration.
+        """
+        self.label = label
+        self.wage = wage
+        self.speed = speed
+        self.multipliers = dict(multipliers or {})
+        self.distribution = distribution
+
+    def multiplier(self, haircut):
+        """
+        Return the duration multiplier of a haircut.
+
+        Args:
+            haircut (Haircut): Haircut type.
+
+        Returns:
+            float: Overall speed times the haircut's multiplier.
+        """
+        return self.speed * self.multipliers.get(haircut, 1.0)
+
+    @property
+    def specialties(self):
+        """frozenset of Haircut: Haircuts the barber is faster at than at the others."""
+        return frozenset(haircut for haircut, multiplier in self.multipliers.items() if multiplier < 1)
+
+    def __repr__(self):
+        return f"SkillProfile('{self.label}', wage={self.wage}, speed={self.speed})"
+
+
+# Profiles selectable by name, e.g. from the command line
+PRESETS = {
+    "standard": SkillProfile("standard"),
+    "senior": SkillProfile("senior", wage=18, speed=0.85,
+                           multipliers={Haircut.BEARD_SHAVE: 0.8, Haircut.HAIR_BEARD: 0.85},
+                           distribution=GammaTime(0.15)),
+    "junior": SkillProfile("junior", wage=11, speed=1.2,
+                           multipliers={Haircut.BEARD_SHAVE: 1.3, Haircut.HAIR_BEARD: 1.2, Haircut.KIDS_CUT: 0.9},
+                           distribution=LognormalTime(0.35)),
+}
+
+
+def parse_skills(text):
+    """
+    Parse a comma-separated list of preset profile names, one per barber.
+
+    A name may be followed by "*count" to repeat it, e.g. "senior,junior*3".
+
+    Args:
+        text (str): Profile names.
+
+    Returns:
+        list of SkillProfile: One profile per barber.
+
+    Raises:
+        ValueError: If a name is not one of PRESETS.
+    """
+    profiles = []
+    for item in filter(None, text.split(",")):
+        name, _, count = item.strip().partition("*")
+        if name not in PRESETS:
+            raise ValueError(f"Unknown skill profile {name!r}, expected one of {tuple(PRESETS)}")
+        profiles += [PRESETS[name]] * int(count or 1)
+    return profiles
+
+
+class ServiceTimeTable:
+    """
+    Per-run lookup of service times by (barber, haircut).
+
+    Attributes:
+        profiles (list of SkillProfile): Profile of every barber, indexed by barber id.
+        scale (list of list of float): Duration multiplier per barber and haircut code.
+        minutes (list of list of float): Mean minutes per barber and haircut code.
+        samplers (list of DurationSampler): Factor sampler of every barber (None to scale the
+                                            order's own duration). Barbers whose profiles share
+                                            a distribution share a sampler.
+    """
+
+    def __init__(self, profiles, rng=None):
+        """
+        Build the table.
+
+        Args:
+            profiles (list of SkillProfile): Profile of every barber, indexed by barber id.
+            rng (random.Random or RandomStream, optional): Source of the samplers' seeds.
+                                                           Defaults to the `random` module.
+        """
+        self.profiles = list(profiles)
+        self.scale = [[profile.multiplier(haircut) for haircut in HAIRCUTS] for profile in self.profiles]
+        self.minutes = [[haircut.base_duration * scale for haircut, scale in zip(HAIRCUTS, row)]
+                        for row in self.scale]
+
+        samplers = {}
+        self.samplers = []
+        for profile in self.profiles:
+            sampler = None
+            if profile.distribution is not None:
+                sampler = samplers.get(id(profile.distribution))
+                if sampler is None:
+                    sampler = samplers[id(profile.distribution)] = DurationSampler(profile.distribution, rng=rng)
+            self.samplers.append(sampler)
+
+    def reseed(self):
+        """Reseed every sampler from the rng (or the `random` module) on its next draw."""
+        for sampler in {id(sampler): sampler for sampler in self.samplers if sampler is not None}.values():
+            sampler.reseed()
+
+    def duration(self, barber_id, order):
+        """
+        Draw the service time of an order served by a barber.
+
+        Args:
+            barber_id (int): Id of the barber (index into the profiles).
+            order (Order): The order, whose duration was drawn for an average barber.
+
+        Returns:
+            int: Service time in whole minutes (at least one).
+        """
+        sampler = self.samplers[barber_id]
+        if sampler is None:
+            return max(1, int(order.duration * self.scale[barber_id][order.haircut.code]))
+        return max(1, int(self.minutes[barber_id][order.haircut.code] * sampler.next()))
@@ -0,0 +1,114 @@
+from threading import Condition
+from config import WAITING_ROOM_SIZE
+from models.dispatch import FifoPolicy
+
+
+class WaitingRoom:
+    """
+    Bounded, blocking queue of customer orders.
+
+    Barbers block in get() until a customer arrives or the shop closes, so idle
+    barbers neither poll nor take the lock while they wait. Which customer a free
+    barber takes is decided by the dispatch policy, first come first served by default.
+
+    Attributes:
+        capacity (int): Maximum number of customers waiting at once.
+        closed (bool): Whether the shop has closed its doors.
+        policy (DispatchPolicy): Dispatch policy holding the waiting orders (see models.dispatch).
+    """
+
+    def __init__(self, capacity=WAITING_ROOM_SIZE, policy=None):
+        """
+        Initialize an empty waiting room.
+
+        Args:
+            capacity (int, optional): Maximum number of waiting customers. Defaults to WAITING_ROOM_SIZE.
+            policy (DispatchPolicy, optional): Dispatch policy. Defaults to a new FifoPolicy.
+        """
+        self.capacity = capacity
+        self.closed = False
+        self.policy = policy if policy is not None else FifoPolicy()
+        self._changed = Condition()
+        self._size = 0
+        # Bound once: put() and get() are on the hot path of every customer
+        self._push = self.policy.push
+        self._pop = self.policy.pop
+        self._notify = self._changed.notify_all if self.policy.selective else self._changed.notify
+
+    def put(self, order, reserved=False):
+        """
+        Seat a customer if there is room.
+
+        Args:
+            order (Order): The arriving customer's order.
+            reserved (bool, optional): Seat the customer even if the room is full, e.g. a
+                                       customer with an appointment. Defaults to False.
+
+        Returns:
+            bool: True if the customer was seated, False if the room is full or closed.
+        """
+        with self._changed:
+            if self.closed or (self._size >= self.capacity and not reserved):
+                return False
+            self._push(order)
+            self._size += 1
+            self._notify()  # every barber with a selective policy, as the first one may not take the customer
+            return True
+
+    def get(self, timeout=None, barber=None):
+        """
+        Take the next customer for a barber, blocking until there is one.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Waits indefinitely if omitted.
+            barber (Barber, optional): The free barber, for policies where it matters.
+
+        Returns:
+            Order: The next order, or None if the room is closed with nobody for the barber or the timeout expired.
+        """
+        with self._changed:
+            while not self.policy.can_serve(barber) and not self.closed:
+                if not self._changed.wait(timeout):
+                    return None
+            return self._take(barber)
+
+    def get_nowait(self, barber=None):
+        """
+        Take the next customer for a barber without blocking.
+
+        Args:
+            barber (Barber, optional): The free barber, for policies where it matters.
+
+        Returns:
+            Order: The next order, or None if nobody is waiting for the barber.
+        """
+        with self._changed:
+            return self._take(barber)
+
+    def _take(self, barber):
+        order = self._pop(barber)
+        if order is not None:
+            self._size -= 1
+        return order
+
+    def close(self):
+        """Stop accepting customers and wake every barber waiting for one."""
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def __getstate__(self):
+        # The condition cannot be pickled; it is recreated when unpickling
+        return {"capacity": self.capacity, "closed": self.closed, "policy": self.policy}
+
+    def __setstate__(self, state):
+        self.__init__(state["capacity"], state["policy"])
+        self._size = len(self.policy)
+        self.closed = state["closed"]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        with self._changed:
+            return iter(list(self.policy))
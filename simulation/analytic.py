@@ -0,0 +1,207 @@
+"""
+Analytic M/M/c/K estimates of the barbershop.
+
+The shop is a queue with c = NUM_BARBERS servers and room for
+K = c + WAITING_ROOM_SIZE customers, so steady-state blocking probability,
+mean wait and utilization have closed forms. The service rate is taken from
+the Haircut mix (haircuts are drawn uniformly, with the ±Order.TIME_VARIANCE
+spread truncated to whole minutes as in Order.random_duration()).
+
+The M/M/c/K formulas assume Poisson arrivals and exponential service, which
+makes them the exact limit of a long simulation with those distributions and a
+close approximation otherwise. Haircut durations vary much less than
+exponential ones, so the formulas overestimate blocking, and the mean wait is
+also given with the Allen-Cunneen correction for the variability of arrivals
+and service, which tracks the simulation at light and moderate load (the pure
+M/M/c/K wait is closer once the waiting room is mostly full). Estimates take
+microseconds, so they can prune a sweep before any simulation is run:
+
+    python -m simulation.analytic --barbers 4 --waiting-room 5 --arrival-rate 0.4
+    python -m simulation.analytic --check 200 --time 10000
+"""
+
+import argparse
+import math
+from config import SIMULATION_TIME, CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from models.haircut import HAIRCUTS
+from models.order import Order
+from simulation.replication import run_replications, aggregate
+
+
+def duration_moments(haircut):
+    """
+    Compute the exact mean and second moment of a haircut's duration.
+
+    Order.random_duration() truncates a uniform draw over base ± TIME_VARIANCE to whole minutes.
+
+    Args:
+        haircut (Haircut): The haircut.
+
+    Returns:
+        tuple: (mean, second moment) of the duration in minutes.
+    """
+    low = haircut.base_duration * (1 - Order.TIME_VARIANCE)
+    high = haircut.base_duration * (1 + Order.TIME_VARIANCE)
+    if high == low:
+        return float(int(low)), float(int(low)) ** 2
+
+    mean = second = 0.0
+    for minutes in range(int(low), int(high) + 1):
+        probability = (min(minutes + 1, high) - max(minutes, low)) / (high - low)
+        mean += probability * minutes
+        second += probability * minutes ** 2
+    return mean, second
+
+
+def service_moments(haircuts=HAIRCUTS):
+    """
+    Compute the service time statistics of the haircut mix, drawn uniformly.
+
+    Args:
+        haircuts (tuple of Haircut, optional): Haircuts offered. Defaults to all haircuts.
+
+    Returns:
+        tuple: (mean service time in minutes, squared coefficient of variation, mean price).
+    """
+    moments = [duration_moments(haircut) for haircut in haircuts]
+    mean = sum(m for m, _ in moments) / len(moments)
+    second = sum(s for _, s in moments) / len(moments)
+    price = sum(haircut.price for haircut in haircuts) / len(haircuts)
+    return mean, (second - mean ** 2) / mean ** 2, price
+
+
+def state_probabilities(arrival_rate, service_rate, servers, capacity):
+    """
+    Compute the steady-state distribution of the number of customers in an M/M/c/K queue.
+
+    Args:
+        arrival_rate (float): Customers arriving per minute.
+        service_rate (float): Customers one barber serves per minute.
+        servers (int): Number of barbers (c).
+        capacity (int): Maximum number of customers in the shop (K), being served or waiting.
+
+    Returns:
+        list of float: Probability of n customers in the shop, for n = 0 .. capacity.
+    """
+    load = arrival_rate / service_rate
+    terms = [1.0]
+    for n in range(1, capacity + 1):
+        terms.append(terms[-1] * load / min(n, servers))
+    total = math.fsum(terms)
+    return [term / total for term in terms]
+
+
+def estimate(num_barbers=NUM_BARBERS, waiting_room_size=WAITING_ROOM_SIZE, arrival_rate=CUSTOMER_ARRIVAL_RATE,
+             hourly_wages=HOURLY_WAGES, simulation_time=SIMULATION_TIME, haircuts=HAIRCUTS):
+    """
+    Estimate the steady-state results of a shop with the M/M/c/K formulas.
+
+    Takes the same keyword arguments as EventSimulation, so grid points and
+    replication parameters can be passed as they are. Counts and money are
+    extrapolated over `simulation_time` minutes of arrivals.
+
+    Args:
+        num_barbers (int): Number of barbers.
+        waiting_room_size (int): Maximum number of waiting customers.
+        arrival_rate (float): Customers arriving per minute.
+        hourly_wages (float): Hourly wage for each barber.
+        simulation_time (int): Minutes during which customers arrive.
+        haircuts (tuple of Haircut, optional): Haircuts offered. Defaults to all haircuts.
+
+    Returns:
+        dict: Metric name mapped to its estimate. Shares its metric names with StatsTracker.summary()
+              and adds blocking_probability and avg_wait_time_corrected (Allen-Cunneen).
+    """
+    mean_service, service_cv2, mean_price = service_moments(haircuts)
+    service_rate = 1 / mean_service
+    capacity = num_barbers + waiting_room_size
+    probabilities = state_probabilities(arrival_rate, service_rate, num_barbers, capacity)
+
+    blocking = probabilities[capacity]
+    throughput = arrival_rate * (1 - blocking)
+    queue_length = math.fsum((n - num_barbers) * p for n, p in enumerate(probabilities) if n > num_barbers)
+    wait = queue_length / throughput if throughput > 0 else 0
+    # Per-minute arrival coin: geometric gaps with squared coefficient of variation 1 - p
+    arrival_cv2 = 1 - arrival_rate if arrival_rate <= 1 else 1
+
+    served = throughput * simulation_time
+    revenue = served * mean_price
+    wages = num_barbers * hourly_wages * simulation_time / 60
+    return {
+        "customers_served": served,
+        "customers_lost": arrival_rate * simulation_time * blocking,
+        "blocking_probability": blocking,
+        "total_revenue": revenue,
+        "total_wages": wages,
+        "profit": revenue - wages,
+        "avg_wait_time": wait,
+        "avg_wait_time_corrected": wait * (arrival_cv2 + service_cv2) / 2,
+        "avg_sojourn_time": wait + mean_service,
+        "utilization": throughput / (num_barbers * service_rate) * 100,
+        "avg_revenue_per_customer": mean_price,
+    }
+
+
+def prune(points, max_blocking=None, min_utilization=None):
+    """
+    Drop grid points whose analytic estimate is clearly unacceptable.
+
+    Args:
+        points (list of dict): Grid points (EventSimulation keyword arguments).
+        max_blocking (float, optional): Highest acceptable probability of turning a customer away.
+        min_utilization (float, optional): Lowest acceptable barber utilization, in percent.
+
+    Returns:
+        list of dict: The points worth simulating, in their original order.
+    """
+    kept = []
+    for params in points:
+        result = estimate(**params)
+        if max_blocking is not None and result["blocking_probability"] > max_blocking:
+            continue
+        if min_utilization is not None and result["utilization"] < min_utilization:
+            continue
+        kept.append(params)
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytic M/M/c/K estimates of the barbershop")
+    parser.add_argument("--barbers", type=int, default=NUM_BARBERS, help="number of barbers")
+    parser.add_argument("--waiting-room", type=int, default=WAITING_ROOM_SIZE, help="waiting room size")
+    parser.add_argument("--arrival-rate", type=float, default=CUSTOMER_ARRIVAL_RATE, help="arrivals per minute")
+    parser.add_argument("--wages", type=float, default=HOURLY_WAGES, help="hourly wage per barber")
+    parser.add_argument("--time", type=int, default=SIMULATION_TIME, help="simulation time in minutes")
+    parser.add_argument("--check", type=int, default=0, metavar="REPLICATIONS",
+                        help="cross-check against this many simulated replications")
+    parser.add_argument("--seed", type=int, default=0, help="master seed of the cross-check")
+    args = parser.parse_args()
+
+    params = {
+        "num_barbers": args.barbers,
+        "waiting_room_size": args.waiting_room,
+        "arrival_rate": args.arrival_rate,
+        "hourly_wages": args.wages,
+        "simulation_time": args.time,
+    }
+    result = estimate(**params)
+
+    if not args.check:
+        print("=== M/M/c/K Estimate ===\n")
+        for metric, value in result.items():
+            print(f"{metric:26} {value:12.4f}")
+        return
+
+    table = aggregate([tracker.summary() for tracker in run_replications(args.check, args.seed, params=params)])
+    print(f"=== M/M/c/K Estimate vs {args.check} Replications ===\n")
+    print(f"{'Metric':26} {'Analytic':>12} {'Simulated':>12}   95% CI")
+    for metric, value in result.items():
+        if metric in table:
+            row = table[metric]
+            print(f"{metric:26} {value:12.4f} {row['mean']:12.4f}   [{row['ci_low']:.4f}, {row['ci_high']:.4f}]")
+        else:
+            print(f"{metric:26} {value:12.4f}")
+
+
+if __name__ == "__main__":
+    main()
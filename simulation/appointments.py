@@ -0,0 +1,514 @@
+"""
+Appointments and walk-ins: a barbershop that takes bookings.
+
+A share of the customers (the booking ratio) book a time slot with a barber
+instead of walking in. Every barber has an IntervalCalendar of booked slots,
+so finding the earliest free slot and checking conflicts are binary searches
+however many bookings a run takes. Booked customers may not show up, or come
+early or late; a booking is held for a grace period past its start, after
+which the slot is released and a late customer joins the walk-ins.
+
+Walk-ins fill the gaps: a free barber takes their own booked customers first,
+and otherwise the longest-waiting walk-in only if the haircut is expected to
+end before the barber's next booking starts. A slot freed early (a short
+haircut, a released no-show) is open to walk-ins at once.
+
+Appointment outcomes and delays are counted by the StatsTracker, so a study
+over booking ratios shows their effect on throughput, waits and profit.
+
+Usage:
+    python -m simulation.appointments --booking-ratio 0,0.25,0.5,0.75 --replications 200 --time 480
+"""
+
+import argparse
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from config import SIMULATION_TIME, CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from generator.arrival_process import BernoulliArrivals
+from generator.random_streams import RandomStreams
+from models.dispatch import DispatchPolicy
+from models.haircut import HAIRCUTS
+from models.skill import parse_skills
+from simulation.engine import EventSimulation, SERVICE_START
+from simulation.replication import aggregate, replication_seeds, shared_order_generator
+from utils import event_log
+from utils.interval_calendar import IntervalCalendar
+from utils.stats_tracker import StatsTracker
+
+# Event kinds added to the engine's (see simulation.engine). A customer arriving
+# right at the end of the grace period still keeps their booking.
+APPOINTMENT = 3
+RELEASE = 4
+
+BOOKING_RATIO = 0.3     # share of customers booking an appointment instead of walking in
+NO_SHOW_RATE = 0.1      # share of booked customers who never come
+LATENESS_MEAN = 2       # minutes booked customers arrive after their booked time, on average
+LATENESS_SD = 5         # spread of the lateness (early arrivals are negative lateness)
+GRACE_MINUTES = 10      # minutes a booking is held past its start for a late customer
+SLOT_MINUTES = 15       # bookings start and end on this grid
+
+OUTCOMES = ("booked", "refused", "no_show", "late", "served")
+
+
+class Appointment:
+    """
+    A booked slot with a barber.
+
+    Attributes:
+        order (Order): Order of the booked customer.
+        barber (Barber): Barber the slot is booked with.
+        start (float): Booked start in simulation minutes.
+        end (float): Booked end in simulation minutes.
+        arrival (float): Time the customer arrives, None if they never come.
+        arrived (bool): Whether the customer has arrived within the grace period.
+        released (bool): Whether the slot was released because the customer had not arrived in time.
+    """
+
+    __slots__ = ("order", "barber", "start", "end", "arrival", "arrived", "released")
+
+    def __init__(self, order, barber, start, end, arrival=None):
+        self.order = order
+        self.barber = barber
+        self.start = start
+        self.end = end
+        self.arrival = arrival
+        self.arrived = False
+        self.released = False
+
+    def __repr__(self):
+        return f"Appointment({self.order.customer}, barber {self.barber.barber_id}, {self.start}-{self.end})"
+
+
+class AppointmentPolicy(DispatchPolicy):
+    """
+    Dispatch of booked customers and walk-ins around the barbers' calendars.
+
+    Booked customers (Order.preferred_barber set) wait for their barber, who takes
+    them before anyone else. Otherwise a free barber takes the longest-waiting
+    walk-in whose haircut fits the gap before their next booking. Walk-ins are
+    indexed by haircut, like under the preference policy, so finding one costs
+    O(number of haircuts), and a long haircut at the head of the line does not keep
+    shorter ones out of a gap.
+
+    Attributes:
+        simulation (AppointmentSimulation): Simulation whose clock and calendars the policy reads.
+    """
+
+    selective = True
+
+    def __init__(self, simulation):
+        """
+        Initialize the policy.
+
+        Args:
+            simulation (AppointmentSimulation): Simulation whose clock and calendars the policy reads.
+        """
+        self.simulation = simulation
+        self._scale = {}                # barber id -> duration multiplier per haircut code
+        self._requested = {}            # barber id -> deque of booked orders
+        self._walk_ins = [deque() for _ in HAIRCUTS]   # (sequence, order) per haircut code
+        self._count = 0
+        self._booked = 0
+        self._sequence = 0
+
+    def bind(self, barbers):
+        self._scale = {
+            barber.barber_id: [barber.skill.multiplier(haircut) if barber.skill is not None else 1
+                               for haircut in HAIRCUTS]
+            for barber in barbers
+        }
+
+    def push(self, order):
+        self._count += 1
+        if order.preferred_barber is not None:
+            self._requested.setdefault(order.preferred_barber, deque()).append(order)
+            self._booked += 1
+        else:
+            self._walk_ins[order.haircut.code].append((self._sequence, order))
+            self._sequence += 1
+
+    def pop(self, barber=None):
+        if barber is not None:
+            requested = self._requested.get(barber.barber_id)
+            if requested:
+                return self._pop_booked(requested)
+
+        queue = self._walk_in_queue(barber)
+        if queue is not None:
+            self._count -= 1
+            return queue.popleft()[1]
+        if barber is None:
+            # Only booked customers are waiting: take one for an unspecified barber
+            for requested in self._requested.values():
+                if requested:
+                    return self._pop_booked(requested)
+        return None
+
+    def _pop_booked(self, requested):
+        self._count -= 1
+        self._booked -= 1
+        return requested.popleft()
+
+    def _walk_in_queue(self, barber):
+        """Return the per-haircut queue of the longest-waiting walk-in who fits the barber's gap (any barber if None)."""
+        if self._count == self._booked:
+            return None
+        if barber is not None:
+            now = self.simulation.clock
+            gap = self.simulation.calendars[barber.barber_id].free_until(now) - now
+            scale = self._scale[barber.barber_id]
+        oldest = None
+        for code, queue in enumerate(self._walk_ins):
+            if not queue or (oldest is not None and queue[0][0] > oldest[0][0]):
+                continue
+            if barber is None or queue[0][1].duration * scale[code] <= gap:
+                oldest = queue
+        return oldest
+
+    def can_serve(self, barber=None):
+        if barber is None:
+            return self._count > 0
+        if self._requested.get(barber.barber_id):
+            return True
+        return self._walk_in_queue(barber) is not None
+
+    def eligible(self, order, barber):
+        if order.preferred_barber is not None:
+            return order.preferred_barber == barber.barber_id
+        return self.can_serve(barber)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        orders = [order for queue in self._walk_ins for _, order in queue]
+        for requested in self._requested.values():
+            orders += requested
+        return iter(sorted(orders, key=lambda order: order.arrival_time))
+
+
+class AppointmentSimulation(EventSimulation):
+    """
+    Event-calendar simulation of a shop serving booked customers and walk-ins.
+
+    Bookings are taken before the run starts: customers wanting a haircut at some
+    time of the day book the earliest slot from then on, with the barber who has
+    one first, as long as the slot ends before closing time. Customers finding no
+    slot are refused and counted, but do not walk in.
+
+    Attributes:
+        booking_ratio (float): Share of customers booking an appointment.
+        no_show_rate (float): Share of booked customers who never come.
+        lateness_mean (float): Mean minutes booked customers arrive past their booked time.
+        lateness_sd (float): Standard deviation of the lateness.
+        grace (float): Minutes a booking is held past its start.
+        slot_minutes (float): Grid bookings start and end on.
+        calendars (list of IntervalCalendar): Booked slots of every barber, indexed by barber id.
+        appointments (dict): Order of every booked customer who has not been served, mapped to their Appointment.
+    """
+
+    def __init__(self, order_gen=None, stats_tracker=None, booking_ratio=BOOKING_RATIO, no_show_rate=NO_SHOW_RATE,
+                 lateness_mean=LATENESS_MEAN, lateness_sd=LATENESS_SD, grace=GRACE_MINUTES,
+                 slot_minutes=SLOT_MINUTES, simulation_time=SIMULATION_TIME, arrival_rate=CUSTOMER_ARRIVAL_RATE,
+                 waiting_room_size=WAITING_ROOM_SIZE, num_barbers=NUM_BARBERS, hourly_wages=HOURLY_WAGES,
+                 order_log=None, event_log=None, streams=None, skills=None):
+        """
+        Initialize the simulation.
+
+        Args:
+            order_gen (OrderGenerator, optional): Order generator. A new one is created if omitted.
+            stats_tracker (StatsTracker, optional): Statistics tracker. A new one is created if omitted.
+            booking_ratio (float): Share of customers booking an appointment instead of walking in.
+            no_show_rate (float): Share of booked customers who never come.
+            lateness_mean (float): Mean minutes booked customers arrive past their booked time.
+            lateness_sd (float): Standard deviation of the lateness, in minutes.
+            grace (float): Minutes a booking is held past its start before it is released.
+            slot_minutes (float): Grid bookings start and end on; a booking is the barber's expected
+                                  time for the haircut rounded up to the grid.
+            simulation_time (int): Minutes during which customers may arrive (and bookings must end).
+            arrival_rate (float): Probability of a customer, booked or walking in, arriving per minute.
+            waiting_room_size (int): Maximum number of walk-ins waiting. Booked customers always get a seat.
+            num_barbers (int): Number of barbers serving customers in parallel.
+            hourly_wages (float): Hourly wage for each barber.
+            order_log (OrderLog, optional): Columnar log receiving every served order.
+            event_log (EventLogWriter, optional): Binary log receiving every event of the run.
+            streams (RandomStreams, optional): Per-source random streams drawing the customers and bookings.
+            skills (list of SkillProfile, optional): Skill profile of every barber (see models.skill).
+
+        Raises:
+            ValueError: If the booking ratio or no-show rate is not between 0 and 1.
+        """
+        if not 0 <= booking_ratio <= 1 or not 0 <= no_show_rate <= 1:
+            raise ValueError("the booking ratio and no-show rate must be between 0 and 1")
+        super().__init__(order_gen, stats_tracker, simulation_time, arrival_rate, waiting_room_size,
+                         num_barbers, hourly_wages, order_log, event_log=event_log, streams=streams,
+                         skills=skills, dispatch=partial(AppointmentPolicy, self),
+                         arrival_process=BernoulliArrivals(arrival_rate * (1 - booking_ratio)))
+        self.booking_ratio = booking_ratio
+        self.no_show_rate = no_show_rate
+        self.lateness_mean = lateness_mean
+        self.lateness_sd = lateness_sd
+        self.grace = grace
+        self.slot_minutes = slot_minutes
+        self.calendars = [IntervalCalendar() for _ in self.barbers]
+        self.appointments = {}
+        for outcome in OUTCOMES:
+            self.stats_tracker.record_appointment(outcome, 0)
+
+    def run(self, until=None):
+        if not self.started:
+            self.book_appointments()
+        return super().run(until)
+
+    def book_appointments(self):
+        """
+        Take the bookings of the day and schedule the booked customers' arrivals.
+
+        Customers wanting a haircut arrive per minute at the booked share of the
+        arrival rate, each with a time they would like to come in.
+        """
+        shop = self.shops[0]
+        rng = self.streams.arrivals if self.streams is not None else random
+        wanted = BernoulliArrivals(self.arrival_rate * self.booking_ratio).times(self.simulation_time, rng)
+        for time in wanted:
+            order = self.order_gen.generate_order(self.streams)
+            if not self.book(shop, order, time, rng):
+                self.stats_tracker.record_appointment("refused")
+
+    def book(self, shop, order, time, rng=random):
+        """
+        Book the earliest slot from a wanted time on, with whichever barber has it first.
+
+        Args:
+            shop (Shop): The shop.
+            order (Order): Order of the booking customer.
+            time (float): Time the customer would like to come in.
+            rng (random.Random or RandomStream, optional): Draws the no-show and lateness.
+
+        Returns:
+            Appointment: The booking, or None if no barber has a slot before closing time.
+        """
+        best = None
+        for barber in shop.barbers:
+            length = self.slot_length(barber, order)
+            start = self.calendars[barber.barber_id].first_fit(time, length, self.simulation_time,
+                                                               self.slot_minutes)
+            if start is not None and (best is None or start < best[0]):
+                best = (start, length, barber)
+        if best is None:
+            return None
+
+        start, length, barber = best
+        order.preferred_barber = barber.barber_id
+        order.priority = 1
+        appointment = Appointment(order, barber, start, start + length)
+        self.calendars[barber.barber_id].add(start, start + length, appointment)
+        self.appointments[order] = appointment
+        self.stats_tracker.record_appointment("booked")
+
+        if rng.random() >= self.no_show_rate:
+            appointment.arrival = max(0, start + rng.gauss(self.lateness_mean, self.lateness_sd))
+            self.schedule(appointment.arrival, APPOINTMENT, (shop, appointment))
+        self.schedule(start + self.grace, RELEASE, (shop, appointment))
+        return appointment
+
+    def slot_length(self, barber, order):
+        """
+        Return the minutes booked for an order with a barber.
+
+        Args:
+            barber (Barber): The barber.
+            order (Order): The order.
+
+        Returns:
+            float: The barber's expected time for the haircut, rounded up to the slot grid.
+        """
+        minutes = order.haircut.base_duration
+        if barber.skill is not None:
+            minutes *= barber.skill.multiplier(order.haircut)
+        return max(1, math.ceil(minutes / self.slot_minutes)) * self.slot_minutes
+
+    def _on_event(self, kind, payload):
+        if kind == APPOINTMENT:
+            self._on_appointment(*payload)
+        elif kind == RELEASE:
+            self._on_release(*payload)
+        else:
+            super()._on_event(kind, payload)
+
+    def _on_appointment(self, shop, appointment):
+        order = appointment.order
+        order.arrival_time = self.clock
+        order.order_id = self._customers
+        self._customers += 1
+
+        if appointment.released:
+            # Too late for the booking: the customer queues up with the walk-ins
+            del self.appointments[order]
+            order.preferred_barber = None
+            order.priority = 0
+            if not shop.order_queue.put(order):
+                shop.stats_tracker.record_customer_lost()
+                if self.event_log is not None:
+                    self._log(event_log.BALK, shop, order)
+                return
+        else:
+            appointment.arrived = True
+            shop.order_queue.put(order, reserved=True)
+
+        shop.stats_tracker.record_new_customer(len(shop.order_queue))
+        if self.event_log is not None:
+            self._log(event_log.ARRIVAL, shop, order)
+        self._wake_idle_barbers(shop)
+
+    def _on_release(self, shop, appointment):
+        if appointment.arrived:
+            return
+        appointment.released = True
+        self.calendars[appointment.barber.barber_id].remove(appointment.start)
+        if appointment.arrival is None:
+            del self.appointments[appointment.order]
+            shop.stats_tracker.record_appointment("no_show")
+        else:
+            shop.stats_tracker.record_appointment("late")
+        self._wake_idle_barbers(shop)
+
+    def _wake_idle_barbers(self, shop):
+        """Start serving with every idle barber who may now take a waiting customer."""
+        can_serve = shop.order_queue.policy.can_serve
+        for barber in list(shop.idle_barbers):
+            if can_serve(barber):
+                shop.idle_barbers.remove(barber)
+                self.schedule(self.clock, SERVICE_START, (shop, barber))
+
+    def _on_service_end(self, shop, barber):
+        order = barber.current_order
+        appointment = self.appointments.pop(order, None)
+        if appointment is not None:
+            # The rest of the slot is open to walk-ins as soon as the haircut is done
+            self.calendars[barber.barber_id].remove(appointment.start)
+            start = self.clock - order.duration
+            shop.stats_tracker.record_appointment("served")
+            shop.stats_tracker.record_appointment_delay(max(0, start - max(appointment.arrival, appointment.start)))
+        super()._on_service_end(shop, barber)
+
+
+def run_appointment_replication(seed, params=None, streams=False):
+    """
+    Run a single seeded replication of a shop taking appointments.
+
+    Args:
+        seed (int): Seed for this replication.
+        params (dict, optional): Keyword arguments passed to AppointmentSimulation.
+        streams (bool, optional): Draw the customers and bookings from per-source random streams
+                                  seeded with `seed` (see generator.random_streams).
+
+    Returns:
+        StatsTracker: The streaming tracker holding the results of the run.
+    """
+    random.seed(seed)
+    params = dict(params or {})
+    if streams:
+        params["streams"] = RandomStreams(seed)
+    stats_tracker = StatsTracker(params.get("hourly_wages", HOURLY_WAGES), streaming=True)
+    return AppointmentSimulation(shared_order_generator(), stats_tracker, **params).run()
+
+
+def _run_appointment_replication_args(args):
+    return run_appointment_replication(*args)
+
+
+def booking_study(booking_ratios, replications, master_seed=0, workers=None, params=None, streams=True):
+    """
+    Run replications of the shop at several booking ratios, spread over a process pool.
+
+    Every booking ratio is run with the same replication seeds, so with random streams the
+    ratios are compared on common random numbers.
+
+    Args:
+        booking_ratios (list of float): Booking ratios to compare.
+        replications (int): Number of replications per booking ratio.
+        master_seed (int): Seed from which per-replication seeds are derived.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPU cores.
+        params (dict, optional): Keyword arguments passed to AppointmentSimulation.
+        streams (bool, optional): Draw the customers from per-source random streams. Defaults to True.
+
+    Returns:
+        dict: Booking ratio mapped to the replication summaries (StatsTracker.summary()), in replication order.
+    """
+    seeds = replication_seeds(master_seed, replications)
+    jobs = [(seed, {**(params or {}), "booking_ratio": ratio}, streams)
+            for ratio in booking_ratios for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        trackers = list(map(_run_appointment_replication_args, jobs))
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            trackers = list(executor.map(_run_appointment_replication_args, jobs, chunksize=chunksize))
+
+    summaries = [tracker.summary() for tracker in trackers]
+    return {ratio: summaries[i * replications:(i + 1) * replications] for i, ratio in enumerate(booking_ratios)}
+
+
+def print_booking_study(results, confidence=0.95):
+    """Print the mean results of every booking ratio of a booking_study(), with the throughput's confidence interval."""
+    print(f"\n=== Booking Ratio Study ({len(next(iter(results.values())))} replications each) ===\n")
+    print(f"{'Booked':>7} {'Served':>16} {'Walk-ins':>9} {'Appts':>7} {'Refused':>8} {'No-shows':>9} "
+          f"{'Lost':>7} {'Avg Wait':>9} {'p95 Wait':>9} {'Delay':>7} {'Util %':>7} {'Profit':>10}")
+    for ratio, summaries in results.items():
+        table = aggregate(summaries, confidence)
+        mean = {metric: row["mean"] for metric, row in table.items()}
+        half_width = (table["customers_served"]["ci_high"] - table["customers_served"]["ci_low"]) / 2
+        print(f"{ratio:7.2f} {mean['customers_served']:9.1f} ±{half_width:5.1f} {mean['walk_ins_served']:9.1f} "
+              f"{mean['appointments_served']:7.1f} {mean['appointments_refused']:8.1f} {mean['no_shows']:9.1f} "
+              f"{mean['customers_lost']:7.1f} {mean['avg_wait_time']:9.2f} {mean['p95_wait_time']:9.2f} "
+              f"{mean['avg_appointment_delay']:7.2f} {mean['utilization']:7.2f} {mean['profit']:10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare booking ratios of a shop taking appointments and walk-ins")
+    parser.add_argument("--booking-ratio", default="0,0.25,0.5,0.75",
+                        help="comma-separated shares of customers booking an appointment")
+    parser.add_argument("--replications", type=int, default=100, help="replications per booking ratio")
+    parser.add_argument("--time", type=int, default=SIMULATION_TIME, help="simulation time in minutes")
+    parser.add_argument("--barbers", type=int, default=NUM_BARBERS, help="number of barbers")
+    parser.add_argument("--skills", default=None,
+                        help="comma-separated skill profiles, one per barber, e.g. senior,junior*3")
+    parser.add_argument("--waiting-room", type=int, default=WAITING_ROOM_SIZE, help="waiting room size")
+    parser.add_argument("--arrival-rate", type=float, default=CUSTOMER_ARRIVAL_RATE,
+                        help="arrival rate of all customers, booked or walking in")
+    parser.add_argument("--no-show", type=float, default=NO_SHOW_RATE, help="share of booked customers who never come")
+    parser.add_argument("--lateness", type=float, default=LATENESS_MEAN, help="mean lateness of booked customers")
+    parser.add_argument("--lateness-sd", type=float, default=LATENESS_SD, help="standard deviation of the lateness")
+    parser.add_argument("--grace", type=float, default=GRACE_MINUTES, help="minutes a booking is held past its start")
+    parser.add_argument("--slot", type=float, default=SLOT_MINUTES, help="booking grid in minutes")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    params = {
+        "simulation_time": args.time,
+        "num_barbers": args.barbers,
+        "waiting_room_size": args.waiting_room,
+        "arrival_rate": args.arrival_rate,
+        "no_show_rate": args.no_show,
+        "lateness_mean": args.lateness,
+        "lateness_sd": args.lateness_sd,
+        "grace": args.grace,
+        "slot_minutes": args.slot,
+    }
+    if args.skills:
+        params["skills"] = parse_skills(args.skills)
+    ratios = [float(ratio) for ratio in args.booking_ratio.split(",")]
+    results = booking_study(ratios, args.replications, args.seed, args.workers, params)
+    print_booking_study(results)
+
+
+if __name__ == "__main__":
+    main()
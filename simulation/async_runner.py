@@ -0,0 +1,235 @@
+"""
+asyncio-based real-time simulation of one or many barbershops.
+
+Every barber is a coroutine instead of an OS thread, and a single clock
+coroutine ticks the shared TimeManager and runs the arrival process of every
+shop, so hundreds of shops with thousands of barbers run live on one event loop
+in a single process. Barbers are the same Barber objects as in the threaded
+mode (never started as threads) and record into one StatsTracker per shop.
+"""
+
+import asyncio
+import random
+from collections import deque
+from config import CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from generator.order_generator import OrderGenerator
+from models.barber import Barber
+from utils.stats_tracker import StatsTracker
+from utils.time_manager import TimeManager
+
+
+class AsyncWaitingRoom:
+    """
+    Bounded first-come-first-served waiting room for coroutine barbers.
+
+    The asyncio counterpart of WaitingRoom: get() suspends the calling barber
+    until a customer arrives or the room is closed.
+
+    Attributes:
+        capacity (int): Maximum number of customers waiting at once.
+        closed (bool): Whether the shop has closed its doors.
+    """
+
+    def __init__(self, capacity=WAITING_ROOM_SIZE):
+        """
+        Initialize an empty waiting room.
+
+        Args:
+            capacity (int, optional): Maximum number of waiting customers. Defaults to WAITING_ROOM_SIZE.
+        """
+        self.capacity = capacity
+        self.closed = False
+        self._orders = deque()
+        self._waiters = deque()
+
+    def put(self, order):
+        """
+        Seat a customer if there is room.
+
+        Args:
+            order (Order): The arriving customer's order.
+
+        Returns:
+            bool: True if the customer was seated, False if the room is full or closed.
+        """
+        if self.closed or len(self._orders) >= self.capacity:
+            return False
+        self._orders.appendleft(order)
+        self._wake_one()
+        return True
+
+    async def get(self):
+        """
+        Take the longest-waiting customer, suspending until one arrives.
+
+        Returns:
+            Order: The next order, or None if the room is closed and empty.
+        """
+        while not self._orders and not self.closed:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        return self._orders.pop() if self._orders else None
+
+    def get_nowait(self):
+        """
+        Take the longest-waiting customer without suspending.
+
+        Returns:
+            Order: The next order, or None if nobody is waiting.
+        """
+        return self._orders.pop() if self._orders else None
+
+    def close(self):
+        """Stop accepting customers and wake every waiting barber."""
+        self.closed = True
+        while self._waiters:
+            self._wake_one()
+
+    def _wake_one(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(list(self._orders))
+
+
+class AsyncShop:
+    """
+    One barbershop in an asyncio simulation.
+
+    Attributes:
+        name (str): Name of the shop.
+        order_queue (AsyncWaitingRoom): The shop's waiting room.
+        stats_tracker (StatsTracker): Statistics of the shop.
+        barbers (list of Barber): Barbers of the shop, driven by coroutines.
+    """
+
+    def __init__(self, name, order_gen, time_manager, num_barbers=NUM_BARBERS,
+                 waiting_room_size=WAITING_ROOM_SIZE, arrival_rate=CUSTOMER_ARRIVAL_RATE,
+                 hourly_wages=HOURLY_WAGES, barber_prefix=""):
+        """
+        Initialize a shop.
+
+        Args:
+            name (str): Name of the shop.
+            order_gen (OrderGenerator): Generator for arriving customer orders.
+            time_manager (TimeManager): Clock shared by all shops.
+            num_barbers (int): Number of barbers in the shop.
+            waiting_room_size (int): Maximum number of waiting customers.
+            arrival_rate (float): Probability of a customer arriving per minute.
+            hourly_wages (float): Hourly wage for each barber.
+            barber_prefix (str): Prefix for barber names, to keep them unique across shops.
+        """
+        self.name = name
+        self.order_gen = order_gen
+        self.time_manager = time_manager
+        self.arrival_rate = arrival_rate
+        self.order_queue = AsyncWaitingRoom(waiting_room_size)
+        self.stats_tracker = StatsTracker(hourly_wages, streaming=True)
+        self.barbers = Barber.generate_barbers(
+            self.order_queue,
+            stats_tracker=self.stats_tracker,
+            time_manager=time_manager,
+            num_of_barbers=num_barbers,
+            wage=hourly_wages,
+            name_prefix=barber_prefix
+        )
+
+    def handle_customer_arrival(self):
+        """
+        Flip the per-minute arrival coin and seat or turn away the customer.
+
+        Returns:
+            str: Message describing the arrival, or an empty string if nobody arrived.
+        """
+        if random.random() >= self.arrival_rate:
+            return ""
+
+        new_order = self.order_gen.generate_order()
+        new_order.arrival_time = self.time_manager.current
+        if self.order_queue.put(new_order):
+            self.stats_tracker.record_new_customer(len(self.order_queue))
+            return f"[+] New Customer: {new_order.customer.name}"
+        self.stats_tracker.record_customer_lost()
+        return "[X] Customer Left (Waiting room full)"
+
+    def busy(self):
+        """Return True while customers are waiting or being served."""
+        return bool(self.order_queue) or any(barber.current_order is not None for barber in self.barbers)
+
+    async def run_barber(self, barber):
+        """
+        Coroutine serving customers for one barber until the waiting room closes and empties.
+
+        Args:
+            barber (Barber): The barber to drive.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            idle_start = loop.time()  # the loop clock is time.monotonic()
+            order = await self.order_queue.get()
+            barber.record_idle_since(idle_start)
+            if order is None:
+                return
+
+            barber.begin_service(order, self.time_manager.current)
+            await asyncio.sleep(order.duration / barber.descale)
+            barber.finish_service(order)
+
+
+async def run_shops_async(shops, time_manager, display=None):
+    """
+    Run shops on the current event loop until time is up and every customer is served.
+
+    Args:
+        shops (list of AsyncShop): Shops to simulate.
+        time_manager (TimeManager): Clock shared by the shops.
+        display (callable, optional): Called as display(shop, message) for the first shop on every tick.
+    """
+    barber_tasks = [asyncio.create_task(shop.run_barber(barber)) for shop in shops for barber in shop.barbers]
+
+    while time_manager.check_time() or any(shop.busy() for shop in shops):
+        message = ""
+        if time_manager.check_time():
+            for shop in shops:
+                shop_message = shop.handle_customer_arrival()
+                if shop is shops[0]:
+                    message = shop_message
+        if display:
+            display(shops[0], message)
+        await time_manager.tick_async()
+
+    for shop in shops:
+        shop.order_queue.close()
+    await asyncio.gather(*barber_tasks)
+
+
+def run_shops(num_shops=1, display=None, time_manager=None, **shop_params):
+    """
+    Simulate shops in real time on a fresh asyncio event loop.
+
+    Args:
+        num_shops (int): Number of shops to simulate.
+        display (callable, optional): Called as display(shop, message) for the first shop on every tick.
+        time_manager (TimeManager, optional): Shared clock. A new one is created if omitted.
+        **shop_params: Keyword arguments passed to every AsyncShop.
+
+    Returns:
+        dict: Shop name mapped to the shop's StatsTracker.
+    """
+    order_gen = OrderGenerator()
+    time_manager = time_manager or TimeManager()
+    shops = []
+    for i in range(num_shops):
+        name = f"Shop-{i + 1}"
+        prefix = f"{name}/" if num_shops > 1 else ""
+        shops.append(AsyncShop(name, order_gen, time_manager, barber_prefix=prefix, **shop_params))
+    asyncio.run(run_shops_async(shops, time_manager, display))
+    return {shop.name: shop.stats_tracker for shop in shops}
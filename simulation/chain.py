@@ -0,0 +1,238 @@
+"""
+Chain simulation: many barbershops sharing one customer pool.
+
+Every shop has its own arrivals, waiting room, barbers and StatsTracker, but a
+customer who finds their shop's waiting room full is routed to another shop of
+the chain instead of leaving, if one has room. The chain runs on the
+event-calendar engine, so all shops of a partition share one calendar and one
+clock.
+
+Large chains are split into partitions of neighbouring shops. Each partition
+is simulated in a worker process with its own seed, and customers are only
+routed within their partition, so a chain of hundreds of shops simulates a day
+in seconds and the results do not depend on the number of workers.
+
+Usage:
+    python -m simulation.chain --shops 500 --partition-size 10 --routing nearest --time 480
+"""
+
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from config import SIMULATION_TIME, CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from models.haircut import HAIRCUTS
+from simulation.engine import EventSimulation, Shop
+from simulation.replication import shared_order_generator, replication_seeds
+from utils.stats_tracker import StatsTracker, print_shops_summary
+
+ROUTING_POLICIES = ("nearest", "shortest_wait", "random")
+
+# Haircuts are drawn uniformly, so this is the expected service time of a customer.
+MEAN_SERVICE_TIME = sum(haircut.base_duration for haircut in HAIRCUTS) / len(HAIRCUTS)
+
+
+class ChainSimulation(EventSimulation):
+    """
+    Event-calendar simulation of several shops that route overflow customers to each other.
+
+    Attributes:
+        routing (str): Routing policy, one of ROUTING_POLICIES.
+        shop_trackers (dict): Shop name mapped to the shop's StatsTracker.
+        stats_tracker (StatsTracker): Chain-wide tracker, holding the merged shop results once the run is finished.
+    """
+
+    def __init__(self, shop_ids, order_gen=None, routing="nearest", positions=None,
+                 simulation_time=SIMULATION_TIME, arrival_rate=CUSTOMER_ARRIVAL_RATE,
+                 waiting_room_size=WAITING_ROOM_SIZE, num_barbers=NUM_BARBERS, hourly_wages=HOURLY_WAGES,
+                 order_log=None, arrival_process=None, event_log=None):
+        """
+        Initialize the chain.
+
+        Args:
+            shop_ids (list of int): Numbers of the shops of the chain. Shop n is named "Shop-{n + 1}".
+            order_gen (OrderGenerator, optional): Order generator. A new one is created if omitted.
+            routing (str): Routing policy for customers finding a full waiting room.
+            positions (list of float, optional): Location of every shop. Defaults to the shop numbers.
+            simulation_time (int): Minutes during which customers may arrive.
+            arrival_rate (float): Probability of a customer arriving per minute, at every shop.
+            waiting_room_size (int): Maximum number of customers waiting in each shop.
+            num_barbers (int): Number of barbers in each shop.
+            hourly_wages (float): Hourly wage for each barber.
+            order_log (OrderLog, optional): Columnar log receiving every served order.
+            arrival_process (object, optional): Arrival process of every shop. Defaults to the
+                                                per-minute arrival coin at `arrival_rate`.
+            event_log (EventLogWriter, optional): Binary log receiving every event of the run.
+        """
+        if routing not in ROUTING_POLICIES:
+            raise ValueError(f"Unknown routing policy {routing!r}, expected one of {ROUTING_POLICIES}")
+        if positions is None:
+            positions = shop_ids
+
+        shops = [
+            Shop(f"Shop-{shop_id + 1}", StatsTracker(hourly_wages, streaming=True), arrival_rate,
+                 waiting_room_size, num_barbers, hourly_wages, barber_prefix=f"Shop-{shop_id + 1}/",
+                 position=position, arrival_process=arrival_process, shop_id=shop_id)
+            for shop_id, position in zip(shop_ids, positions)
+        ]
+        super().__init__(order_gen, StatsTracker(hourly_wages, streaming=True), simulation_time,
+                         arrival_rate, waiting_room_size, num_barbers, hourly_wages, order_log, shops,
+                         event_log=event_log)
+        self.routing = routing
+        self.shop_trackers = {shop.name: shop.stats_tracker for shop in shops}
+
+    def _finish(self):
+        """Close the books of every shop and merge their results into the chain-wide tracker."""
+        super()._finish()
+        for tracker in self.shop_trackers.values():
+            self.stats_tracker.merge(tracker)
+
+    def admit(self, shop, order):
+        """
+        Seat an arriving customer at their shop, or route them to another shop of the chain.
+
+        Args:
+            shop (Shop): Shop the customer arrived at.
+            order (Order): The customer's order.
+
+        Returns:
+            Shop: The shop whose waiting room took the customer, or None if no shop had room.
+        """
+        if shop.order_queue.put(order):
+            return shop
+
+        target = self.route(shop)
+        if target is None or not target.order_queue.put(order):
+            return None
+        shop.stats_tracker.record_customer_routed()
+        return target
+
+    def route(self, origin):
+        """
+        Pick the shop an overflow customer is sent to, according to the routing policy.
+
+        Args:
+            origin (Shop): Shop whose waiting room is full.
+
+        Returns:
+            Shop: A shop with room, or None if every waiting room of the chain is full.
+        """
+        candidates = [shop for shop in self.shops if shop is not origin and shop.has_room()]
+        if not candidates:
+            return None
+        if self.routing == "nearest":
+            return min(candidates, key=lambda shop: abs(shop.position - origin.position))
+        if self.routing == "shortest_wait":
+            return min(candidates, key=self.expected_wait)
+        return random.choice(candidates)
+
+    @staticmethod
+    def expected_wait(shop):
+        """
+        Estimate how long a customer joining the shop's queue now would wait.
+
+        Args:
+            shop (Shop): The shop to estimate for.
+
+        Returns:
+            float: Expected wait in minutes (0 if a barber is idle).
+        """
+        ahead = len(shop.order_queue) - len(shop.idle_barbers) + 1
+        return max(0, ahead) * MEAN_SERVICE_TIME / len(shop.barbers)
+
+
+def partition_shops(num_shops, partition_size):
+    """
+    Split the chain into partitions of neighbouring shops.
+
+    Args:
+        num_shops (int): Number of shops of the chain.
+        partition_size (int): Maximum number of shops per partition.
+
+    Returns:
+        list of range: Shop numbers of every partition.
+    """
+    return [range(i, min(i + partition_size, num_shops)) for i in range(0, num_shops, partition_size)]
+
+
+def run_partition(seed, shop_ids, routing="nearest", params=None):
+    """
+    Simulate one partition of the chain.
+
+    Args:
+        seed (int): Seed for this partition.
+        shop_ids (list of int): Numbers of the shops of the partition.
+        routing (str): Routing policy.
+        params (dict, optional): Keyword arguments passed to ChainSimulation.
+
+    Returns:
+        dict: Shop name mapped to the shop's StatsTracker.
+    """
+    random.seed(seed)
+    chain = ChainSimulation(shop_ids, shared_order_generator(), routing, **(params or {}))
+    chain.run()
+    return chain.shop_trackers
+
+
+def _run_partition_args(args):
+    return run_partition(*args)
+
+
+def run_chain(num_shops, partition_size=10, routing="nearest", master_seed=0, workers=None, params=None):
+    """
+    Simulate a chain of shops, with partitions spread over a process pool.
+
+    Args:
+        num_shops (int): Number of shops of the chain.
+        partition_size (int): Maximum number of shops per partition. Customers are routed within their partition.
+        routing (str): Routing policy, one of ROUTING_POLICIES.
+        master_seed (int): Seed from which per-partition seeds are derived.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPU cores.
+        params (dict, optional): Keyword arguments passed to ChainSimulation.
+
+    Returns:
+        dict: Shop name mapped to the shop's StatsTracker, in shop order.
+    """
+    partitions = partition_shops(num_shops, partition_size)
+    seeds = replication_seeds(master_seed, len(partitions))
+    jobs = [(seed, shop_ids, routing, params) for seed, shop_ids in zip(seeds, partitions)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    if workers == 1:
+        results = [_run_partition_args(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=shared_order_generator) as executor:
+            results = list(executor.map(_run_partition_args, jobs))
+
+    shop_trackers = {}
+    for result in results:
+        shop_trackers.update(result)
+    return shop_trackers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a chain of barbershops that route overflow customers")
+    parser.add_argument("--shops", type=int, default=10, help="number of shops in the chain")
+    parser.add_argument("--partition-size", type=int, default=10, help="shops per worker partition")
+    parser.add_argument("--routing", choices=ROUTING_POLICIES, default="nearest", help="routing policy")
+    parser.add_argument("--time", type=int, default=SIMULATION_TIME, help="simulation time in minutes")
+    parser.add_argument("--barbers", type=int, default=NUM_BARBERS, help="barbers per shop")
+    parser.add_argument("--waiting-room", type=int, default=WAITING_ROOM_SIZE, help="waiting room size per shop")
+    parser.add_argument("--arrival-rate", type=float, default=CUSTOMER_ARRIVAL_RATE, help="arrival rate per shop")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--per-shop", action="store_true", help="print one line per shop")
+    args = parser.parse_args()
+
+    params = {
+        "simulation_time": args.time,
+        "num_barbers": args.barbers,
+        "waiting_room_size": args.waiting_room,
+        "arrival_rate": args.arrival_rate,
+    }
+    shop_trackers = run_chain(args.shops, args.partition_size, args.routing, args.seed, args.workers, params)
+    print_shops_summary(shop_trackers, per_shop=args.per_shop)
+
+
+if __name__ == "__main__":
+    main()
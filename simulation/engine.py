@@ -0,0 +1,477 @@
+"""
+Discrete-event simulation engine for the barbershop.
+
+Instead of pacing the run with wall-clock sleeps, the engine keeps a calendar
+(a heap) of arrival, service-start and service-end events and jumps the clock
+straight from one event to the next. It drives the same Order, Barber and
+StatsTracker logic as the threaded real-time mode, so a full simulated day
+finishes in milliseconds.
+"""
+
+import heapq
+import random
+from collections import deque
+from config import SIMULATION_TIME, CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from generator.arrival_process import BernoulliArrivals
+from generator.order_generator import OrderGenerator
+from models.barber import Barber
+from models.dispatch import make_policy
+from models.waiting_room import WaitingRoom
+from utils import event_log
+from utils.stats_tracker import StatsTracker
+
+# Event kinds. The value doubles as the tie-breaker for events at the same
+# timestamp: staffing changes first, then a finishing barber frees the chair
+# and takes the next customer before a new arrival checks whether the waiting
+# room is full.
+SHIFT_CHANGE = -1
+SERVICE_END = 0
+SERVICE_START = 1
+ARRIVAL = 2
+
+SHIFT_MINUTES = 60  # length of a staffing slot
+
+
+class Shop:
+    """
+    State of one barbershop inside an event-calendar simulation.
+
+    Attributes:
+        name (str): Name of the shop.
+        shop_id (int): Number of the shop, used in event logs.
+        arrival_rate (float): Probability of a customer arriving per minute.
+        arrival_process (object): Arrival process of the shop (see generator.arrival_process).
+        trace (TraceReplay): Recorded trace replayed instead of generating customers, if any.
+        order_queue (WaitingRoom): The shop's waiting room.
+        stats_tracker (StatsTracker): Statistics of the shop.
+        barbers (list of Barber): Barbers of the shop (never started as threads).
+        position (float): Location of the shop, used to find the nearest shop when routing.
+        staffing (list of int): Barbers on duty in every hour, if the shop works in shifts.
+        skills (list of SkillProfile): Skill profile of every barber, if the barbers differ.
+        on_duty (int): Barbers currently on duty.
+        off_duty (deque of Barber): Barbers currently off duty.
+        leaving (int): Busy barbers going off duty once their current customer is served.
+    """
+
+    def __init__(self, name, stats_tracker, arrival_rate=CUSTOMER_ARRIVAL_RATE,
+                 waiting_room_size=WAITING_ROOM_SIZE, num_barbers=NUM_BARBERS, hourly_wages=HOURLY_WAGES,
+                 barber_prefix="", position=0, arrival_process=None, trace=None, shop_id=0, staffing=None,
+                 skills=None, dispatch=None, service_rng=None):
+        """
+        Initialize a shop with idle barbers and an empty waiting room.
+
+        Args:
+            name (str): Name of the shop.
+            stats_tracker (StatsTracker): Statistics tracker of the shop.
+            arrival_rate (float): Probability of a customer arriving per minute.
+            waiting_room_size (int): Maximum number of customers waiting in the queue.
+            num_barbers (int): Number of barbers serving customers in parallel.
+            hourly_wages (float): Hourly wage for each barber.
+            barber_prefix (str): Prefix for barber names, to keep them unique across shops.
+            position (float): Location of the shop.
+            arrival_process (object, optional): Arrival process. Defaults to the per-minute
+                                                arrival coin at `arrival_rate`.
+            trace (TraceReplay, optional): Recorded trace whose orders replace the arrival process.
+            shop_id (int, optional): Number of the shop, used in event logs.
+            staffing (list of int, optional): Barbers on duty in every hour (SHIFT_MINUTES), replacing
+                                              `num_barbers`. The last value holds until the shop closes.
+            skills (list of SkillProfile, optional): Skill profile of every barber, replacing `num_barbers`
+                                                     and `hourly_wages`. Barbers come on duty in this order.
+            dispatch (str or callable, optional): Dispatch policy of the waiting room, a name from
+                                                  models.dispatch.POLICIES or a policy factory. Defaults to "fifo".
+            service_rng (random.Random or RandomStream, optional): Source of the seeds of the barbers'
+                                                                 service-time samplers, if they have skills.
+
+        Raises:
+            ValueError: If an hour of the staffing has no barber on duty, or more barbers than have a skill profile.
+        """
+        if staffing is not None:
+            if not staffing or min(staffing) < 1:
+                raise ValueError("staffing needs at least one barber on duty every hour")
+            num_barbers = max(staffing)
+        if skills is not None:
+            if len(skills) < num_barbers and staffing is not None:
+                raise ValueError("staffing puts more barbers on duty than there are skill profiles")
+            num_barbers = len(skills)
+        self.name = name
+        self.shop_id = shop_id
+        self.arrival_rate = arrival_rate
+        self.arrival_process = arrival_process if arrival_process is not None else BernoulliArrivals(arrival_rate)
+        self.trace = trace
+        self.arrivals = None  # iterator over the arrival times (or traced orders) of the current run
+        self.stats_tracker = stats_tracker
+        self.position = position
+        self.order_queue = WaitingRoom(waiting_room_size, make_policy(dispatch))
+        self.barbers = Barber.generate_barbers(
+            self.order_queue,
+            stats_tracker=stats_tracker,
+            num_of_barbers=num_barbers,
+            wage=hourly_wages,
+            skills=skills,
+            name_prefix=barber_prefix,
+            service_rng=service_rng
+        )
+        self.order_queue.policy.bind(self.barbers)
+
+        self.staffing = staffing
+        self.skills = skills
+        self.on_duty = staffing[0] if staffing is not None else num_barbers
+        self.idle_barbers = deque(self.barbers[:self.on_duty])
+        self.off_duty = deque(self.barbers[self.on_duty:])
+        self.leaving = 0
+        self.idle_since = {barber.name: 0 for barber in self.barbers}
+
+    def take_idle_barber(self, order):
+        """
+        Take an idle barber who may serve an order off the idle list.
+
+        Args:
+            order (Order): The order just seated in the waiting room.
+
+        Returns:
+            Barber: The barber, or None if no idle barber may take the order.
+        """
+        if not self.order_queue.policy.selective:
+            return self.idle_barbers.popleft()
+        eligible = self.order_queue.policy.eligible
+        for barber in self.idle_barbers:
+            if eligible(order, barber):
+                self.idle_barbers.remove(barber)
+                return barber
+        return None
+
+    def has_room(self):
+        """Return True if an arriving customer can take a seat in the waiting room."""
+        return len(self.order_queue) < self.order_queue.capacity
+
+
+class EventSimulation:
+    """
+    Headless event-calendar simulation of a single barbershop.
+
+    Attributes:
+        order_gen (OrderGenerator): Generator for arriving customer orders.
+        stats_tracker (StatsTracker): Tracker receiving all simulation statistics.
+        simulation_time (int): Minutes during which customers may arrive.
+        arrival_rate (float): Probability of a customer arriving per minute.
+        waiting_room_size (int): Maximum number of customers waiting in the queue.
+        order_queue (WaitingRoom): Waiting room shared with the barbers.
+        barbers (list of Barber): Barbers serving the shop (never started as threads).
+        shops (list of Shop): Simulated shops (a single one for EventSimulation).
+        order_log (OrderLog): Optional columnar log of served orders.
+        event_log (EventLogWriter): Optional binary log of every event.
+        streams (RandomStreams): Optional per-source random streams, shared by all shops.
+        clock (float): Current simulation time in minutes.
+        started (bool): Whether the run has started.
+        finished (bool): Whether every arrived customer has been served or lost.
+    """
+
+    def __init__(self, order_gen=None, stats_tracker=None, simulation_time=SIMULATION_TIME,
+                 arrival_rate=CUSTOMER_ARRIVAL_RATE, waiting_room_size=WAITING_ROOM_SIZE,
+                 num_barbers=NUM_BARBERS, hourly_wages=HOURLY_WAGES, order_log=None, shops=None,
+                 arrival_process=None, trace=None, event_log=None, staffing=None, streams=None, skills=None,
+                 dispatch=None):
+        """
+        Initialize the simulation.
+
+        Args:
+            order_gen (OrderGenerator, optional): Order generator. A new one is created if omitted.
+            stats_tracker (StatsTracker, optional): Statistics tracker. A new one is created if omitted.
+            simulation_time (int): Minutes during which customers may arrive.
+            arrival_rate (float): Probability of a customer arriving per minute.
+            waiting_room_size (int): Maximum number of customers waiting in the queue.
+            num_barbers (int): Number of barbers serving customers in parallel.
+            hourly_wages (float): Hourly wage for each barber, used when creating the stats tracker.
+            order_log (OrderLog, optional): Columnar log receiving every served order.
+            shops (list of Shop, optional): Pre-built shops to simulate instead of a single shop
+                                            built from the parameters above.
+            arrival_process (object, optional): Arrival process of the shop, e.g. PoissonArrivals
+                                                with a time-of-day profile. Defaults to the
+                                                per-minute arrival coin at `arrival_rate`.
+            trace (TraceReplay, optional): Recorded trace replayed into the shop instead of
+                                           generated customers arriving before `simulation_time`.
+            event_log (EventLogWriter, optional): Binary log receiving every event of the run.
+            staffing (list of int, optional): Barbers on duty in every hour, replacing `num_barbers`.
+                                              Barbers going off duty finish their current customer first.
+            streams (RandomStreams, optional): Per-source random streams drawing the arrivals,
+                                               customers and service times instead of the `random`
+                                               module, so that runs with the same seed see identical
+                                               customers.
+            skills (list of SkillProfile, optional): Skill profile of every barber (see models.skill),
+                                                     replacing `num_barbers` and `hourly_wages`.
+            dispatch (str or callable, optional): Dispatch policy of the waiting room (see models.dispatch).
+        """
+        self.order_gen = order_gen if order_gen is not None else OrderGenerator()
+        self.stats_tracker = stats_tracker if stats_tracker is not None else StatsTracker(hourly_wages)
+        self.simulation_time = simulation_time
+        self.arrival_rate = arrival_rate
+        self.waiting_room_size = waiting_room_size
+        self.order_log = order_log
+        self.event_log = event_log
+        self.streams = streams
+
+        if shops is None:
+            shops = [Shop("Shop-1", self.stats_tracker, arrival_rate, waiting_room_size, num_barbers, hourly_wages,
+                          arrival_process=arrival_process, trace=trace, staffing=staffing, skills=skills,
+                          dispatch=dispatch, service_rng=streams.service if streams is not None else None)]
+        self.shops = shops
+        self.order_queue = shops[0].order_queue
+        self.barbers = shops[0].barbers
+
+        self.clock = 0
+        self._calendar = []
+        self._sequence = 0
+        self._customers = 0
+        self.started = False
+        self.finished = False
+
+    def schedule(self, time, kind, payload=None):
+        """
+        Put an event on the calendar.
+
+        Args:
+            time (float): Simulation time at which the event fires.
+            kind (int): One of ARRIVAL, SERVICE_START, SERVICE_END, SHIFT_CHANGE or a kind added by a subclass.
+            payload (tuple, optional): (shop, order) for arrivals, with order None for customers
+                                       generated on arrival, (shop, barber) for services, or
+                                       (shop, barbers on duty) for shift changes.
+        """
+        heapq.heappush(self._calendar, (time, kind, self._sequence, payload))
+        self._sequence += 1
+
+    def run(self, until=None):
+        """
+        Run the simulation until every arrived customer has been served or lost.
+
+        Args:
+            until (float, optional): Pause once the events up to this minute have been processed.
+                                     Calling run() again continues from there.
+
+        Returns:
+            StatsTracker: The tracker holding the results of the run (complete once finished).
+        """
+        if not self.started:
+            self.started = True
+            for shop in self.shops:
+                if shop.trace is not None:
+                    shop.arrivals = shop.trace.orders(self.simulation_time)
+                else:
+                    rng = self.streams.arrivals if self.streams is not None else None
+                    shop.arrivals = shop.arrival_process.times(self.simulation_time, rng)
+                self._schedule_next_arrival(shop)
+                self._schedule_shift_changes(shop)
+                if self.event_log is not None:
+                    for barber in shop.barbers:
+                        self.event_log.record(shop.stats_tracker.wage(barber.name), event_log.WAGE,
+                                              barber_id=barber.barber_id, shop_id=shop.shop_id)
+                for barber in shop.off_duty:
+                    self._log_duty(event_log.OFF_DUTY, shop, barber)
+
+        while self._calendar:
+            if until is not None and self._calendar[0][0] > until:
+                self.clock = max(self.clock, until)
+                break
+            time, kind, _, payload = heapq.heappop(self._calendar)
+            self.clock = time
+            if kind == ARRIVAL:
+                self._on_arrival(*payload)
+            elif kind == SERVICE_START:
+                self._on_service_start(*payload)
+            elif kind == SERVICE_END:
+                self._on_service_end(*payload)
+            else:
+                self._on_event(kind, payload)
+            if not self._calendar:
+                self._release_stranded_customers()
+        else:
+            if not self.finished:
+                self.finished = True
+                self._finish()
+
+        if self.event_log is not None:
+            self.event_log.flush()
+        return self.stats_tracker
+
+    def _release_stranded_customers(self):
+        """
+        Once nothing else will happen, let idle barbers take the customers still waiting for a
+        barber who is off duty until closing, so that every customer is served or lost.
+        """
+        for shop in self.shops:
+            if not len(shop.order_queue) or not shop.idle_barbers:
+                continue
+            shop.order_queue.policy.release_requests()
+            can_serve = shop.order_queue.policy.can_serve
+            for barber in list(shop.idle_barbers):
+                if can_serve(barber):
+                    shop.idle_barbers.remove(barber)
+                    self.schedule(self.clock, SERVICE_START, (shop, barber))
+
+    def reseed(self, seed):
+        """
+        Reseed the random draws of the rest of the run, e.g. to branch simulations restored
+        from the same snapshot.
+
+        Args:
+            seed (int): Seed for the `random` module (and the random streams, if any), from which
+                        arrival generators and service-time samplers are reseeded too.
+        """
+        random.seed(seed)
+        if self.streams is not None:
+            self.streams.reseed(seed)
+        for shop in self.shops:
+            if shop.arrivals is not None:
+                shop.arrivals.reseed()
+            service_times = shop.barbers[0].service_times if shop.barbers else None
+            if service_times is not None:
+                service_times.reseed()
+
+    def _finish(self):
+        """Close the books once the last customer has left."""
+        for shop in self.shops:
+            self._record_final_idle_time(shop)
+
+    def __getstate__(self):
+        # The event log is an open file; a restored simulation gets its own writer
+        state = self.__dict__.copy()
+        state["event_log"] = None
+        return state
+
+    def _schedule_next_arrival(self, shop):
+        """Schedule the shop's next arrival, if another customer arrives before closing time."""
+        arrival = next(shop.arrivals, None)
+        if arrival is None:
+            return
+        if shop.trace is not None:
+            self.schedule(arrival.arrival_time, ARRIVAL, (shop, arrival))
+        else:
+            self.schedule(arrival, ARRIVAL, (shop, None))
+
+    def _schedule_shift_changes(self, shop):
+        """Schedule every change of the shop's staffing before closing time."""
+        if shop.staffing is None:
+            return
+        for hour in range(1, len(shop.staffing)):
+            time = hour * SHIFT_MINUTES
+            if time >= self.simulation_time:
+                break
+            if shop.staffing[hour] != shop.staffing[hour - 1]:
+                self.schedule(time, SHIFT_CHANGE, (shop, shop.staffing[hour]))
+
+    def _on_event(self, kind, payload):
+        """
+        Handle an event of a kind other than arrivals and services.
+
+        Subclasses adding event kinds of their own override this and pass the base kinds on.
+
+        Args:
+            kind (int): Kind of the event.
+            payload (tuple): Payload the event was scheduled with.
+        """
+        if kind == SHIFT_CHANGE:
+            self._on_shift_change(*payload)
+        else:
+            raise ValueError(f"Unknown event kind {kind}")
+
+    def _on_shift_change(self, shop, on_duty):
+        change = on_duty - shop.on_duty
+        shop.on_duty = on_duty
+        if change > 0:
+            # Barbers about to leave stay on instead, then barbers off duty come in
+            staying = min(change, shop.leaving)
+            shop.leaving -= staying
+            for _ in range(change - staying):
+                barber = shop.off_duty.popleft()
+                self._log_duty(event_log.ON_DUTY, shop, barber)
+                shop.idle_since[barber.name] = self.clock
+                self.schedule(self.clock, SERVICE_START, (shop, barber))
+        else:
+            # Idle barbers go home now, busy ones once their customer is served
+            for _ in range(min(-change, len(shop.idle_barbers))):
+                barber = shop.idle_barbers.pop()
+                shop.stats_tracker.record_idle_time(barber.name, self.clock - shop.idle_since[barber.name])
+                shop.off_duty.append(barber)
+                self._log_duty(event_log.OFF_DUTY, shop, barber)
+                change += 1
+            shop.leaving -= change
+
+    def _on_arrival(self, shop, new_order):
+        if new_order is None:
+            new_order = self.order_gen.generate_order(self.streams)
+            new_order.arrival_time = self.clock
+        new_order.order_id = self._customers
+        self._customers += 1
+
+        target = self.admit(shop, new_order)
+        if target is not None:
+            target.stats_tracker.record_new_customer(len(target.order_queue))
+            barber = target.take_idle_barber(new_order) if target.idle_barbers else None
+            if barber is not None:
+                self.schedule(self.clock, SERVICE_START, (target, barber))
+        else:
+            shop.stats_tracker.record_customer_lost()
+
+        if self.event_log is not None:
+            if target is not shop:
+                self._log(event_log.ROUTE if target is not None else event_log.BALK, shop, new_order)
+            if target is not None:
+                self._log(event_log.ARRIVAL, target, new_order)
+
+        self._schedule_next_arrival(shop)
+
+    def admit(self, shop, order):
+        """
+        Seat an arriving customer.
+
+        Args:
+            shop (Shop): Shop the customer arrived at.
+            order (Order): The customer's order.
+
+        Returns:
+            Shop: The shop whose waiting room took the customer, or None if the customer left.
+        """
+        return shop if shop.order_queue.put(order) else None
+
+    def _on_service_start(self, shop, barber):
+        order = shop.order_queue.get_nowait(barber)
+        if order is None:
+            shop.idle_barbers.append(barber)
+            return
+
+        shop.stats_tracker.record_idle_time(barber.name, self.clock - shop.idle_since[barber.name])
+        barber.begin_service(order, self.clock)
+        if self.event_log is not None:
+            self._log(event_log.SERVICE_START, shop, order, barber.barber_id)
+        self.schedule(self.clock + order.duration, SERVICE_END, (shop, barber))
+
+    def _on_service_end(self, shop, barber):
+        order = barber.current_order
+        if self.order_log is not None:
+            self.order_log.record(order, self.clock - order.duration, self.clock, barber.barber_id)
+        if self.event_log is not None:
+            self._log(event_log.SERVICE_END, shop, order, barber.barber_id)
+        barber.finish_service(order)
+        if shop.leaving:
+            shop.leaving -= 1
+            shop.off_duty.append(barber)
+            self._log_duty(event_log.OFF_DUTY, shop, barber)
+            return
+        shop.idle_since[barber.name] = self.clock
+        self.schedule(self.clock, SERVICE_START, (shop, barber))
+
+    def _record_final_idle_time(self, shop):
+        """Count the time idle barbers on duty wait for the shop to close as idle time."""
+        closing_time = max(self.simulation_time, self.clock)
+        for barber in shop.barbers:
+            if barber in shop.off_duty:
+                continue
+            shop.stats_tracker.record_idle_time(barber.name, closing_time - shop.idle_since[barber.name])
+        if self.event_log is not None:
+            self.event_log.record(closing_time, event_log.CLOSE, barber_id=len(shop.barbers), shop_id=shop.shop_id)
+
+    def _log(self, kind, shop, order, barber_id=-1):
+        self.event_log.record(self.clock, kind, order.haircut.code, barber_id, shop.shop_id, order.order_id)
+
+    def _log_duty(self, kind, shop, barber):
+        if self.event_log is not None:
+            self.event_log.record(self.clock, kind, barber_id=barber.barber_id, shop_id=shop.shop_id)
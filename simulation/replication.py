@@ -0,0 +1,240 @@
+"""
+Monte Carlo replication runner for the event-calendar engine.
+
+Runs many independent replications of the same shop across a process pool and
+merges their StatsTracker summaries into mean / variance / confidence interval
+tables. Every replication gets its own seed derived from a master seed, and
+results are merged in replication order, so the aggregates are identical no
+matter how many workers are used.
+
+Replications run with streaming trackers, so workers send back constant-size
+statistics and quantile sketches rather than raw wait times, and the sketches
+are merged into pooled wait / sojourn percentiles across all replications.
+
+Usage:
+    python -m simulation.replication --replications 1000 --seed 42
+"""
+
+import argparse
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from config import HOURLY_WAGES
+from generator.arrival_process import PoissonArrivals, PiecewiseRate
+from generator.order_generator import OrderGenerator
+from generator.random_streams import RandomStreams
+from models.dispatch import POLICIES
+from models.skill import parse_skills
+from simulation.engine import EventSimulation
+from utils.event_log import EventLogWriter, append_event_log
+from utils.stats_tracker import StatsTracker
+
+# One order generator per process, so the name table is loaded once per worker
+# instead of once per replication.
+_order_gen = None
+
+
+def shared_order_generator():
+    """
+    Return the order generator shared by all replications run in this process.
+
+    Returns:
+        OrderGenerator: The process-wide order generator.
+    """
+    global _order_gen
+    if _order_gen is None:
+        _order_gen = OrderGenerator()
+    return _order_gen
+
+
+def replication_seeds(master_seed, count):
+    """
+    Derive per-replication seeds from a master seed.
+
+    Args:
+        master_seed (int): Seed identifying the whole study.
+        count (int): Number of replications.
+
+    Returns:
+        list of int: One 64-bit seed per replication.
+    """
+    rng = random.Random(master_seed)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+
+def run_replication(seed, params=None, event_log=None, replication=0, streams=False):
+    """
+    Run a single seeded replication on the event engine.
+
+    Args:
+        seed (int): Seed for this replication.
+        params (dict, optional): Keyword arguments passed to EventSimulation.
+        event_log (str, optional): Path of a binary event log the run's events are appended to.
+        replication (int, optional): Replication number written to the event log.
+        streams (bool, optional): Draw the customers from per-source random streams seeded with
+                                  `seed`, so that every configuration run with the same seed sees
+                                  the same customers (see generator.random_streams).
+
+    Returns:
+        StatsTracker: The streaming tracker holding the results of the run.
+    """
+    random.seed(seed)
+    params = dict(params or {})
+    if streams:
+        params["streams"] = RandomStreams(seed)
+    stats_tracker = StatsTracker(params.get("hourly_wages", HOURLY_WAGES), streaming=True)
+    if event_log is None:
+        return EventSimulation(shared_order_generator(), stats_tracker, **params).run()
+    with EventLogWriter(event_log, replication) as writer:
+        return EventSimulation(shared_order_generator(), stats_tracker, event_log=writer, **params).run()
+
+
+def _run_replication_args(args):
+    return run_replication(*args)
+
+
+def run_replications(count, master_seed=0, workers=None, params=None, event_log=None, streams=False):
+    """
+    Run independent replications, spread over a process pool.
+
+    Args:
+        count (int): Number of replications.
+        master_seed (int): Seed from which per-replication seeds are derived.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPU cores.
+        params (dict, optional): Keyword arguments passed to EventSimulation.
+        event_log (str, optional): Path of a binary event log all replications are appended to,
+                                   in replication order.
+        streams (bool, optional): Draw the customers from per-source random streams, for common
+                                  random numbers across configurations (see run_replication()).
+
+    Returns:
+        list of StatsTracker: Replication results, in replication order.
+    """
+    seeds = replication_seeds(master_seed, count)
+    if event_log is None:
+        jobs = [(seed, params, None, index, streams) for index, seed in enumerate(seeds)]
+    else:
+        # Every replication logs to its own part file, appended to the log in replication order
+        jobs = [(seed, params, f"{event_log}.part{index}", index, streams) for index, seed in enumerate(seeds)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        results = map(_run_replication_args, jobs)
+        return _collect_results(results, jobs, event_log)
+
+    chunksize = max(1, count // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _collect_results(pool.map(_run_replication_args, jobs, chunksize=chunksize), jobs, event_log)
+
+
+def _collect_results(results, jobs, event_log):
+    trackers = []
+    for tracker, job in zip(results, jobs):
+        trackers.append(tracker)
+        if event_log is not None:
+            append_event_log(event_log, job[2])
+            os.remove(job[2])
+    return trackers
+
+
+def pool(trackers):
+    """
+    Merge replication trackers into one, e.g. for percentiles across all customers.
+
+    Args:
+        trackers (list of StatsTracker): Replication results, as returned by run_replications().
+
+    Returns:
+        StatsTracker: Streaming tracker holding the pooled statistics.
+    """
+    pooled = StatsTracker(trackers[0].hourly_wages, streaming=True)
+    for tracker in trackers:
+        pooled.merge(tracker)
+    return pooled
+
+
+def aggregate(summaries, confidence=0.95):
+    """
+    Merge replication summaries into per-metric statistics.
+
+    The confidence interval uses the normal approximation, which is accurate
+    for the replication counts used in capacity studies.
+
+    Args:
+        summaries (list of dict): Replication summaries (StatsTracker.summary()).
+        confidence (float): Confidence level of the interval.
+
+    Returns:
+        dict: Metric name mapped to a dict with mean, variance, ci_low and ci_high.
+    """
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    n = len(summaries)
+    table = {}
+
+    for metric in summaries[0]:
+        values = [summary[metric] for summary in summaries]
+        mean = statistics.fmean(values)
+        variance = statistics.variance(values) if n > 1 else 0
+        half_width = z * (variance / n) ** 0.5
+        table[metric] = {
+            "mean": mean,
+            "variance": variance,
+            "ci_low": mean - half_width,
+            "ci_high": mean + half_width,
+        }
+    return table
+
+
+def print_table(table, confidence=0.95):
+    """Print an aggregate table produced by aggregate()."""
+    ci_label = f"{round(confidence * 100)}% CI"
+    print(f"{'Metric':26} {'Mean':>12} {'Variance':>12}   {ci_label}")
+    for metric, row in table.items():
+        print(f"{metric:26} {row['mean']:12.2f} {row['variance']:12.2f}   "
+              f"[{row['ci_low']:.2f}, {row['ci_high']:.2f}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Monte Carlo replications of the barbershop")
+    parser.add_argument("--replications", type=int, default=1000, help="number of replications")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level of the intervals")
+    parser.add_argument("--hourly-rates", default=None,
+                        help="Poisson arrivals following customers per hour, e.g. 10,14,30,18,12,24,28,16")
+    parser.add_argument("--event-log", default=None, help="append every event to this binary event log")
+    parser.add_argument("--skills", default=None,
+                        help="skill profile of every barber, e.g. senior,junior*3 (see models/skill.py)")
+    parser.add_argument("--dispatch", choices=POLICIES, default=None,
+                        help="which waiting customer a free barber takes (default: fifo)")
+    parser.add_argument("--streams", action="store_true",
+                        help="draw customers from per-source random streams (common random numbers)")
+    args = parser.parse_args()
+
+    params = {}
+    if args.hourly_rates:
+        hourly_rates = [float(rate) for rate in args.hourly_rates.split(",")]
+        params = {
+            "arrival_process": PoissonArrivals(PiecewiseRate.hourly(hourly_rates)),
+            "simulation_time": 60 * len(hourly_rates),
+        }
+    if args.skills:
+        params["skills"] = parse_skills(args.skills)
+    if args.dispatch:
+        params["dispatch"] = args.dispatch
+
+    trackers = run_replications(args.replications, master_seed=args.seed, workers=args.workers, params=params,
+                                event_log=args.event_log, streams=args.streams)
+    print(f"=== {args.replications} Replications (seed {args.seed}) ===\n")
+    print_table(aggregate([tracker.summary() for tracker in trackers], args.confidence), args.confidence)
+
+    pooled = pool(trackers)
+    print("\nPooled over all customers:")
+    for label, sketch in (("Wait time", pooled.wait_sketch), ("Time in shop", pooled.sojourn_sketch)):
+        print(f"{label:14} p50={sketch.quantile(0.50):.2f}  p95={sketch.quantile(0.95):.2f}  "
+              f"p99={sketch.quantile(0.99):.2f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Snapshots of event-engine simulations: checkpoint, resume and fork.
+
+A snapshot holds the complete state of an EventSimulation (or ChainSimulation)
+paused with run(until=...): the event calendar, the waiting rooms, the orders
+in the chairs (their service end events carry the remaining time), the arrival
+processes, the accumulated statistics and the state of the `random` module.
+It is stored as a zlib-compressed pickle behind a short magic header.
+
+Long runs can checkpoint periodically and resume after a crash, and many
+what-if branches can be forked from one warmed-up state instead of simulating
+the warm-up again for every branch. Every branch is reseeded, so branches
+share their history but not their future.
+
+Usage:
+    python -m simulation.snapshot warmup --time 40320 --until 10080 --output warm.snap
+    python -m simulation.snapshot resume warm.snap --checkpoint-every 1440
+    python -m simulation.snapshot fork warm.snap --branches 100 --seed 1
+"""
+
+import argparse
+import os
+import pickle
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from simulation.engine import EventSimulation
+from simulation.replication import replication_seeds, aggregate, print_table
+from utils.stats_tracker import StatsTracker
+
+MAGIC = b"BSSNAP1\n"
+
+
+def snapshot(simulation):
+    """
+    Capture the state of a paused (or not yet started) simulation.
+
+    Args:
+        simulation (EventSimulation): The simulation.
+
+    Returns:
+        bytes: The compressed snapshot.
+    """
+    state = {"simulation": simulation, "random_state": random.getstate()}
+    return MAGIC + zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+
+def restore(data, event_log=None, seed=None):
+    """
+    Rebuild a simulation from a snapshot, ready to continue with run().
+
+    Restores the state of the `random` module as well.
+
+    Args:
+        data (bytes): Snapshot, as returned by snapshot().
+        event_log (EventLogWriter, optional): Event log the restored run writes to.
+        seed (int, optional): Reseed the rest of the run, e.g. for a forked branch.
+                              Continues the original random stream if omitted.
+
+    Returns:
+        EventSimulation: The restored simulation.
+
+    Raises:
+        ValueError: If the data is not a snapshot.
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("not a simulation snapshot")
+    state = pickle.loads(zlib.decompress(data[len(MAGIC):]))
+    simulation = state["simulation"]
+    simulation.event_log = event_log
+    random.setstate(state["random_state"])
+    if seed is not None:
+        simulation.reseed(seed)
+    return simulation
+
+
+def save_snapshot(simulation, file):
+    """
+    Write a snapshot to a file, replacing it atomically so a crash never leaves a torn checkpoint.
+
+    Args:
+        simulation (EventSimulation): The simulation.
+        file (str): Path of the snapshot file.
+    """
+    temporary = file + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(snapshot(simulation))
+    os.replace(temporary, file)
+
+
+def load_snapshot(file, event_log=None, seed=None):
+    """
+    Rebuild a simulation from a snapshot file (see restore()).
+
+    Args:
+        file (str): Path of the snapshot file.
+        event_log (EventLogWriter, optional): Event log the restored run writes to.
+        seed (int, optional): Reseed the rest of the run.
+
+    Returns:
+        EventSimulation: The restored simulation.
+    """
+    with open(file, "rb") as f:
+        return restore(f.read(), event_log, seed)
+
+
+def run_with_checkpoints(simulation, file, every):
+    """
+    Run a simulation to the end, saving a snapshot every `every` simulated minutes.
+
+    Args:
+        simulation (EventSimulation): The simulation, new or restored.
+        file (str): Path of the snapshot file, overwritten at every checkpoint.
+        every (float): Simulated minutes between checkpoints.
+
+    Returns:
+        StatsTracker: The tracker holding the results of the run.
+    """
+    while not simulation.finished:
+        simulation.run(until=simulation.clock + every)
+        save_snapshot(simulation, file)
+    return simulation.stats_tracker
+
+
+def _run_branch(data, seed):
+    return restore(data, seed=seed).run()
+
+
+def run_branches(data, count, master_seed=0, workers=None):
+    """
+    Fork a snapshot into independently reseeded branches and run each to the end.
+
+    Args:
+        data (bytes): Snapshot, as returned by snapshot().
+        count (int): Number of branches.
+        master_seed (int): Seed from which per-branch seeds are derived.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPU cores.
+
+    Returns:
+        list of StatsTracker: Branch results, in branch order.
+    """
+    seeds = replication_seeds(master_seed, count)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_run_branch(data, seed) for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_branch, [data] * count, seeds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint, resume and fork event-engine simulations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warmup = commands.add_parser("warmup", help="run a new simulation up to a time and snapshot it")
+    warmup.add_argument("--time", type=int, required=True, help="simulation time in minutes")
+    warmup.add_argument("--until", type=float, required=True, help="minute at which to snapshot")
+    warmup.add_argument("--seed", type=int, default=0, help="seed of the run")
+    warmup.add_argument("--output", required=True, help="snapshot file")
+
+    resume = commands.add_parser("resume", help="continue a snapshot to the end")
+    resume.add_argument("snapshot")
+    resume.add_argument("--checkpoint-every", type=float, default=None,
+                        help="overwrite the snapshot every this many simulated minutes")
+
+    fork = commands.add_parser("fork", help="run reseeded branches of a snapshot to the end")
+    fork.add_argument("snapshot")
+    fork.add_argument("--branches", type=int, default=100, help="number of branches")
+    fork.add_argument("--seed", type=int, default=0, help="master seed of the branches")
+    fork.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    if args.command == "warmup":
+        random.seed(args.seed)
+        simulation = EventSimulation(stats_tracker=StatsTracker(streaming=True), simulation_time=args.time)
+        simulation.run(until=args.until)
+        save_snapshot(simulation, args.output)
+        print(f"Saved the state at minute {simulation.clock:g} to '{args.output}'")
+    elif args.command == "resume":
+        simulation = load_snapshot(args.snapshot)
+        if args.checkpoint_every:
+            run_with_checkpoints(simulation, args.snapshot, args.checkpoint_every).print_summary()
+        else:
+            simulation.run().print_summary()
+    else:
+        with open(args.snapshot, "rb") as f:
+            data = f.read()
+        trackers = run_branches(data, args.branches, args.seed, args.workers)
+        print(f"=== {args.branches} Branches of '{args.snapshot}' (seed {args.seed}) ===\n")
+        print_table(aggregate([tracker.summary() for tracker in trackers]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+"""
+Staffing optimizer: search the number of barbers on duty in every hour for maximum profit.
+
+A schedule lists the barbers on duty per hour (see the `staffing` argument of
+EventSimulation). Every candidate schedule is evaluated on the same customer
+streams (common random numbers): the arrivals, haircuts and durations of each
+replication are drawn once, exactly as the event engine draws them for that
+seed, and replayed against every schedule. Differences between candidates then
+reflect the schedules rather than the luck of the draw, so far fewer
+replications tell them apart.
+
+Schedules are evaluated by a compact multi-server queue replaying a stream,
+equivalent to running the event engine with that staffing (customers served,
+lost and their waits are identical; wages are paid per barber-minute on duty
+instead of per rounded barber total). The search is a local search over
+schedules one barber-hour apart; each round races the neighbours of the
+current schedule: all of them start with a few replications, and candidates
+whose paired profit difference to the leader is clearly negative, or which
+clearly violate the constraint, are dropped before the remaining replications.
+
+Usage:
+    python -m simulation.staffing --hourly-rates 10,14,30,18,12,24,28,16 --max-lost 0.05
+    python -m simulation.staffing --hourly-rates 10,14,30,18,12,24,28,16 --max-p95-wait 10 --check 200
+"""
+
+import argparse
+import heapq
+import math
+import random
+import statistics
+import time
+from collections import deque
+from config import SIMULATION_TIME, CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from generator.arrival_process import BernoulliArrivals, PoissonArrivals, PiecewiseRate
+from simulation.analytic import service_moments
+from simulation.engine import SHIFT_MINUTES
+from simulation.replication import replication_seeds, shared_order_generator, run_replications, aggregate
+
+INFINITY = float("inf")
+
+
+def draw_stream(seed, simulation_time=SIMULATION_TIME, arrival_process=None, arrival_rate=CUSTOMER_ARRIVAL_RATE):
+    """
+    Draw the customers of one replication, in the same order the event engine draws them.
+
+    Args:
+        seed (int): Seed of the replication.
+        simulation_time (int): Minutes during which customers may arrive.
+        arrival_process (object, optional): Arrival process. Defaults to the per-minute arrival coin.
+        arrival_rate (float): Probability of a customer arriving per minute, for the default process.
+
+    Returns:
+        tuple: (arrival times, durations, prices), one list entry per customer.
+    """
+    random.seed(seed)
+    if arrival_process is None:
+        arrival_process = BernoulliArrivals(arrival_rate)
+    order_gen = shared_order_generator()
+    times, durations, prices = [], [], []
+    for arrival_time in arrival_process.times(simulation_time):
+        order = order_gen.generate_order()
+        times.append(arrival_time)
+        durations.append(order.duration)
+        prices.append(order.haircut.price)
+    return times, durations, prices
+
+
+def evaluate_schedule(staffing, stream, waiting_room_size=WAITING_ROOM_SIZE, hourly_wages=HOURLY_WAGES,
+                      simulation_time=SIMULATION_TIME):
+    """
+    Replay a customer stream against a staffing schedule.
+
+    Follows the event engine: staffing changes at the start of every hour before
+    closing time, barbers going off duty finish their current customer first, and
+    barbers on duty when the doors close stay until every seated customer is served.
+
+    Args:
+        staffing (tuple of int): Barbers on duty in every hour; the last value holds until closing.
+        stream (tuple): Customers, as returned by draw_stream().
+        waiting_room_size (int): Maximum number of customers waiting in the queue.
+        hourly_wages (float): Hourly wage for each barber.
+        simulation_time (int): Minutes during which customers may arrive.
+
+    Returns:
+        dict: profit, revenue, wages, customers_served, customers_lost, lost_fraction,
+              avg_wait_time and p95_wait_time of the run.
+    """
+    times, durations, prices = stream
+    shifts = [(hour * SHIFT_MINUTES, staffing[hour]) for hour in range(1, len(staffing))
+              if staffing[hour] != staffing[hour - 1] and hour * SHIFT_MINUTES < simulation_time]
+    shifts.append((INFINITY, 0))
+
+    on_duty = idle = staffing[0]
+    leaving = 0
+    busy = []        # service end times
+    queue = deque()  # (arrival time, duration) of waiting customers
+    waits = []
+    revenue = lost = 0
+    paid = last = 0  # barber-minutes on duty, up to minute `last`
+    shift_index = 0
+    next_shift = shifts[0][0]
+    index, count = 0, len(times)
+
+    while True:
+        next_arrival = times[index] if index < count else INFINITY
+        next_end = busy[0] if busy else INFINITY
+        now = min(next_shift, next_end, next_arrival)
+        if now == INFINITY:
+            break
+        paid += (on_duty + leaving) * (now - last)
+        last = now
+
+        if now == next_shift:
+            change = shifts[shift_index][1] - on_duty
+            on_duty += change
+            shift_index += 1
+            next_shift = shifts[shift_index][0]
+            if change > 0:
+                staying = min(change, leaving)
+                leaving -= staying
+                idle += change - staying
+                while idle and queue:
+                    arrival_time, duration = queue.popleft()
+                    waits.append(now - arrival_time)
+                    heapq.heappush(busy, now + duration)
+                    idle -= 1
+            else:
+                going = min(-change, idle)
+                idle -= going
+                leaving += -change - going
+        elif now == next_end:
+            heapq.heappop(busy)
+            if leaving:
+                leaving -= 1
+            elif queue:
+                arrival_time, duration = queue.popleft()
+                waits.append(now - arrival_time)
+                heapq.heappush(busy, now + duration)
+            else:
+                idle += 1
+        else:
+            if len(queue) < waiting_room_size:
+                revenue += prices[index]
+                if idle:
+                    idle -= 1
+                    waits.append(0)
+                    heapq.heappush(busy, now + durations[index])
+                else:
+                    queue.append((now, durations[index]))
+            else:
+                lost += 1
+            index += 1
+
+    closing_time = max(simulation_time, last)
+    paid += (on_duty + leaving) * (closing_time - last)
+    wages = hourly_wages * paid / 60
+
+    waits.sort()
+    served = len(waits)
+    return {
+        "profit": revenue - wages,
+        "revenue": revenue,
+        "wages": wages,
+        "customers_served": served,
+        "customers_lost": lost,
+        "lost_fraction": lost / count if count else 0,
+        "avg_wait_time": sum(waits) / served if served else 0,
+        "p95_wait_time": waits[max(0, math.ceil(0.95 * served) - 1)] if served else 0,
+    }
+
+
+def offered_load_staffing(hours, arrival_process=None, arrival_rate=CUSTOMER_ARRIVAL_RATE, min_barbers=1,
+                          max_barbers=4 * NUM_BARBERS):
+    """
+    Build a starting schedule with as many barbers per hour as the hour's offered load, rounded up.
+
+    Args:
+        hours (int): Number of hours of the schedule.
+        arrival_process (object, optional): Arrival process. Defaults to the per-minute arrival coin.
+        arrival_rate (float): Probability of a customer arriving per minute, for the default process.
+        min_barbers (int): Fewest barbers on duty in any hour.
+        max_barbers (int): Most barbers on duty in any hour.
+
+    Returns:
+        tuple of int: Barbers on duty in every hour.
+    """
+    mean_service = service_moments()[0]
+    staffing = []
+    for hour in range(hours):
+        if arrival_process is None or isinstance(arrival_process, BernoulliArrivals):
+            rate = arrival_process.rate if arrival_process is not None else arrival_rate
+        else:
+            rate = arrival_process.profile.rate((hour + 0.5) * SHIFT_MINUTES)
+        staffing.append(min(max(math.ceil(rate * mean_service), min_barbers), max_barbers))
+    return tuple(staffing)
+
+
+class Candidate:
+    """
+    A schedule and its results on the first replications of the shared streams.
+
+    Attributes:
+        staffing (tuple of int): Barbers on duty in every hour.
+        results (list of dict): Results of evaluate_schedule(), one per replication evaluated so far.
+    """
+
+    def __init__(self, staffing):
+        self.staffing = staffing
+        self.results = []
+
+    def values(self, metric, replications=None):
+        """Return the values of a metric over the first `replications` replications."""
+        return [result[metric] for result in self.results[:replications]]
+
+    def mean(self, metric, replications=None):
+        """Return the mean of a metric over the first `replications` replications."""
+        return statistics.fmean(self.values(metric, replications))
+
+    def __repr__(self):
+        return f"Candidate({list(self.staffing)}, {len(self.results)} replications)"
+
+
+class StaffingOptimizer:
+    """
+    Local search with racing over hourly staffing schedules.
+
+    Attributes:
+        streams (list of tuple): Shared customer streams, one per replication (see draw_stream()).
+        hours (int): Number of hours of every schedule.
+        min_barbers (int): Fewest barbers on duty in any hour.
+        max_barbers (int): Most barbers on duty in any hour.
+        max_lost (float): Highest acceptable mean fraction of customers lost, if constrained.
+        max_p95_wait (float): Highest acceptable mean p95 wait time in minutes, if constrained.
+        initial_replications (int): Replications every candidate of a race gets.
+        block (int): Replications added to the surviving candidates at a time.
+        z (float): Standard errors by which a candidate must trail to be dropped.
+        evaluations (int): Schedule-replication evaluations run so far.
+        candidates (dict): Every schedule evaluated so far mapped to its Candidate.
+    """
+
+    def __init__(self, streams, hours, min_barbers=1, max_barbers=4 * NUM_BARBERS, max_lost=None,
+                 max_p95_wait=None, waiting_room_size=WAITING_ROOM_SIZE, hourly_wages=HOURLY_WAGES,
+                 simulation_time=SIMULATION_TIME, initial_replications=5, block=5, z=2.0):
+        """
+        Initialize the optimizer.
+
+        Args:
+            streams (list of tuple): Shared customer streams, one per replication.
+            hours (int): Number of hours of every schedule.
+            min_barbers (int): Fewest barbers on duty in any hour (at least 1).
+            max_barbers (int): Most barbers on duty in any hour.
+            max_lost (float, optional): Highest acceptable mean fraction of customers lost.
+            max_p95_wait (float, optional): Highest acceptable mean p95 wait time in minutes.
+            waiting_room_size (int): Maximum number of customers waiting in the queue.
+            hourly_wages (float): Hourly wage for each barber.
+            simulation_time (int): Minutes during which customers may arrive.
+            initial_replications (int): Replications every candidate of a race gets.
+            block (int): Replications added to the surviving candidates at a time.
+            z (float): Standard errors by which a candidate must trail to be dropped.
+        """
+        self.streams = streams
+        self.hours = hours
+        self.min_barbers = max(1, min_barbers)
+        self.max_barbers = max_barbers
+        self.max_lost = max_lost
+        self.max_p95_wait = max_p95_wait
+        self.waiting_room_size = waiting_room_size
+        self.hourly_wages = hourly_wages
+        self.simulation_time = simulation_time
+        self.initial_replications = min(initial_replications, len(streams))
+        self.block = block
+        self.z = z
+        self.evaluations = 0
+        self.candidates = {}
+
+    def candidate(self, staffing, replications):
+        """
+        Return the candidate of a schedule, evaluated on at least the first `replications` streams.
+
+        Args:
+            staffing (tuple of int): Barbers on duty in every hour.
+            replications (int): Number of replications needed.
+
+        Returns:
+            Candidate: The candidate, with its results cached for later rounds.
+        """
+        candidate = self.candidates.get(staffing)
+        if candidate is None:
+            candidate = self.candidates[staffing] = Candidate(staffing)
+        while len(candidate.results) < replications:
+            stream = self.streams[len(candidate.results)]
+            candidate.results.append(evaluate_schedule(staffing, stream, self.waiting_room_size,
+                                                       self.hourly_wages, self.simulation_time))
+            self.evaluations += 1
+        return candidate
+
+    def violation(self, candidate, replications=None):
+        """
+        Measure by how much a candidate misses the constraint, on average.
+
+        Returns:
+            float: 0 for a feasible candidate, else the relative excess over the limit.
+        """
+        excess = 0.0
+        if self.max_lost is not None:
+            excess += max(0.0, candidate.mean("lost_fraction", replications) - self.max_lost) / max(self.max_lost, 1e-9)
+        if self.max_p95_wait is not None:
+            excess += max(0.0, candidate.mean("p95_wait_time", replications) - self.max_p95_wait) / \
+                max(self.max_p95_wait, 1e-9)
+        return excess
+
+    def _clearly_infeasible(self, candidate, replications):
+        for metric, limit in self._constraints():
+            values = candidate.values(metric, replications)
+            if statistics.fmean(values) - self.z * _standard_error(values) > limit:
+                return True
+        return False
+
+    def _clearly_feasible(self, candidate, replications):
+        for metric, limit in self._constraints():
+            values = candidate.values(metric, replications)
+            if statistics.fmean(values) + self.z * _standard_error(values) > limit:
+                return False
+        return True
+
+    def _constraints(self):
+        return [(metric, limit) for metric, limit in (("lost_fraction", self.max_lost),
+                                                      ("p95_wait_time", self.max_p95_wait)) if limit is not None]
+
+    def _shortfall(self, candidate, replications):
+        """Per-replication relative distance below the limits (negative when over them), summed over constraints."""
+        shortfall = [0.0] * replications
+        for metric, limit in self._constraints():
+            for index, value in enumerate(candidate.values(metric, replications)):
+                shortfall[index] += (limit - value) / max(limit, 1e-9)
+        return shortfall
+
+    def _clearly_behind(self, values, leader_values):
+        """Whether paired values trail the leader's by more than `z` standard errors."""
+        differences = [value - best for value, best in zip(values, leader_values)]
+        return statistics.fmean(differences) + self.z * _standard_error(differences) < 0
+
+    def _rank(self, candidate, replications):
+        # Feasible candidates first, by profit; then the least infeasible
+        return (-self.violation(candidate, replications), candidate.mean("profit", replications))
+
+    def race(self, schedules):
+        """
+        Find the best of several schedules, dropping clearly dominated ones early.
+
+        While the leader is clearly feasible, candidates are dropped if they clearly violate
+        the constraint or clearly trail its profit; otherwise, if they are clearly further
+        from the limits than the leader.
+
+        Args:
+            schedules (list of tuple): Schedules to compare.
+
+        Returns:
+            Candidate: The winner, evaluated on every stream.
+        """
+        replications = self.initial_replications
+        alive = [self.candidate(staffing, replications) for staffing in schedules]
+        while True:
+            leader = max(alive, key=lambda candidate: self._rank(candidate, replications))
+            if self._clearly_feasible(leader, replications):
+                leader_profit = leader.values("profit", replications)
+                survivors = [candidate for candidate in alive if candidate is leader or not (
+                    self._clearly_infeasible(candidate, replications) or
+                    self._clearly_behind(candidate.values("profit", replications), leader_profit))]
+            else:
+                leader_shortfall = self._shortfall(leader, replications)
+                survivors = [candidate for candidate in alive if candidate is leader or
+                             not self._clearly_behind(self._shortfall(candidate, replications), leader_shortfall)]
+            alive = survivors
+
+            if len(alive) == 1 or replications >= len(self.streams):
+                break
+            replications = min(replications + self.block, len(self.streams))
+            alive = [self.candidate(candidate.staffing, replications) for candidate in alive]
+
+        winner = max(alive, key=lambda candidate: self._rank(candidate, replications))
+        return self.candidate(winner.staffing, len(self.streams))
+
+    def neighbours(self, staffing):
+        """
+        List the schedules one barber-hour away: one more or one fewer barber in an hour,
+        or a barber moved to the next or previous hour.
+
+        Args:
+            staffing (tuple of int): Barbers on duty in every hour.
+
+        Returns:
+            list of tuple: The neighbouring schedules within the barber limits.
+        """
+        schedules = []
+        for hour in range(self.hours):
+            for change in (1, -1):
+                if self.min_barbers <= staffing[hour] + change <= self.max_barbers:
+                    schedules.append(staffing[:hour] + (staffing[hour] + change,) + staffing[hour + 1:])
+        for hour in range(self.hours - 1):
+            for source, target in ((hour, hour + 1), (hour + 1, hour)):
+                if staffing[source] > self.min_barbers and staffing[target] < self.max_barbers:
+                    moved = list(staffing)
+                    moved[source] -= 1
+                    moved[target] += 1
+                    schedules.append(tuple(moved))
+        return schedules
+
+    def optimize(self, start, max_rounds=200, progress=None):
+        """
+        Improve a schedule until none of its neighbours beats it.
+
+        Args:
+            start (tuple of int): Starting schedule.
+            max_rounds (int, optional): Most rounds of the local search.
+            progress (callable, optional): Called with the round number and the new schedule after every move.
+
+        Returns:
+            Candidate: The best schedule found, evaluated on every stream.
+        """
+        replications = len(self.streams)
+        current = self.candidate(tuple(start), replications)
+        for round_number in range(1, max_rounds + 1):
+            winner = self.race([current.staffing] + self.neighbours(current.staffing))
+            # Races are decided on partial results, so only move if the winner also ranks higher
+            # once evaluated on all streams: fewer mean violations, then higher mean profit
+            if self._rank(winner, replications) <= self._rank(current, replications):
+                break
+            current = winner
+            if progress:
+                progress(round_number, current)
+        return current
+
+
+def _standard_error(values):
+    return statistics.stdev(values) / math.sqrt(len(values)) if len(values) > 1 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search hourly barber schedules for maximum profit")
+    parser.add_argument("--hourly-rates", default=None,
+                        help="Poisson arrivals following customers per hour, e.g. 10,14,30,18,12,24,28,16")
+    parser.add_argument("--arrival-rate", type=float, default=CUSTOMER_ARRIVAL_RATE,
+                        help="arrivals per minute, without --hourly-rates")
+    parser.add_argument("--time", type=int, default=SIMULATION_TIME, help="simulation time in minutes, "
+                                                                          "without --hourly-rates")
+    parser.add_argument("--waiting-room", type=int, default=WAITING_ROOM_SIZE, help="waiting room size")
+    parser.add_argument("--wages", type=float, default=HOURLY_WAGES, help="hourly wage per barber")
+    parser.add_argument("--min-barbers", type=int, default=1, help="fewest barbers on duty in any hour")
+    parser.add_argument("--max-barbers", type=int, default=4 * NUM_BARBERS, help="most barbers on duty in any hour")
+    parser.add_argument("--max-lost", type=float, default=None, help="highest acceptable fraction of customers lost")
+    parser.add_argument("--max-p95-wait", type=float, default=None, help="highest acceptable p95 wait in minutes")
+    parser.add_argument("--start", default=None, help="starting schedule, e.g. 2,2,4,3 (default: offered load)")
+    parser.add_argument("--replications", type=int, default=40, help="common random number streams")
+    parser.add_argument("--seed", type=int, default=0, help="master seed of the streams")
+    parser.add_argument("--check", type=int, default=0, metavar="REPLICATIONS",
+                        help="run the best schedule on the event engine with this many replications")
+    args = parser.parse_args()
+
+    if args.hourly_rates:
+        hourly_rates = [float(rate) for rate in args.hourly_rates.split(",")]
+        arrival_process = PoissonArrivals(PiecewiseRate.hourly(hourly_rates))
+        simulation_time = SHIFT_MINUTES * len(hourly_rates)
+    else:
+        arrival_process = None
+        simulation_time = args.time
+    hours = math.ceil(simulation_time / SHIFT_MINUTES)
+
+    started = time.perf_counter()
+    streams = [draw_stream(seed, simulation_time, arrival_process, args.arrival_rate)
+               for seed in replication_seeds(args.seed, args.replications)]
+    optimizer = StaffingOptimizer(streams, hours, args.min_barbers, args.max_barbers, args.max_lost,
+                                  args.max_p95_wait, args.waiting_room, args.wages, simulation_time)
+    if args.start:
+        start = tuple(int(count) for count in args.start.split(","))
+        if len(start) != hours:
+            parser.error(f"--start needs {hours} hourly values")
+    else:
+        start = offered_load_staffing(hours, arrival_process, args.arrival_rate, optimizer.min_barbers,
+                                      args.max_barbers)
+
+    def progress(round_number, winner):
+        print(f"Round {round_number:3}: {list(winner.staffing)}  profit=${winner.mean('profit'):.2f}  "
+              f"lost={winner.mean('lost_fraction') * 100:.1f}%  p95 wait={winner.mean('p95_wait_time'):.1f} min")
+
+    print(f"=== Staffing Search ({args.replications} streams, seed {args.seed}) ===\n")
+    best = optimizer.optimize(start, progress=progress)
+    elapsed = time.perf_counter() - started
+
+    print(f"\nBest schedule: {list(best.staffing)}" + ("" if optimizer.violation(best) == 0 else "  (infeasible)"))
+    for metric in ("profit", "revenue", "wages", "customers_served", "customers_lost", "lost_fraction",
+                   "avg_wait_time", "p95_wait_time"):
+        value = best.mean(metric)
+        print(f"{metric:18} {value * 100:9.2f}%" if metric == "lost_fraction" else f"{metric:18} {value:10.2f}")
+    print(f"\n{len(optimizer.candidates)} schedules, {optimizer.evaluations} schedule-replications in {elapsed:.1f} s "
+          f"({len(optimizer.candidates) / elapsed * 60:.0f} schedules/min)")
+
+    if args.check:
+        params = {"staffing": list(best.staffing), "simulation_time": simulation_time,
+                  "waiting_room_size": args.waiting_room, "hourly_wages": args.wages}
+        if arrival_process is not None:
+            params["arrival_process"] = arrival_process
+        else:
+            params["arrival_rate"] = args.arrival_rate
+        table = aggregate([tracker.summary() for tracker in run_replications(args.check, args.seed, params=params)])
+        print(f"\n=== Best Schedule on the Event Engine ({args.check} replications) ===\n")
+        print(f"{'Metric':18} {'Engine':>10}   95% CI")
+        for metric in ("profit", "total_revenue", "total_wages", "customers_served", "customers_lost",
+                       "avg_wait_time", "p95_wait_time"):
+            row = table[metric]
+            print(f"{metric:18} {row['mean']:10.2f}   [{row['ci_low']:.2f}, {row['ci_high']:.2f}]")
+
+
+if __name__ == "__main__":
+    main()
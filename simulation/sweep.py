@@ -0,0 +1,187 @@
+"""
+Parameter sweep over barber count, waiting room size, arrival rate, wage and
+simulation time.
+
+Every combination of the given ranges is simulated with a number of
+replications on the event engine, in parallel, and one CSV row of aggregated
+results per grid point is streamed to the output as soon as it is ready.
+
+All grid points use the same replication seeds, so every configuration is
+evaluated against the same customer streams (with --streams, customer by
+customer, see generator.random_streams), and each worker process loads the
+name table once and reuses it for every grid point it runs.
+
+Usage:
+    python -m simulation.sweep --barbers 2:6 --waiting-room 3:8 --arrival-rate 0.2:0.6:0.1 \\
+        --replications 100 --output sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from config import SIMULATION_TIME, CUSTOMER_ARRIVAL_RATE, WAITING_ROOM_SIZE, NUM_BARBERS, HOURLY_WAGES
+from simulation.analytic import prune
+from simulation.replication import run_replication, replication_seeds, aggregate, shared_order_generator
+
+
+def parse_range(text, cast=float):
+    """
+    Parse a range specification into a list of values.
+
+    Accepts a single value ("4"), a comma-separated list ("0.2,0.4,0.5")
+    or an inclusive "start:stop[:step]" range ("2:6", "0.2:0.6:0.1").
+
+    Args:
+        text (str): Range specification.
+        cast (type): int or float.
+
+    Returns:
+        list: The values of the range.
+    """
+    if "," in text:
+        return [cast(value) for value in text.split(",")]
+    if ":" not in text:
+        return [cast(text)]
+
+    parts = [float(part) for part in text.split(":")]
+    start, stop = parts[0], parts[1]
+    step = parts[2] if len(parts) == 3 else 1
+    if step <= 0:
+        raise ValueError(f"Range step must be positive: {text!r}")
+
+    count = int(round((stop - start) / step)) + 1
+    return [cast(round(start + i * step, 10)) for i in range(count)]
+
+
+def grid_points(**ranges):
+    """
+    Build every combination of the given parameter values.
+
+    Args:
+        **ranges (list): Values per EventSimulation keyword, e.g. num_barbers=[2, 3, 4].
+
+    Returns:
+        list of dict: One EventSimulation keyword dict per grid point.
+    """
+    names = list(ranges)
+    return [dict(zip(names, values)) for values in itertools.product(*ranges.values())]
+
+
+def evaluate_point(params, seeds, streams=False):
+    """
+    Run all replications of a single grid point.
+
+    Args:
+        params (dict): EventSimulation keyword arguments.
+        seeds (list of int): Replication seeds.
+        streams (bool, optional): Draw the customers from per-source random streams.
+
+    Returns:
+        dict: Metric name mapped to mean / variance / CI, as returned by aggregate().
+    """
+    return aggregate([run_replication(seed, params, streams=streams).summary() for seed in seeds])
+
+
+def _evaluate_point_args(args):
+    return evaluate_point(*args)
+
+
+def run_sweep(points, replications=30, master_seed=0, workers=None, streams=False):
+    """
+    Evaluate grid points in parallel, yielding results in grid order.
+
+    Args:
+        points (list of dict): Grid points, as returned by grid_points().
+        replications (int): Replications per grid point.
+        master_seed (int): Seed from which the shared replication seeds are derived.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPU cores.
+        streams (bool, optional): Draw the customers from per-source random streams, so that
+                                  every grid point sees the same customers.
+
+    Yields:
+        tuple: (params, table) for each grid point as soon as it is evaluated.
+    """
+    seeds = replication_seeds(master_seed, replications)
+    jobs = [(params, seeds, streams) for params in points]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for job in jobs:
+            yield job[0], _evaluate_point_args(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=shared_order_generator) as pool:
+        yield from zip(points, pool.map(_evaluate_point_args, jobs))
+
+
+def write_results(results, output):
+    """
+    Stream sweep results to a CSV file, one row per grid point.
+
+    Each metric gets a mean column and a CI half-width column.
+
+    Args:
+        results (iterable): (params, table) pairs, as yielded by run_sweep().
+        output (file): Writable text file.
+    """
+    writer = None
+    for params, table in results:
+        if writer is None:
+            header = list(params)
+            for metric in table:
+                header += [f"{metric}_mean", f"{metric}_ci"]
+            writer = csv.writer(output)
+            writer.writerow(header)
+
+        row = list(params.values())
+        for stats in table.values():
+            row += [round(stats["mean"], 4), round(stats["ci_high"] - stats["mean"], 4)]
+        writer.writerow(row)
+        output.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep barbershop parameters on the event engine")
+    parser.add_argument("--barbers", default=str(NUM_BARBERS), help="barber counts, e.g. 2:6")
+    parser.add_argument("--waiting-room", default=str(WAITING_ROOM_SIZE), help="waiting room sizes, e.g. 3:8")
+    parser.add_argument("--arrival-rate", default=str(CUSTOMER_ARRIVAL_RATE), help="arrival rates, e.g. 0.2:0.6:0.1")
+    parser.add_argument("--wages", default=str(HOURLY_WAGES), help="hourly wages, e.g. 12,13,15")
+    parser.add_argument("--time", default=str(SIMULATION_TIME), help="simulation times in minutes")
+    parser.add_argument("--replications", type=int, default=30, help="replications per grid point")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--streams", action="store_true",
+                        help="draw customers from per-source random streams (common random numbers)")
+    parser.add_argument("--output", default=None, help="CSV output file (default: stdout)")
+    parser.add_argument("--max-blocking", type=float, default=None,
+                        help="skip points whose analytic probability of turning customers away is higher")
+    parser.add_argument("--min-utilization", type=float, default=None,
+                        help="skip points whose analytic barber utilization (percent) is lower")
+    args = parser.parse_args()
+
+    points = grid_points(
+        num_barbers=parse_range(args.barbers, int),
+        waiting_room_size=parse_range(args.waiting_room, int),
+        arrival_rate=parse_range(args.arrival_rate, float),
+        hourly_wages=parse_range(args.wages, float),
+        simulation_time=parse_range(args.time, int),
+    )
+    if args.max_blocking is not None or args.min_utilization is not None:
+        total = len(points)
+        points = prune(points, args.max_blocking, args.min_utilization)
+        print(f"Pruned {total - len(points)} of {total} grid points analytically", file=sys.stderr)
+    results = run_sweep(points, args.replications, args.seed, args.workers, args.streams)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_results(results, f)
+        print(f"Wrote {len(points)} grid points to {args.output}")
+    else:
+        write_results(results, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
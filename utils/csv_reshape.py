@@ -3,23 +3,50 @@ Reshape a single-row CSV of names into a single-column CSV.
 
 Input: 'names.csv' with names in one row
 Output: 'names_reshaped.csv' with each name in its own row
+
+The input is streamed in blocks, so rows of any length are reshaped in bounded memory:
+
+    python -m utils.csv_reshape [input.csv] [output.csv]
 """
 
+import argparse
 import csv
+import os
+from utils.csv_to_bin import chunked, iter_csv_names
+
+
+def reshape(input_file, output_file):
+    """
+    Write every name of a single-row CSV into its own row.
+
+    Args:
+        input_file (str): Path to the single-row CSV.
+        output_file (str): Path to the single-column CSV written.
+
+    Returns:
+        int: Number of names written.
+    """
+    count = 0
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for chunk in chunked(iter_csv_names(input_file, single_row=True)):
+            writer.writerows([name] for name in chunk)
+            count += len(chunk)
+    return count
+
 
-# Input and output file paths
-input_file = "../customer_data/names.csv"
-output_file = "../customer_data/names_reshaped.csv"
+def main():
+    data_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "customer_data"))
+    parser = argparse.ArgumentParser(description="Reshape a single-row CSV of names into a single-column CSV")
+    parser.add_argument("input", nargs="?", default=os.path.join(data_dir, "names.csv"),
+                        help="single-row CSV (default: customer_data/names.csv)")
+    parser.add_argument("output", nargs="?", default=os.path.join(data_dir, "names_reshaped.csv"),
+                        help="single-column CSV (default: customer_data/names_reshaped.csv)")
+    args = parser.parse_args()
 
-# Read names from the single-row CSV
-with open(input_file, "r", newline="") as f:
-    reader = csv.reader(f)
-    row = next(reader)  # Read the first (and only) row
+    count = reshape(args.input, args.output)
+    print(f"Reshaped {count} names from {args.input} into {args.output}")
 
-# Write names into a single-column CSV
-with open(output_file, "w", newline="") as f:
-    writer = csv.writer(f)
-    for name in row:
-        writer.writerow([name])
 
-print(f"Reshaped {len(row)} names from {input_file} into {output_file}")
+if __name__ == "__main__":
+    main()
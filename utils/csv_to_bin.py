@@ -1,17 +1,50 @@
 """
-Convert a CSV file of names into a fixed-width binary file and provide utilities
+Convert a CSV file of names into a binary name file and provide utilities
 to read/write binary records.
 
-Binary format:
-    - Each record is 20 bytes (default FMT="20s")
+CSV files are streamed in chunks and every chunk is written with a single
+write call, so files of any size are converted in bounded memory:
+
+    python -m utils.csv_to_bin customer_data/names_reshaped.csv customer_data/names.bin
+    python -m utils.csv_to_bin names.csv names.bin --single-row --variable
+
+Binary formats:
+    - Legacy: headerless fixed-size records of 20 bytes (default FMT="20s"),
+      as written by save_list_to_bin()
+    - Name file: a 32-byte header (magic, version, layout, record width, name
+      count, index offset) followed by the names, either
+          fixed      `width`-byte records, UTF-8, padded with null bytes
+          variable   the UTF-8 names back to back, followed at the index offset by
+                     count + 1 little-endian uint64 offsets into them, so names of
+                     any length are stored without padding and looked up in O(1)
+
+NameStore memory-maps either format.
 """
 
+import argparse
 import csv
+import itertools
+import os
+import shutil
 import struct
+import tempfile
 
 # Default fixed-size format for each record
 FMT = "20s"
 
+HEADER_FMT = "<8sHHIQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+MAGIC = b"BSNAMES\x00"
+VERSION = 1
+
+# Layouts of a name file
+FIXED = 0
+VARIABLE = 1
+
+CHUNK_NAMES = 65536  # names read, encoded and written per chunk
+READ_BLOCK = 1 << 20  # bytes read at a time from single-row CSV files
+
+
 def pack_record(name, fmt=FMT):
     """
     Pack a string name into a fixed-size binary record.
@@ -40,8 +73,20 @@ def unpack_record(record_bytes, fmt=FMT):
     Returns:
         str: Decoded and stripped string.
     """
-    raw = struct.unpack(fmt, record_bytes)[0]
-    return raw.decode().rstrip("\x00").strip()
+    return decode_record(struct.unpack(fmt, record_bytes)[0])
+
+
+def decode_record(raw):
+    """
+    Decode the bytes of a fixed-width record into a name, dropping the NUL and space padding.
+
+    Args:
+        raw (bytes): Record bytes.
+
+    Returns:
+        str: Decoded and stripped string.
+    """
+    return raw.decode("utf-8", "ignore").rstrip("\x00").strip()
 
 
 def read_csv_to_list(file):
@@ -54,54 +99,272 @@ def read_csv_to_list(file):
     Returns:
         list of str: List of names.
     """
-    lst = []
-    with open(file, "r", newline="") as f:
+    return list(iter_csv_names(file))
+
+
+def iter_csv_names(file, column=0, skip_header=False, single_row=False):
+    """
+    Stream the names of a CSV file without loading it.
+
+    Args:
+        file (str): Path to the CSV file.
+        column (int, optional): Column holding the names. Defaults to the first.
+        skip_header (bool, optional): Skip the first row. Defaults to False.
+        single_row (bool, optional): The file holds all names in one comma-separated row, like
+                                     names.csv. It is read in blocks; quoted fields are not supported.
+
+    Yields:
+        str: Every non-empty name, stripped of surrounding whitespace.
+    """
+    if single_row:
+        yield from _iter_row_names(file)
+        return
+
+    with open(file, "r", newline="", encoding="utf-8") as f:
         reader = csv.reader(f)
+        if skip_header:
+            next(reader, None)
         for row in reader:
-            lst.append(row[0])
-    return lst
+            if len(row) > column:
+                name = row[column].strip()
+                if name:
+                    yield name
 
 
-def read_bin_to_list(file, fmt=FMT):
+def _iter_row_names(file):
+    with open(file, "r", encoding="utf-8") as f:
+        rest = ""
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block:
+                break
+            fields = (rest + block).split(",")
+            rest = fields.pop()
+            for field in fields:
+                name = field.strip()
+                if name:
+                    yield name
+        name = rest.strip()
+        if name:
+            yield name
+
+
+def chunked(iterable, size=CHUNK_NAMES):
+    """
+    Split an iterable into lists of at most `size` items.
+
+    Args:
+        iterable (iterable): Items to split.
+        size (int, optional): Maximum items per chunk. Defaults to CHUNK_NAMES.
+
+    Yields:
+        list: The next chunk.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _encode_fixed(name, width):
+    """Encode a name into `width` bytes, truncated on a character boundary and padded with null bytes."""
+    encoded = name.encode()
+    if len(encoded) > width:
+        encoded = encoded[:width].decode("utf-8", "ignore").encode()
+    return encoded.ljust(width, b"\x00")
+
+
+class NameFileWriter:
+    """
+    Streaming writer of a binary name file.
+
+    Names are appended in chunks; the header (and, for variable-length names,
+    the offset index) is completed by close(). Offsets are spooled to a
+    temporary file, so memory stays bounded however many names are written.
+
+    Attributes:
+        file (str): Path to the name file.
+        width (int): Record width in bytes, or None for variable-length names.
+        count (int): Names written so far.
+    """
+
+    def __init__(self, file, width=20):
+        """
+        Create (or truncate) a name file.
+
+        Args:
+            file (str): Path to the name file.
+            width (int, optional): Record width in bytes for fixed-width records; None to store
+                                   variable-length names with an offset index. Defaults to 20.
+        """
+        self.file = file
+        self.width = width
+        self.count = 0
+        self._file = open(file, "wb")
+        self._file.write(bytes(HEADER_SIZE))  # completed by close()
+        self._data_size = 0
+        self._offsets = None
+        if width is None:
+            self._offsets = tempfile.TemporaryFile()
+            self._offsets.write(struct.pack("<Q", 0))
+
+    def write(self, names):
+        """
+        Append a chunk of names with a single write call.
+
+        Args:
+            names (list of str): Names to append.
+        """
+        if self.width is not None:
+            self._file.write(b"".join(_encode_fixed(name, self.width) for name in names))
+        else:
+            encoded = [name.encode() for name in names]
+            ends = list(itertools.accumulate((len(name) for name in encoded), initial=self._data_size))[1:]
+            self._file.write(b"".join(encoded))
+            self._offsets.write(struct.pack(f"<{len(ends)}Q", *ends))
+            if ends:
+                self._data_size = ends[-1]
+        self.count += len(names)
+
+    def close(self):
+        """Write the offset index, if any, and the header, and close the file."""
+        if self._file.closed:
+            return
+        if self.width is None:
+            index_offset = HEADER_SIZE + self._data_size
+            self._offsets.seek(0)
+            shutil.copyfileobj(self._offsets, self._file)
+            self._offsets.close()
+            layout, width = VARIABLE, 0
+        else:
+            index_offset = 0
+            layout, width = FIXED, self.width
+        self._file.seek(0)
+        self._file.write(struct.pack(HEADER_FMT, MAGIC, VERSION, layout, width, self.count, index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_header(file):
     """
-    Read a binary file of fixed-size records and return a list of names.
+    Read the header of a name file.
 
     Args:
         file (str): Path to the binary file.
-        fmt (str): Struct format string.
 
     Returns:
-        list of str: List of decoded names.
+        dict: layout (FIXED or VARIABLE), width, count and index_offset, or None for a legacy headerless file.
+
+    Raises:
+        ValueError: If the file is a name file of another version.
     """
-    lst = []
-    size = struct.calcsize(fmt)
+    with open(file, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        return None
+    magic, version, layout, width, count, index_offset = struct.unpack(HEADER_FMT, header)
+    if version != VERSION:
+        raise ValueError(f"{file} is a version {version} name file, expected version {VERSION}")
+    return {"layout": layout, "width": width, "count": count, "index_offset": index_offset}
+
+
+def convert_csv(csv_file, bin_file, width=20, column=0, skip_header=False, single_row=False,
+                chunk_names=CHUNK_NAMES):
+    """
+    Stream a CSV file of names into a binary name file.
 
+    Args:
+        csv_file (str): Path to the CSV file.
+        bin_file (str): Path to the name file written.
+        width (int, optional): Record width in bytes; None for variable-length names. Defaults to 20.
+        column (int, optional): Column holding the names. Defaults to the first.
+        skip_header (bool, optional): Skip the first row of the CSV. Defaults to False.
+        single_row (bool, optional): The CSV holds all names in one row. Defaults to False.
+        chunk_names (int, optional): Names converted per chunk. Defaults to CHUNK_NAMES.
+
+    Returns:
+        int: Number of names written.
+    """
+    names = iter_csv_names(csv_file, column, skip_header, single_row)
+    with NameFileWriter(bin_file, width) as writer:
+        for chunk in chunked(names, chunk_names):
+            writer.write(chunk)
+    return writer.count
+
+
+def read_bin_to_list(file, fmt=FMT):
+    """
+    Read a binary name file and return a list of names.
+
+    Args:
+        file (str): Path to the binary file, legacy or with a header.
+        fmt (str): Struct format string of the records of a legacy file.
+
+    Returns:
+        list of str: List of decoded names.
+    """
+    header = read_header(file)
     with open(file, "rb") as f:
-        while True:
-            record_bytes = f.read(size)
-            if len(record_bytes) < size:
-                break
-            lst.append(unpack_record(record_bytes, fmt))
+        if header is None:
+            data = f.read()
+            size = struct.calcsize(fmt)
+            return [unpack_record(data[offset:offset + size], fmt)
+                    for offset in range(0, len(data) - size + 1, size)]
+
+        f.seek(HEADER_SIZE)
+        count = header["count"]
+        if header["layout"] == FIXED:
+            width = header["width"]
+            data = f.read(count * width)
+            return [decode_record(data[offset:offset + width]) for offset in range(0, count * width, width)]
 
-    return lst
+        data = f.read(header["index_offset"] - HEADER_SIZE)
+        offsets = struct.unpack(f"<{count + 1}Q", f.read(8 * (count + 1)))
+        return [data[start:end].decode() for start, end in zip(offsets, offsets[1:])]
 
 
 def save_list_to_bin(lst, file, fmt=FMT):
     """
-    Save a list of strings into a fixed-width binary file.
+    Save a list of strings into a legacy fixed-width binary file.
 
     Args:
         lst (list of str): List of names to save.
         file (str): Path to the binary file.
         fmt (str): Struct format string.
     """
+    width = struct.calcsize(fmt)
     with open(file, "wb") as f:
-        for elem in lst:
-            record_bytes = pack_record(elem, fmt)
-            f.write(record_bytes)
+        for chunk in chunked(lst):
+            f.write(b"".join(name.strip().encode()[:width].ljust(width, b"\x00") for name in chunk))
+
+
+def main():
+    data_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "customer_data"))
+    parser = argparse.ArgumentParser(description="Convert a CSV file of names into a binary name file")
+    parser.add_argument("input", nargs="?", default=os.path.join(data_dir, "names_reshaped.csv"),
+                        help="CSV file of names (default: customer_data/names_reshaped.csv)")
+    parser.add_argument("output", nargs="?", default=os.path.join(data_dir, "names.bin"),
+                        help="binary name file (default: customer_data/names.bin)")
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument("--width", type=int, default=20, help="record width in bytes of fixed-width records")
+    layout.add_argument("--variable", action="store_true", help="store variable-length names with an offset index")
+    parser.add_argument("--column", type=int, default=0, help="CSV column holding the names")
+    parser.add_argument("--skip-header", action="store_true", help="skip the first row of the CSV")
+    parser.add_argument("--single-row", action="store_true", help="the CSV holds all names in one row")
+    parser.add_argument("--chunk", type=int, default=CHUNK_NAMES, help="names converted per chunk")
+    args = parser.parse_args()
+
+    count = convert_csv(args.input, args.output, None if args.variable else args.width, args.column,
+                        args.skip_header, args.single_row, args.chunk)
+    print(f"Saved {count} names to '{args.output}'")
 
 
 if __name__ == "__main__":
-    names = read_csv_to_list("../customer_data/names_reshaped.csv")
-    save_list_to_bin(names, "../customer_data/names.bin", FMT)
-    print(f"Saved {len(names)} names to '../customer_data/names.bin'")
+    main()
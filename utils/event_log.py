@@ -0,0 +1,277 @@
+"""
+Binary event log of simulation runs.
+
+Every event of a run (arrival, balk, routing, service start, service end, a
+barber going off or coming on duty, and shop closing) is appended to a file as a fixed-width record, so results can be
+analysed, and summaries recomputed, without rerunning the simulation. The hourly
+wage of every barber is logged at opening, so wages and profit are recomputed
+exactly when barbers are paid differently (see models.skill). Runs of
+several replications append to the same file, tagged with their replication
+number.
+
+File format: a 16-byte header (magic, version, record size) followed by
+24-byte records of EVENT_FMT:
+
+    time          float64   simulation minute of the event (the hourly wage for WAGE)
+    kind          uint8     ARRIVAL, BALK, ROUTE, SERVICE_START, SERVICE_END, CLOSE, OFF_DUTY, ON_DUTY or WAGE
+    haircut       uint8     Haircut.code of the customer's order
+    barber_id     int16     barber of a service, duty or wage event (number of barbers for CLOSE, else -1)
+    shop_id       uint16    shop of the event
+    (padding)     2 bytes
+    replication   uint32    replication the event belongs to
+    customer_id   uint32    customer number within the replication, in order of arrival
+
+Records are packed into a preallocated buffer and written in bulk. The reader
+memory-maps the file into a NumPy structured array.
+"""
+
+import os
+import shutil
+import struct
+from config import HOURLY_WAGES
+from models.haircut import HAIRCUTS
+from utils.stats_tracker import StatsTracker
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for reading logs back
+    np = None
+
+HEADER_FMT = "<8sHH4x"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+MAGIC = b"BSEVLOG\x00"
+VERSION = 1
+
+EVENT_FMT = "<dBBhH2xII"
+EVENT_SIZE = struct.calcsize(EVENT_FMT)
+
+if np is not None:
+    EVENT_DTYPE = np.dtype([
+        ("time", "<f8"),
+        ("kind", "u1"),
+        ("haircut", "u1"),
+        ("barber_id", "<i2"),
+        ("shop_id", "<u2"),
+        ("padding", "V2"),
+        ("replication", "<u4"),
+        ("customer_id", "<u4"),
+    ])
+
+# Event kinds
+ARRIVAL = 0         # customer took a seat in the waiting room (of the shop they were routed to)
+BALK = 1            # customer left because the waiting room was full
+ROUTE = 2           # customer found the waiting room full and was sent to another shop
+SERVICE_START = 3
+SERVICE_END = 4
+CLOSE = 5           # end of the run of a shop; barber_id holds the number of barbers
+OFF_DUTY = 6        # barber went off duty under a staffing schedule (logged at opening for barbers starting off)
+ON_DUTY = 7         # barber came back on duty
+WAGE = 8            # hourly wage of a barber, held in the time field (logged at opening)
+
+BUFFER_RECORDS = 65536  # records buffered before each write
+
+
+class EventLogWriter:
+    """
+    Buffered writer appending event records to a binary event log.
+
+    Attributes:
+        file (str): Path to the log file.
+        replication (int): Replication number written with every record.
+    """
+
+    def __init__(self, file, replication=0, buffer_records=BUFFER_RECORDS):
+        """
+        Open a log for appending, writing the header if the file is new or empty.
+
+        Args:
+            file (str): Path to the log file.
+            replication (int, optional): Replication number of the records written next.
+            buffer_records (int, optional): Number of records buffered before each write.
+
+        Raises:
+            ValueError: If the file exists but is not an event log of this version.
+        """
+        self.file = file
+        self.replication = replication
+        self._file = open(file, "ab")
+        if self._file.tell() == 0:
+            self._file.write(struct.pack(HEADER_FMT, MAGIC, VERSION, EVENT_SIZE))
+        else:
+            _check_header(file)
+
+        self._buffer = bytearray(buffer_records * EVENT_SIZE)
+        self._offset = 0
+        self._pack_into = struct.Struct(EVENT_FMT).pack_into
+
+    def record(self, time, kind, haircut=0, barber_id=-1, shop_id=0, customer_id=0):
+        """
+        Append an event.
+
+        Args:
+            time (float): Simulation minute of the event.
+            kind (int): Event kind (ARRIVAL, BALK, ROUTE, SERVICE_START, SERVICE_END, CLOSE, OFF_DUTY or ON_DUTY).
+            haircut (int, optional): Haircut code of the customer's order.
+            barber_id (int, optional): Barber of the event, -1 if none.
+            shop_id (int, optional): Shop of the event.
+            customer_id (int, optional): Customer number within the replication.
+        """
+        self._pack_into(self._buffer, self._offset, time, kind, haircut, barber_id, shop_id,
+                        self.replication, customer_id)
+        self._offset += EVENT_SIZE
+        if self._offset == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records to the file."""
+        if self._offset:
+            self._file.write(memoryview(self._buffer)[:self._offset])
+            self._offset = 0
+        self._file.flush()
+
+    def close(self):
+        """Flush the buffered records and close the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(file):
+    with open(file, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"{file} is not an event log")
+    magic, version, record_size = struct.unpack(HEADER_FMT, header)
+    if magic != MAGIC or version != VERSION or record_size != EVENT_SIZE:
+        raise ValueError(f"{file} is not a version {VERSION} event log")
+
+
+def append_event_log(target, source):
+    """
+    Append the records of one event log to another, e.g. to combine logs written by worker processes.
+
+    Args:
+        target (str): Log to append to. Created if it does not exist.
+        source (str): Log whose records are appended.
+    """
+    _check_header(source)
+    EventLogWriter(target).close()  # creates the file with its header, or checks it
+    with open(source, "rb") as src, open(target, "ab") as dst:
+        src.seek(HEADER_SIZE)
+        shutil.copyfileobj(src, dst)
+
+
+def read_event_log(file):
+    """
+    Memory-map an event log.
+
+    Args:
+        file (str): Path to the log file.
+
+    Returns:
+        numpy.ndarray: Read-only structured array of the events (see EVENT_DTYPE).
+    """
+    if np is None:
+        raise ImportError("read_event_log() requires NumPy")
+    _check_header(file)
+    count = (os.path.getsize(file) - HEADER_SIZE) // EVENT_SIZE
+    if count == 0:
+        return np.empty(0, dtype=EVENT_DTYPE)
+    return np.memmap(file, dtype=EVENT_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def tracker_from_event_log(events, hourly_wages=HOURLY_WAGES):
+    """
+    Rebuild the statistics of logged runs without simulating them again.
+
+    Events of several replications are pooled into one tracker; select a single
+    replication first (e.g. events[events["replication"] == 3]) to get its own results.
+
+    Args:
+        events (numpy.ndarray): Events as returned by read_event_log().
+        hourly_wages (float, optional): Hourly wage paid to barbers without a logged wage. Defaults to HOURLY_WAGES.
+
+    Returns:
+        StatsTracker: Streaming tracker holding the statistics of the logged runs.
+    """
+    tracker = StatsTracker(hourly_wages, streaming=True)
+    for replication in np.unique(events["replication"]):
+        _replay_replication(tracker, events[events["replication"] == replication])
+    return tracker
+
+
+def _replay_replication(tracker, events):
+    kind = events["kind"]
+    multi_shop = len(np.unique(events["shop_id"])) > 1
+
+    def barber_name(shop_id, barber_id):
+        name = f"Barber-{barber_id + 1}"
+        return f"Shop-{shop_id + 1}/{name}" if multi_shop else name
+
+    customers = int(events["customer_id"].max()) + 1 if len(events) else 0
+    arrival_time = np.zeros(customers)
+    start_time = np.zeros(customers)
+    arrivals = events[kind == ARRIVAL]
+    starts = events[kind == SERVICE_START]
+    ends = events[kind == SERVICE_END]
+    arrival_time[arrivals["customer_id"]] = arrivals["time"]
+    start_time[starts["customer_id"]] = starts["time"]
+
+    wages = events[kind == WAGE]
+    for wage, shop_id, barber_id in zip(wages["time"].tolist(), wages["shop_id"].tolist(), wages["barber_id"].tolist()):
+        tracker.set_wage(barber_name(shop_id, barber_id), wage)
+
+    tracker.customers_lost += int(np.count_nonzero(kind == BALK))
+    tracker.customers_routed += int(np.count_nonzero(kind == ROUTE))
+
+    # Peak queue: replay the waiting room length of every shop in event order
+    for shop_id in np.unique(events["shop_id"]):
+        queue_events = (events["shop_id"] == shop_id) & ((kind == ARRIVAL) | (kind == SERVICE_START))
+        seated = kind[queue_events] == ARRIVAL
+        lengths = np.cumsum(np.where(seated, 1, -1))
+        if seated.any():
+            tracker.record_new_customer(int(lengths[seated].max()))
+
+    waits = starts["time"] - arrival_time[starts["customer_id"]]
+    durations = np.rint(ends["time"] - start_time[ends["customer_id"]]).astype(int)
+    end_waits = start_time[ends["customer_id"]] - arrival_time[ends["customer_id"]]
+    for wait in waits.tolist():
+        tracker.record_wait_time(wait)
+
+    work = {}
+    for shop_id, barber_id, code, duration, wait in zip(ends["shop_id"].tolist(), ends["barber_id"].tolist(),
+                                                        ends["haircut"].tolist(), durations.tolist(),
+                                                        end_waits.tolist()):
+        haircut = HAIRCUTS[code]
+        name = barber_name(shop_id, barber_id)
+        tracker.record_sojourn_time(wait + duration)
+        tracker.record_haircut(barber=name, service_time=duration, revenue=haircut.price, haircut_type=haircut.name)
+        tracker.record_work_time(name, duration)
+        work[name] = work.get(name, 0) + duration
+
+    # Time off duty under a staffing schedule, up to closing time for barbers still off
+    off_duty = {}
+    off_since = {}
+    duty = events[(kind == OFF_DUTY) | (kind == ON_DUTY)]
+    for time, duty_kind, shop_id, barber_id in zip(duty["time"].tolist(), duty["kind"].tolist(),
+                                                   duty["shop_id"].tolist(), duty["barber_id"].tolist()):
+        name = barber_name(shop_id, barber_id)
+        if duty_kind == OFF_DUTY:
+            off_since[name] = time
+        else:
+            off_duty[name] = off_duty.get(name, 0) + time - off_since.pop(name)
+
+    # Every barber is idle whenever they are on duty and not serving, from opening until the shop closes
+    for close in events[kind == CLOSE].tolist():
+        closing_time, shop_id, num_barbers = close[0], close[4], close[3]
+        for barber_id in range(num_barbers):
+            name = barber_name(shop_id, barber_id)
+            if name in off_since:
+                off_duty[name] = off_duty.get(name, 0) + closing_time - off_since.pop(name)
+            tracker.record_idle_time(name, closing_time - off_duty.get(name, 0) - work.get(name, 0))
@@ -0,0 +1,346 @@
+"""
+Low-overhead instrumentation of the real-time simulation's hot paths.
+
+Counters and timers wrap the main loop (handle_customer_arrival, display_state),
+the barber threads (wait_for_customer, and serve_order around each process_order) and
+every acquisition of a StatsTracker lock, whose wait and hold times are
+measured separately. Instrumentation is off by default; while it is off, every
+hook costs a single attribute check.
+
+Each thread records into its own accumulator, so measuring never adds a
+shared lock to the code being measured. The results are a per-component time
+breakdown and, if the timeline is kept, a Chrome trace of what every thread
+did (open it in chrome://tracing or https://ui.perfetto.dev):
+
+    python main.py --no-display --instrument --chrome-trace trace.json
+"""
+
+import functools
+import json
+import os
+import threading
+from threading import Lock, local
+from time import perf_counter_ns
+
+
+class _Accumulator:
+    """Counters, timers and timeline spans recorded by one thread."""
+
+    def __init__(self, thread):
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.counts = {}
+        self.timers = {}   # name -> [calls, total ns, max ns]
+        self.spans = []    # (name, start ns, duration ns, args)
+
+
+class _Timer:
+    """Context manager timing one call of a component."""
+
+    __slots__ = ("instrumentation", "name", "args", "start")
+
+    def __init__(self, instrumentation, name, args):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, self.start, perf_counter_ns(), self.args)
+
+
+class _NullTimer:
+    """Context manager doing nothing, returned while instrumentation is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class TimedLock:
+    """
+    Lock recording how long threads waited to acquire it and how long they held it.
+
+    Drop-in replacement for threading.Lock, including use as a context manager.
+
+    Attributes:
+        name (str): Name of the lock in the breakdown, e.g. "stats_tracker".
+    """
+
+    def __init__(self, name, instrumentation):
+        """
+        Initialize the lock.
+
+        Args:
+            name (str): Name of the lock in the breakdown.
+            instrumentation (Instrumentation): Where the wait and hold times are recorded.
+        """
+        self.name = name
+        self._instrumentation = instrumentation
+        self._lock = Lock()
+        self._acquired_at = 0
+        self._wait_name = f"lock_wait:{name}"
+        self._hold_name = f"lock_hold:{name}"
+
+    def acquire(self, blocking=True, timeout=-1):
+        start = perf_counter_ns()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired_at = perf_counter_ns()
+            self._instrumentation.record(self._wait_name, start, self._acquired_at, keep_span=False)
+        return acquired
+
+    def release(self):
+        acquired_at = self._acquired_at
+        self._lock.release()
+        self._instrumentation.record(self._hold_name, acquired_at, perf_counter_ns(), keep_span=False)
+
+    def locked(self):
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class Instrumentation:
+    """
+    Registry of the counters, timers and timeline of one process.
+
+    Attributes:
+        enabled (bool): Whether the hooks record anything.
+        timeline (bool): Whether every timed call is also kept as a span for the Chrome trace.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timeline = False
+        self._lock = Lock()
+        self._local = local()
+        self._accumulators = []
+        self._origin = perf_counter_ns()
+
+    def enable(self, timeline=True):
+        """
+        Switch the hooks on, clearing anything recorded before.
+
+        Args:
+            timeline (bool, optional): Keep a span of every timed call for chrome_trace(). Defaults to True.
+        """
+        self.reset()
+        self.timeline = timeline
+        self.enabled = True
+
+    def disable(self):
+        """Switch the hooks off. What was recorded is kept until the next enable() or reset()."""
+        self.enabled = False
+
+    def reset(self):
+        """Clear all counters, timers and spans."""
+        with self._lock:
+            self._accumulators = []
+            self._local = local()
+            self._origin = perf_counter_ns()
+
+    def _accumulator(self):
+        accumulator = getattr(self._local, "accumulator", None)
+        if accumulator is None:
+            accumulator = _Accumulator(threading.current_thread())
+            self._local.accumulator = accumulator
+            with self._lock:
+                self._accumulators.append(accumulator)
+        return accumulator
+
+    def count(self, name, amount=1):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Counter name.
+            amount (int, optional): Increment. Defaults to 1.
+        """
+        if self.enabled:
+            counts = self._accumulator().counts
+            counts[name] = counts.get(name, 0) + amount
+
+    def record(self, name, start, end, args=None, keep_span=True):
+        """
+        Record one timed call of a component.
+
+        Args:
+            name (str): Component name.
+            start (int): perf_counter_ns() at the start of the call.
+            end (int): perf_counter_ns() at the end of the call.
+            args (dict, optional): Details shown with the span in the Chrome trace.
+            keep_span (bool, optional): Set to False to skip the timeline, e.g. for very frequent calls.
+        """
+        if not self.enabled:
+            return
+        accumulator = self._accumulator()
+        duration = end - start
+        timer = accumulator.timers.get(name)
+        if timer is None:
+            accumulator.timers[name] = [1, duration, duration]
+        else:
+            timer[0] += 1
+            timer[1] += duration
+            if duration > timer[2]:
+                timer[2] = duration
+        if keep_span and self.timeline:
+            accumulator.spans.append((name, start, duration, args))
+
+    def timer(self, name, args=None):
+        """
+        Time a block of code.
+
+        Args:
+            name (str): Component name.
+            args (dict, optional): Details shown with the span in the Chrome trace.
+
+        Returns:
+            Context manager timing the block (doing nothing while instrumentation is off).
+        """
+        return _Timer(self, name, args) if self.enabled else _NULL_TIMER
+
+    def timed(self, name, describe=None):
+        """
+        Decorator timing every call of a function under `name`.
+
+        Args:
+            name (str): Component name.
+            describe (callable, optional): Called with the function's arguments, returns the
+                                           details shown with the span in the Chrome trace.
+
+        Returns:
+            callable: The decorator.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                details = describe(*args, **kwargs) if describe and self.timeline else None
+                start = perf_counter_ns()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, start, perf_counter_ns(), details)
+            return wrapper
+        return decorator
+
+    def lock(self, name):
+        """
+        Create a lock for a component, timed if instrumentation is on.
+
+        Args:
+            name (str): Name of the lock in the breakdown.
+
+        Returns:
+            threading.Lock or TimedLock: A plain lock while instrumentation is off, else a timed one.
+        """
+        return TimedLock(name, self) if self.enabled else Lock()
+
+    def breakdown(self):
+        """
+        Sum up the timers and counters of all threads.
+
+        Returns:
+            tuple: (timers, counters). Timers map a component name to a dict of calls,
+                   total_ms, mean_us and max_us; counters map a name to its count.
+        """
+        with self._lock:
+            accumulators = list(self._accumulators)
+
+        totals = {}
+        counters = {}
+        for accumulator in accumulators:
+            for name, (calls, total, longest) in list(accumulator.timers.items()):
+                current = totals.setdefault(name, [0, 0, 0])
+                current[0] += calls
+                current[1] += total
+                current[2] = max(current[2], longest)
+            for name, amount in list(accumulator.counts.items()):
+                counters[name] = counters.get(name, 0) + amount
+
+        timers = {
+            name: {
+                "calls": calls,
+                "total_ms": total / 1e6,
+                "mean_us": total / calls / 1e3,
+                "max_us": longest / 1e3,
+            }
+            for name, (calls, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1])
+        }
+        return timers, counters
+
+    def print_breakdown(self, wall_time=None):
+        """
+        Print the time spent in every component, largest first.
+
+        Components overlap: process_order runs inside each barber's serve_order, and barber
+        threads run concurrently with the main loop, so shares can add up to more than 100%.
+
+        Args:
+            wall_time (float, optional): Wall-clock seconds of the run, to show each component's share of it.
+        """
+        timers, counters = self.breakdown()
+        print("\n=== Instrumentation Breakdown ===\n")
+        header = f"{'Component':28} {'Calls':>9} {'Total ms':>11} {'Mean us':>10} {'Max us':>11}"
+        print(header + (f" {'% of run':>9}" if wall_time else ""))
+        for name, timer in timers.items():
+            line = (f"{name:28} {timer['calls']:9d} {timer['total_ms']:11.2f} "
+                    f"{timer['mean_us']:10.2f} {timer['max_us']:11.2f}")
+            if wall_time:
+                line += f" {timer['total_ms'] / 10 / wall_time:8.1f}%"
+            print(line)
+        if counters:
+            print("\nCounters:")
+            for name, amount in sorted(counters.items()):
+                print(f"{name}: {amount}")
+
+    def chrome_trace(self):
+        """
+        Build a Chrome trace of the recorded spans, one track per thread.
+
+        Returns:
+            dict: Trace in the Chrome trace event format.
+        """
+        with self._lock:
+            accumulators = list(self._accumulators)
+
+        pid = os.getpid()
+        events = []
+        for accumulator in accumulators:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": accumulator.thread_id,
+                           "args": {"name": accumulator.thread_name}})
+            for name, start, duration, args in list(accumulator.spans):
+                event = {"name": name, "ph": "X", "pid": pid, "tid": accumulator.thread_id,
+                         "ts": (start - self._origin) / 1e3, "dur": duration / 1e3}
+                if args:
+                    event["args"] = args
+                events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, file):
+        """
+        Write the Chrome trace to a JSON file.
+
+        Args:
+            file (str): Path to the trace file.
+        """
+        with open(file, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,119 @@
+"""
+Memory-mapped, read-only access to a binary name file.
+
+Unlike read_bin_to_list(), which decodes every record up front, a NameStore
+maps the file and decodes a record only when it is looked up. Opening a store
+is O(1) regardless of file size, the pages are shared through the OS page
+cache between processes that map the same file, and NameStore.shared() hands
+the same store to every generator in a process.
+
+Both the legacy headerless fixed-width files and the name files written by
+utils.csv_to_bin (fixed-width, or variable-length with an offset index) are
+supported; the format is told apart by the header.
+"""
+
+import mmap
+import os
+import struct
+from utils.csv_to_bin import FMT, HEADER_SIZE, VARIABLE, read_header, unpack_record
+
+
+class NameStore:
+    """
+    Sequence-like view over the records of a binary name file.
+
+    Supports len(), indexing and iteration, so it can be used wherever a list
+    of names is expected (e.g. random.choice()).
+
+    Attributes:
+        file (str): Path to the binary file.
+        fmt (str): Struct format string of a single record (of legacy files).
+        record_size (int): Size of a single record in bytes (0 for variable-length names).
+    """
+
+    _shared = {}  # (path, fmt) -> NameStore, one per file per process
+
+    def __init__(self, file, fmt=FMT):
+        """
+        Map a binary name file.
+
+        Args:
+            file (str): Path to the binary file.
+            fmt (str): Struct format string of a single record of a legacy headerless file (default "20s").
+        """
+        self.file = file
+        self.fmt = fmt
+        self.record_size = struct.calcsize(fmt)
+        self._map = None
+        self._count = 0
+        self._data_offset = 0
+        self._index_offset = None
+
+        header = read_header(file)
+        if header is not None:
+            self._data_offset = HEADER_SIZE
+            if header["layout"] == VARIABLE:
+                self.record_size = 0
+                self._index_offset = header["index_offset"]
+            else:
+                self.record_size = header["width"]
+                self.fmt = f"{self.record_size}s"
+
+        with open(file, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if header is not None:
+                count = header["count"]
+            else:
+                count = size // self.record_size
+            if count:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._count = count
+
+    @classmethod
+    def shared(cls, file, fmt=FMT):
+        """
+        Return the process-wide store for a file, opening it on first use.
+
+        Args:
+            file (str): Path to the binary file.
+            fmt (str): Struct format string of a single record.
+
+        Returns:
+            NameStore: The shared store.
+        """
+        key = (os.path.realpath(file), fmt)
+        store = cls._shared.get(key)
+        if store is None:
+            store = cls._shared[key] = cls(file, fmt)
+        return store
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("name index out of range")
+        if self._index_offset is not None:
+            start, end = struct.unpack_from("<QQ", self._map, self._index_offset + 8 * index)
+            return self._map[self._data_offset + start:self._data_offset + end].decode()
+        offset = self._data_offset + index * self.record_size
+        return unpack_record(self._map[offset:offset + self.record_size], self.fmt)
+
+    def close(self):
+        """Unmap the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._count = 0
+
+    def __getstate__(self):
+        # Ship the path, not the mapping; the receiving process maps the file itself
+        return {"file": self.file, "fmt": self.fmt}
+
+    def __setstate__(self, state):
+        self.__init__(state["file"], state["fmt"])
+
+    def __repr__(self):
+        return f"NameStore('{self.file}', {self._count} names)"
@@ -0,0 +1,87 @@
+"""
+Columnar log of served orders.
+
+Instead of keeping an Order and a Customer object alive per served customer,
+the log appends each order's numbers to typed arrays, one column per field,
+costing a few dozen bytes per customer.
+"""
+
+from array import array
+
+
+class OrderLog:
+    """
+    Columnar record of served orders, backed by typed arrays.
+
+    Attributes:
+        arrival_time (array of float): Arrival time of each order in minutes.
+        start_time (array of float): Service start time of each order in minutes.
+        end_time (array of float): Service end time of each order in minutes.
+        haircut (array of int): Haircut code of each order (see Haircut.code).
+        barber_id (array of int): Id of the barber who served each order (-1 if unknown).
+        name_index (array of int): Customer name index of each order (-1 if unknown).
+    """
+
+    def __init__(self):
+        """Initialize an empty order log."""
+        self.arrival_time = array("d")
+        self.start_time = array("d")
+        self.end_time = array("d")
+        self.haircut = array("B")
+        self.barber_id = array("h")
+        self.name_index = array("i")
+
+    def record(self, order, start_time, end_time, barber_id=None):
+        """
+        Append a served order to the log.
+
+        Args:
+            order (Order): The served order.
+            start_time (float): Time the service started in minutes.
+            end_time (float): Time the service ended in minutes.
+            barber_id (int, optional): Id of the barber who served the order.
+        """
+        name_index = order.customer.name_index
+        self.arrival_time.append(order.arrival_time)
+        self.start_time.append(start_time)
+        self.end_time.append(end_time)
+        self.haircut.append(order.haircut.code)
+        self.barber_id.append(barber_id if barber_id is not None else -1)
+        self.name_index.append(name_index if name_index is not None else -1)
+
+    def wait_times(self):
+        """
+        Compute the wait time of every logged order.
+
+        Returns:
+            array of float: Start time minus arrival time per order, in minutes.
+        """
+        return array("d", (start - arrival for start, arrival in zip(self.start_time, self.arrival_time)))
+
+    def columns(self):
+        """
+        Return the columns of the log by name.
+
+        Returns:
+            dict: Column name mapped to its typed array.
+        """
+        return {
+            "arrival_time": self.arrival_time,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "haircut": self.haircut,
+            "barber_id": self.barber_id,
+            "name_index": self.name_index,
+        }
+
+    def nbytes(self):
+        """
+        Return the size of the logged data.
+
+        Returns:
+            int: Bytes used by the column data.
+        """
+        return sum(column.itemsize * len(column) for column in self.columns().values())
+
+    def __len__(self):
+        return len(self.arrival_time)
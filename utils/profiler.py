@@ -0,0 +1,162 @@
+"""
+Whole-run profilers for the simulation.
+
+    cprofile   deterministic profile of every function call, in the main thread
+               and in every thread started during the run (the barbers)
+    sample     statistical profile: a background thread samples the stack of
+               every thread at a fixed interval, which barely slows the run down
+
+Both print the hottest functions when the run ends. The cProfile results can be
+saved for pstats or snakeviz, the samples as collapsed stacks for flame graph
+tools (flamegraph.pl, speedscope):
+
+    python main.py --no-display --profile sample --profile-output run.folded
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+from time import sleep
+
+PROFILERS = ("cprofile", "sample")
+
+
+def profile_run(function, mode="cprofile", output=None, interval=0.001, top=20):
+    """
+    Run a function under a profiler and print its hottest functions.
+
+    Args:
+        function (callable): The run, called without arguments.
+        mode (str, optional): "cprofile" or "sample". Defaults to "cprofile".
+        output (str, optional): Save the profile to this file (pstats format, or collapsed stacks when sampling).
+        interval (float, optional): Seconds between samples when sampling. Defaults to 1 ms.
+        top (int, optional): Number of functions printed. Defaults to 20.
+
+    Returns:
+        The return value of the function.
+    """
+    if mode == "cprofile":
+        return _run_cprofile(function, output, top)
+    if mode == "sample":
+        return _run_sampled(function, output, interval, top)
+    raise ValueError(f"unknown profiler: {mode}")
+
+
+def _run_cprofile(function, output, top):
+    profiles = []
+    lock = threading.Lock()
+
+    def profile_thread(frame, event, arg):
+        # Called once in every new thread: hand the thread over to its own profiler
+        profile = cProfile.Profile()
+        with lock:
+            profiles.append(profile)
+        profile.enable()
+
+    main_profile = cProfile.Profile()
+    threading.setprofile(profile_thread)
+    main_profile.enable()
+    try:
+        return function()
+    finally:
+        main_profile.disable()
+        threading.setprofile(None)
+        stats = pstats.Stats(main_profile)
+        with lock:
+            for profile in profiles:
+                stats.add(profile)
+        if output:
+            stats.dump_stats(output)
+        print(f"\n=== cProfile ({len(profiles) + 1} threads) ===")
+        stats.sort_stats("tottime").print_stats(top)
+
+
+class StackSampler(threading.Thread):
+    """
+    Background thread sampling the stacks of all other threads.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        stacks (dict): Collapsed stack (thread name;outermost;...;innermost) mapped to its sample count.
+        samples (int): Number of sampling rounds taken.
+    """
+
+    def __init__(self, interval=0.001):
+        super().__init__(name="StackSampler", daemon=True)
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stopped.is_set():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                functions = []
+                while frame is not None:
+                    code = frame.f_code
+                    functions.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                functions.append(names.get(thread_id, str(thread_id)))
+                stack = ";".join(reversed(functions))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+            sleep(self.interval)
+
+    def stop(self):
+        """Stop sampling and wait for the thread to finish."""
+        self._stopped.set()
+        self.join()
+
+    def hottest(self, top=20):
+        """
+        Rank functions by the share of samples in which they were running (self) or on the stack (total).
+
+        Args:
+            top (int, optional): Number of functions returned. Defaults to 20.
+
+        Returns:
+            list of tuple: (function, self samples, total samples), most self samples first.
+        """
+        own = {}
+        total = {}
+        for stack, count in self.stacks.items():
+            functions = stack.split(";")[1:]
+            if not functions:
+                continue
+            own[functions[-1]] = own.get(functions[-1], 0) + count
+            for function in set(functions):
+                total[function] = total.get(function, 0) + count
+        ranked = sorted(total, key=lambda function: (-own.get(function, 0), -total[function]))
+        return [(function, own.get(function, 0), total[function]) for function in ranked[:top]]
+
+    def save_collapsed(self, file):
+        """
+        Write the samples as collapsed stacks, one "stack count" line each.
+
+        Args:
+            file (str): Path to the output file.
+        """
+        with open(file, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def _run_sampled(function, output, interval, top):
+    sampler = StackSampler(interval)
+    sampler.start()
+    try:
+        return function()
+    finally:
+        sampler.stop()
+        if output:
+            sampler.save_collapsed(output)
+        total = sum(sampler.stacks.values()) or 1
+        print(f"\n=== Sampling Profile ({sampler.samples} samples every {interval * 1000:g} ms) ===\n")
+        print(f"{'Self %':>7} {'Total %':>8}  Function")
+        for name, own, cumulative in sampler.hottest(top):
+            print(f"{own / total * 100:6.1f}% {cumulative / total * 100:7.1f}%  {name}")
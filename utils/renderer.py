@@ -0,0 +1,120 @@
+"""
+Throttled, incremental terminal renderer for the live simulation display.
+
+Each frame is a list of text lines. On a terminal, only the lines that changed
+since the previous frame are redrawn (using ANSI cursor positioning), and the
+whole update is written with a single write call. Frames are capped at
+`max_fps` regardless of how fast the simulation ticks. When the output is not
+a terminal, whole frames are written as plain text at the same capped rate.
+"""
+
+import logging
+import sys
+from collections import deque
+from time import monotonic
+from config import MAX_FPS
+
+
+class TerminalRenderer:
+    """
+    Draws frames of text lines, redrawing only what changed.
+
+    Attributes:
+        enabled (bool): Whether anything is drawn at all (False for headless runs).
+        max_fps (float): Maximum number of frames drawn per second.
+        recent_events (deque of str): Latest log messages, drawn below every frame.
+    """
+
+    def __init__(self, stream=None, max_fps=MAX_FPS, enabled=True, event_lines=5):
+        """
+        Initialize the renderer.
+
+        Args:
+            stream (file, optional): Output stream. Defaults to sys.stdout.
+            max_fps (float, optional): Maximum frames per second. Defaults to MAX_FPS.
+            enabled (bool, optional): Set to False to disable all output. Defaults to True.
+            event_lines (int, optional): Number of recent log messages shown below the frame.
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.max_fps = max_fps
+        self.enabled = enabled
+        self.recent_events = deque(maxlen=event_lines)
+        self._ansi = self.stream.isatty() if hasattr(self.stream, "isatty") else False
+        self._previous = None
+        self._pending = None
+        self._last_draw = float("-inf")
+
+    def render(self, lines, force=False):
+        """
+        Submit a frame. It is drawn now unless a frame was drawn too recently.
+
+        Args:
+            lines (list of str): The frame, one string per line.
+            force (bool, optional): Draw even if the frame rate cap was reached.
+        """
+        if not self.enabled:
+            return
+        self._pending = lines
+        if force or monotonic() - self._last_draw >= 1 / self.max_fps:
+            self._draw()
+
+    def flush(self):
+        """Draw the last submitted frame if it was held back by the frame rate cap."""
+        if self.enabled and self._pending is not None:
+            self._draw()
+
+    def _draw(self):
+        lines = list(self._pending)
+        if self.recent_events:
+            lines += ["", "Recent Events:"] + list(self.recent_events)
+
+        if self._ansi:
+            buffer = self._diff(lines)
+        else:
+            buffer = "\n".join(lines) + "\n\n"
+
+        self.stream.write(buffer)
+        self.stream.flush()
+        self._previous = lines
+        self._pending = None
+        self._last_draw = monotonic()
+
+    def _diff(self, lines):
+        """Build the ANSI escape sequence turning the previous frame into `lines`."""
+        previous = self._previous
+        if previous is None:
+            parts = ["\x1b[2J"]  # clear the screen once, before the first frame
+            previous = []
+        else:
+            parts = []
+
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                parts.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+        for row in range(len(lines), len(previous)):
+            parts.append(f"\x1b[{row + 1};1H\x1b[K")
+
+        parts.append(f"\x1b[{len(lines) + 1};1H")  # park the cursor below the frame
+        return "".join(parts)
+
+
+class RecentEventsHandler(logging.Handler):
+    """
+    Logging handler that buffers messages in a renderer instead of printing them.
+
+    Messages are shown below the next frame the renderer draws, so log output
+    from barber threads never interleaves with the display.
+    """
+
+    def __init__(self, renderer):
+        """
+        Initialize the handler.
+
+        Args:
+            renderer (TerminalRenderer): Renderer whose recent events receive the messages.
+        """
+        super().__init__()
+        self.renderer = renderer
+
+    def emit(self, record):
+        self.renderer.recent_events.append(self.format(record))
@@ -1,54 +1,146 @@
-from threading import Lock
+import copy
+from threading import local
 from config import HOURLY_WAGES
+from utils.instrumentation import instrumentation
+from utils.streaming_stats import RunningStats, QuantileSketch
 
 class StatsTracker:
     """
     Tracks and summarizes statistics for the barbershop simulation.
 
     Attributes:
-        lock (threading.Lock): Thread lock to synchronize updates.
+        lock (threading.Lock): Thread lock to synchronize updates (timed while instrumentation is on).
         total_haircuts (dict): Total haircuts per barber.
         total_service_time (dict): Total service time per barber (in minutes).
         total_idle_time (dict): Total idle time per barber (in minutes).
         total_work_time (dict): Total work time per barber (in minutes).
-        customer_wait_times (list of float): Wait times for all customers.
+        customer_wait_times (list of float): Wait times for all customers (empty in streaming mode).
+        wait_stats (RunningStats): Online mean / variance / min / max of wait times.
+        wait_sketch (QuantileSketch): Quantile sketch of wait times.
+        sojourn_stats (RunningStats): Online statistics of sojourn times (wait + service).
+        sojourn_sketch (QuantileSketch): Quantile sketch of sojourn times.
         peak_queue_length (int): Maximum queue length observed.
         total_revenue (float): Total revenue from haircuts.
         customers_lost (int): Number of customers who left due to full waiting room.
+        customers_routed (int): Number of customers sent on to another shop because the waiting room was full.
         service_distribution (dict): Count of haircuts per haircut type.
+        appointments (dict): Count of appointments per outcome, e.g. "booked" or "no_show"
+                             (empty unless the shop takes appointments).
+        appointment_delay (RunningStats): Online statistics of how long customers with an
+                                          appointment waited past their booked time.
+        hourly_wages (float): Hourly wage paid to each barber.
+        barber_wages (dict): Hourly wage per barber paid differently from `hourly_wages`.
+        streaming (bool): If True, raw wait times are not kept, so memory stays constant.
+        per_thread (bool): If True, each thread records into its own accumulator, which is
+                           merged into this tracker by collect().
     """
 
-    def __init__(self):
-        """Initialize the StatsTracker with empty statistics."""
-        self.lock = Lock()
+    def __init__(self, hourly_wages=HOURLY_WAGES, streaming=False, per_thread=False):
+        """
+        Initialize the StatsTracker with empty statistics.
 
+        Args:
+            hourly_wages (float, optional): Hourly wage paid to each barber. Defaults to HOURLY_WAGES.
+            streaming (bool, optional): Keep only constant-memory statistics of wait times. Defaults to False.
+            per_thread (bool, optional): Record into per-thread accumulators instead of taking
+                                         the shared lock on every update. Defaults to False.
+        """
+        self.lock = instrumentation.lock("stats_tracker")
+        self.hourly_wages = hourly_wages
+        self.barber_wages = {}
+        self.streaming = streaming
+        self.per_thread = per_thread
+        self._local = local()
+        self._thread_trackers = []
+        self._reset()
+
+    def _reset(self):
+        """Clear all recorded statistics."""
         self.total_haircuts = {}        # per barber
         self.total_service_time = {}    # per barber
         self.total_idle_time = {}       # per barber
         self.total_work_time = {}       # per barber
 
         self.customer_wait_times = []   # in minutes
+        self.wait_stats = RunningStats()
+        self.wait_sketch = QuantileSketch()
+        self.sojourn_stats = RunningStats()
+        self.sojourn_sketch = QuantileSketch()
         self.peak_queue_length = 0
 
         self.total_revenue = 0
         self.customers_lost = 0         # left due to full waiting room
+        self.customers_routed = 0       # sent on to another shop of the chain
         self.service_distribution = {}  # per haircut type name
+        self.appointments = {}          # per outcome
+        self.appointment_delay = RunningStats()
 
     def record_new_customer(self, queue_length):
         """Update peak queue length if the current queue is longer."""
+        if self.per_thread:
+            self._thread_tracker().record_new_customer(queue_length)
+            return
         with self.lock:
             if queue_length > self.peak_queue_length:
                 self.peak_queue_length = queue_length
 
     def record_customer_lost(self):
         """Increment the counter for customers who left due to full waiting room."""
+        if self.per_thread:
+            self._thread_tracker().record_customer_lost()
+            return
         with self.lock:
             self.customers_lost += 1
 
+    def record_customer_routed(self):
+        """Increment the counter for customers sent on to another shop because the waiting room was full."""
+        if self.per_thread:
+            self._thread_tracker().record_customer_routed()
+            return
+        with self.lock:
+            self.customers_routed += 1
+
+    def record_appointment(self, outcome, count=1):
+        """
+        Count appointments with an outcome.
+
+        Args:
+            outcome (str): Outcome of the appointments, e.g. "booked", "refused", "no_show", "late" or "served".
+            count (int, optional): Number of appointments. Defaults to 1.
+        """
+        if self.per_thread:
+            self._thread_tracker().record_appointment(outcome, count)
+            return
+        with self.lock:
+            self.appointments[outcome] = self.appointments.get(outcome, 0) + count
+
+    def record_appointment_delay(self, delay):
+        """Record how long a customer with an appointment waited past their booked time (or arrival, if late)."""
+        if self.per_thread:
+            self._thread_tracker().record_appointment_delay(delay)
+            return
+        with self.lock:
+            self.appointment_delay.add(delay)
+
     def record_wait_time(self, wait_time):
         """Record the wait time for a customer."""
+        if self.per_thread:
+            self._thread_tracker().record_wait_time(wait_time)
+            return
+        with self.lock:
+            if not self.streaming:
+                self.customer_wait_times.append(wait_time)
+            self.wait_stats.add(wait_time)
+            self.wait_sketch.add(wait_time)
+
+    def record_sojourn_time(self, sojourn_time):
+        """Record the total time a served customer spent in the shop (wait + service)."""
+        if self.per_thread:
+            self._thread_tracker().record_sojourn_time(sojourn_time)
+            return
         with self.lock:
-            self.customer_wait_times.append(wait_time)
+            self.sojourn_stats.add(sojourn_time)
+            self.sojourn_sketch.add(sojourn_time)
 
     def record_haircut(self, barber, service_time, revenue, haircut_type):
         """
@@ -60,6 +152,9 @@ class StatsTracker:
             revenue (float): Revenue earned from the haircut.
             haircut_type (str): Type of haircut performed.
         """
+        if self.per_thread:
+            self._thread_tracker().record_haircut(barber, service_time, revenue, haircut_type)
+            return
         with self.lock:
             self.total_haircuts[barber] = self.total_haircuts.get(barber, 0) + 1
             self.total_service_time[barber] = self.total_service_time.get(barber, 0) + service_time
@@ -68,52 +163,200 @@ class StatsTracker:
 
     def record_idle_time(self, barber, idle_time):
         """Record idle time for a barber."""
+        if self.per_thread:
+            self._thread_tracker().record_idle_time(barber, idle_time)
+            return
         with self.lock:
             self.total_idle_time[barber] = self.total_idle_time.get(barber, 0) + idle_time
 
     def record_work_time(self, barber, duration):
         """Record working time for a barber."""
+        if self.per_thread:
+            self._thread_tracker().record_work_time(barber, duration)
+            return
         with self.lock:
             self.total_work_time[barber] = self.total_work_time.get(barber, 0) + duration
 
+    def set_wage(self, barber, wage):
+        """
+        Pay a barber a different hourly wage than `hourly_wages`, e.g. according to their skill profile.
+
+        Args:
+            barber (str): Name of the barber.
+            wage (float): Hourly wage of the barber.
+        """
+        with self.lock:
+            self.barber_wages[barber] = wage
+
+    def wage(self, barber):
+        """Return the hourly wage paid to a barber."""
+        return self.barber_wages.get(barber, self.hourly_wages)
+
+    def _thread_tracker(self):
+        """
+        Return the calling thread's accumulator, creating it on first use.
+
+        Each accumulator has its own lock, which only its owning thread and
+        collect() ever take, so recording never contends with other threads.
+        """
+        tracker = getattr(self._local, "tracker", None)
+        if tracker is None:
+            tracker = StatsTracker(self.hourly_wages, self.streaming)
+            self._local.tracker = tracker
+            with self.lock:
+                self._thread_trackers.append(tracker)
+        return tracker
+
+    def collect(self):
+        """
+        Merge the per-thread accumulators into this tracker and clear them.
+
+        Safe to call while threads are still recording: each accumulator is
+        drained under its own lock, and later updates are picked up by the next call.
+        """
+        with self.lock:
+            trackers = list(self._thread_trackers)
+        for tracker in trackers:
+            with tracker.lock:
+                drained = copy.copy(tracker)
+                tracker._reset()
+            self.merge(drained)
+
+    def merge(self, other):
+        """
+        Fold the statistics of another tracker into this one.
+
+        Used to combine per-shop, per-thread or per-replication trackers. Wait time
+        quantiles are merged through the sketches, so no raw samples are needed.
+
+        Args:
+            other (StatsTracker): Tracker to merge in.
+        """
+        with self.lock:
+            for totals, other_totals in (
+                (self.total_haircuts, other.total_haircuts),
+                (self.total_service_time, other.total_service_time),
+                (self.total_idle_time, other.total_idle_time),
+                (self.total_work_time, other.total_work_time),
+                (self.service_distribution, other.service_distribution),
+                (self.appointments, other.appointments),
+            ):
+                for key, value in other_totals.items():
+                    totals[key] = totals.get(key, 0) + value
+            self.barber_wages.update(other.barber_wages)
+
+            if not self.streaming:
+                self.customer_wait_times.extend(other.customer_wait_times)
+            self.wait_stats.merge(other.wait_stats)
+            self.wait_sketch.merge(other.wait_sketch)
+            self.sojourn_stats.merge(other.sojourn_stats)
+            self.sojourn_sketch.merge(other.sojourn_sketch)
+            self.appointment_delay.merge(other.appointment_delay)
+
+            self.peak_queue_length = max(self.peak_queue_length, other.peak_queue_length)
+            self.total_revenue += other.total_revenue
+            self.customers_lost += other.customers_lost
+            self.customers_routed += other.customers_routed
+
+    def __getstate__(self):
+        # Locks and thread-locals cannot be pickled; trackers are shipped between processes without them
+        state = self.__dict__.copy()
+        del state["lock"]
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = instrumentation.lock("stats_tracker")
+        self._local = local()
+
+    def summary(self):
+        """
+        Compute the shop-level results of the simulation.
+
+        Returns:
+            dict: Metric name mapped to its value (counts, money in dollars, times in minutes).
+        """
+        if self.per_thread:
+            self.collect()
+
+        total_customers_served = sum(self.total_haircuts.values())
+
+        total_wages = 0
+        for barber in self.total_haircuts:
+            service_r = round(self.total_service_time.get(barber, 0))
+            idle_r = round(self.total_idle_time.get(barber, 0))
+            total_wages += self.wage(barber) * (service_r + idle_r) / 60  # wages based on rounded minutes
+
+        overall_service_time = sum(self.total_service_time.values())
+        overall_idle_time = sum(self.total_idle_time.values())
+        overall_total_time = overall_service_time + overall_idle_time
+
+        wait_stats = self.wait_stats
+        summary = {
+            "customers_served": total_customers_served,
+            "customers_lost": self.customers_lost,
+            "customers_routed": self.customers_routed,
+            "peak_queue_length": self.peak_queue_length,
+            "total_revenue": self.total_revenue,
+            "total_wages": total_wages,
+            "profit": self.total_revenue - total_wages,
+            "avg_wait_time": wait_stats.mean,
+            "max_wait_time": wait_stats.max if wait_stats.count else 0,
+            "p50_wait_time": self.wait_sketch.quantile(0.50),
+            "p95_wait_time": self.wait_sketch.quantile(0.95),
+            "p99_wait_time": self.wait_sketch.quantile(0.99),
+            "avg_sojourn_time": self.sojourn_stats.mean,
+            "p95_sojourn_time": self.sojourn_sketch.quantile(0.95),
+            "utilization": (overall_service_time / overall_total_time * 100) if overall_total_time > 0 else 0,
+            "avg_idle_per_barber": (overall_idle_time / len(self.total_haircuts)) if self.total_haircuts else 0,
+            "avg_revenue_per_customer": (self.total_revenue / total_customers_served) if total_customers_served else 0,
+        }
+        if self.appointments:
+            appointments_served = self.appointments.get("served", 0)
+            summary.update({
+                "appointments_booked": self.appointments.get("booked", 0),
+                "appointments_refused": self.appointments.get("refused", 0),
+                "appointments_served": appointments_served,
+                "no_shows": self.appointments.get("no_show", 0),
+                "late_arrivals": self.appointments.get("late", 0),
+                "walk_ins_served": total_customers_served - appointments_served,
+                "avg_appointment_delay": self.appointment_delay.mean,
+            })
+        return summary
+
     def print_summary(self):
         """Print a summary report of the simulation statistics."""
+        summary = self.summary()
         print("\n=== Simulation Summary ===\n")
 
         # Customers
-        total_customers_served = sum(self.total_haircuts.values())
-        print(f"Total Customers Served: {total_customers_served}")
-        print(f"Customers Lost: {self.customers_lost}")
-        print(f"Peak Queue Length: {self.peak_queue_length}")
+        print(f"Total Customers Served: {summary['customers_served']}")
+        print(f"Customers Lost: {summary['customers_lost']}")
+        if summary['customers_routed']:
+            print(f"Customers Routed to Other Shops: {summary['customers_routed']}")
+        print(f"Peak Queue Length: {summary['peak_queue_length']}")
+        if self.appointments:
+            print(f"Appointments Booked / Refused: {summary['appointments_booked']} / {summary['appointments_refused']}")
+            print(f"Appointments Served: {summary['appointments_served']}, Walk-ins Served: {summary['walk_ins_served']}")
+            print(f"No-Shows: {summary['no_shows']}, Late Past Grace: {summary['late_arrivals']}")
+            print(f"Average Delay Past Appointment: {round(summary['avg_appointment_delay'], 2)} min")
 
         # Revenue, Wages, Profit
-        total_wages = 0
-        for barber in self.total_haircuts:
-            service = self.total_service_time.get(barber, 0)
-            idle = self.total_idle_time.get(barber, 0)
-            service_r = round(service)
-            idle_r = round(idle)
-            total_time_rounded = service_r + idle_r
-            total_wages += HOURLY_WAGES * total_time_rounded / 60  # wages based on rounded minutes
-
-        profit = self.total_revenue - total_wages
-        print(f"\nTotal Revenue: ${self.total_revenue:.2f}")
-        print(f"Total Wages: ${total_wages:.2f}")
-        print(f"Profit: ${profit:.2f}")
+        print(f"\nTotal Revenue: ${summary['total_revenue']:.2f}")
+        print(f"Total Wages: ${summary['total_wages']:.2f}")
+        print(f"Profit: ${summary['profit']:.2f}")
 
         # Customer wait times
-        if self.customer_wait_times:
-            avg_wait = sum(self.customer_wait_times) / len(self.customer_wait_times)
-            max_wait = max(self.customer_wait_times)
-            print(f"\nAverage Customer Wait Time: {round(avg_wait,2)} min")
-            print(f"Maximum Customer Wait Time: {round(max_wait,2)} min")
+        if self.wait_stats.count:
+            print(f"\nAverage Customer Wait Time: {round(summary['avg_wait_time'], 2)} min")
+            print(f"Maximum Customer Wait Time: {round(summary['max_wait_time'], 2)} min")
+            print(f"Wait Time p50 / p95 / p99: {round(summary['p50_wait_time'], 2)} / "
+                  f"{round(summary['p95_wait_time'], 2)} / {round(summary['p99_wait_time'], 2)} min")
+            print(f"Average Time in Shop: {round(summary['avg_sojourn_time'], 2)} min")
 
         # Per-Barber metrics
         print("\nPer-Barber Stats:")
-        overall_service_time = sum(self.total_service_time.values())
-        overall_idle_time = sum(self.total_idle_time.values())
-        overall_total_time = overall_service_time + overall_idle_time
-
         for barber in self.total_haircuts:
             haircuts = self.total_haircuts[barber]
             service = self.total_service_time.get(barber, 0)
@@ -127,22 +370,45 @@ class StatsTracker:
             utilization_r = round(service_r / total_time_rounded * 100, 2) if total_time_rounded > 0 else 0
             idle_ratio_r = round(idle_r / total_time_rounded * 100, 2) if total_time_rounded > 0 else 0
             avg_service_r = round(service / haircuts, 2) if haircuts > 0 else 0
-            wages_r = round(HOURLY_WAGES * total_time_rounded / 60, 2)
+            wages_r = round(self.wage(barber) * total_time_rounded / 60, 2)
 
             print(f"{barber}: Haircuts={haircuts}, Service={service_r} min, Idle={idle_r} min, "
                   f"Utilization={utilization_r}%, Idle Ratio={idle_ratio_r}%, Avg Service={avg_service_r} min, Wages=${wages_r}")
 
         # Shop-Level metrics
-        overall_utilization = (overall_service_time / overall_total_time * 100) if overall_total_time > 0 else 0
-        avg_idle_per_barber = (overall_idle_time / len(self.total_haircuts)) if self.total_haircuts else 0
-        avg_revenue_per_customer = (self.total_revenue / total_customers_served) if total_customers_served else 0
-
         print("\nShop-Level Metrics:")
-        print(f"Overall Barber Utilization: {round(overall_utilization, 2)}%")
-        print(f"Average Idle Time per Barber: {round(avg_idle_per_barber, 2)} min")
-        print(f"Average Revenue per Customer Served: ${round(avg_revenue_per_customer, 2)}")
+        print(f"Overall Barber Utilization: {round(summary['utilization'], 2)}%")
+        print(f"Average Idle Time per Barber: {round(summary['avg_idle_per_barber'], 2)} min")
+        print(f"Average Revenue per Customer Served: ${round(summary['avg_revenue_per_customer'], 2)}")
 
         # Haircut distribution
         print("\nHaircut Distribution:")
         for haircut, count in self.service_distribution.items():
             print(f"{haircut}: {count}")
+
+
+def print_shops_summary(shop_trackers, per_shop=True):
+    """
+    Print one line of key results per shop, followed by the totals of all shops.
+
+    Args:
+        shop_trackers (dict): Shop name mapped to the shop's StatsTracker.
+        per_shop (bool, optional): Set to False to print only the totals. Defaults to True.
+    """
+    print("\n=== Per-Shop Summary ===\n")
+    total = None
+    for name, tracker in shop_trackers.items():
+        if per_shop:
+            summary = tracker.summary()
+            print(f"{name}: Served={summary['customers_served']}, Lost={summary['customers_lost']}, "
+                  f"Routed={summary['customers_routed']}, Avg Wait={round(summary['avg_wait_time'], 2)} min, "
+                  f"Utilization={round(summary['utilization'], 2)}%, Profit=${summary['profit']:.2f}")
+        if total is None:
+            total = StatsTracker(tracker.hourly_wages, streaming=True)
+        total.merge(tracker)
+
+    summary = total.summary()
+    print(f"\nAll {len(shop_trackers)} Shops: Served={summary['customers_served']}, "
+          f"Lost={summary['customers_lost']}, Routed={summary['customers_routed']}, Avg Wait={round(summary['avg_wait_time'], 2)} min, "
+          f"p95 Wait={round(summary['p95_wait_time'], 2)} min, Utilization={round(summary['utilization'], 2)}%, "
+          f"Profit=${summary['profit']:.2f}")
@@ -0,0 +1,180 @@
+"""
+Constant-memory, mergeable statistics for streams of samples.
+
+RunningStats keeps count, mean, variance (Welford), min and max. QuantileSketch
+is a log-bucketed sketch (in the style of DDSketch) that answers quantile
+queries within a fixed relative error using a bounded number of buckets.
+Both can be merged, so results from parallel replications can be combined
+without shipping raw samples.
+"""
+
+import math
+
+
+class RunningStats:
+    """
+    Online count, mean, variance, min and max of a stream of numbers.
+
+    Attributes:
+        count (int): Number of samples seen.
+        mean (float): Mean of the samples.
+        min (float): Smallest sample (None while empty).
+        max (float): Largest sample (None while empty).
+    """
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Add a sample (Welford's update)."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Fold another RunningStats into this one (Chan et al. pairwise update).
+
+        Args:
+            other (RunningStats): Statistics to merge in.
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            self.min, self.max = other.min, other.max
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        """Sample variance (0 for fewer than two samples)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+    def __getstate__(self):
+        return (self.count, self.mean, self._m2, self.min, self.max)
+
+    def __setstate__(self, state):
+        self.count, self.mean, self._m2, self.min, self.max = state
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean:.3f}, stdev={self.stdev:.3f})"
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error.
+
+    Positive samples are counted in logarithmic buckets whose width is chosen so
+    that any value reported for a bucket is within `relative_accuracy` of every
+    sample in it. Samples at or below `min_value` (e.g. zero wait times) are
+    counted separately and reported as 0. When more than `max_buckets` buckets
+    are in use, the lowest buckets are collapsed, which only loses accuracy on
+    the smallest values.
+
+    Attributes:
+        relative_accuracy (float): Maximum relative error of reported quantiles.
+        count (int): Number of samples seen.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048, min_value=1e-9):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy (float): Maximum relative error of reported quantiles.
+            max_buckets (int): Upper bound on the number of buckets kept.
+            min_value (float): Samples at or below this value are counted as zero.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = {}
+        self._zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        """Add a sample."""
+        self.count += 1
+        if value <= self.min_value:
+            self._zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one.
+
+        Args:
+            other (QuantileSketch): Sketch with the same relative accuracy.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q):
+        """
+        Estimate a quantile.
+
+        Args:
+            q (float): Quantile between 0 and 1 (e.g. 0.95).
+
+        Returns:
+            float: Estimated value of the quantile, or 0 if the sketch is empty.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+    def _collapse(self):
+        """Merge the lowest buckets until the bucket bound holds again."""
+        keys = sorted(self._buckets)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._buckets[target] += self._buckets.pop(key)
+
+    def __repr__(self):
+        return f"QuantileSketch(count={self.count}, buckets={len(self._buckets)})"
@@ -1,4 +1,5 @@
 from config import SIMULATION_TIME, TIME_DESCALE
+import asyncio
 import time
 
 class TimeManager:
@@ -30,6 +31,13 @@ class TimeManager:
         time.sleep(1 / self.descale)
         self.current += 1
 
+    async def tick_async(self):
+        """
+        Advance the simulation time by one minute without blocking the event loop.
+        """
+        await asyncio.sleep(1 / self.descale)
+        self.current += 1
+
     def check_time(self):
         """
         Check if the simulation has remaining time.